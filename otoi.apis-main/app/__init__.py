@@ -3,10 +3,20 @@ from app.extensions import db, migrate, jwt
 from flasgger import Swagger
 from flask_cors import CORS
 from app.routes import register_blueprints
-from app.middleware import extract_jwt_info
+from app.middleware import extract_jwt_info, init_public_routes
 from app.cli import register_cli
 from dotenv import load_dotenv
 from app.utils.query_profiler import init_profiler
+from app.utils.user_cache import init_user_cache
+from app.services.auth_service import init_password_hash_pool
+from app.utils.tenant import init_tenant_scope
+from app.utils.suggest import init_suggest_index
+from app.utils.pagination import init_pagination
+from app.utils.rollups import init_rollups
+from app.utils.party_balances import init_party_balances
+from app.utils.invoice_balances import init_invoice_balances
+from app.utils.jobs import init_jobs
+from app.utils.dashboard_cache import init_dashboard_cache
 import os
 
 load_dotenv()
@@ -85,6 +95,16 @@ def create_app():
     jwt.init_app(app)
 
     # Register middleware
+    init_user_cache(app)
+    init_password_hash_pool(app)
+    init_tenant_scope(app)
+    init_suggest_index(app)
+    init_pagination(app)
+    init_rollups(app)
+    init_party_balances(app)
+    init_invoice_balances(app)
+    init_dashboard_cache(app)
+    init_jobs(app)
     app.before_request(extract_jwt_info)
 
     # Initialize Swagger
@@ -115,6 +135,9 @@ def create_app():
         static_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
         return send_from_directory(static_dir, filename)
 
+    # Compile the public-route matcher once every route is registered
+    init_public_routes(app)
+
     return app
 
 
@@ -1,3 +1,4 @@
+import click
 from flask import Flask
 
 from app.seed import (
@@ -25,3 +26,119 @@ def register_cli(app: Flask):
         """
         seed_data()
         print("Data seeded successfully.")
+
+    @app.cli.command("benchmark-password-hash")
+    @click.option("--method", "methods", multiple=True,
+                  help="Werkzeug hash method to time (repeatable). Defaults to PASSWORD_HASH_METHOD.")
+    @click.option("--rounds", default=10, show_default=True, type=click.IntRange(min=1),
+                  help="Hash + verify cycles per method.")
+    def benchmark_password_hash_command(methods, rounds):
+        """Report per-hash latency of password hashing methods on this host."""
+        from app.services.auth_service import benchmark_password_hash
+
+        methods = methods or (app.config["PASSWORD_HASH_METHOD"],)
+        print(f"{'method':<28} {'op':<7} {'avg ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+        for method in methods:
+            result = benchmark_password_hash(method, rounds=rounds)
+            for op in ("hash", "verify"):
+                stats = result[op]
+                print(
+                    f"{result['method']:<28} {op:<7} {stats['avg_ms']:>9.1f} "
+                    f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['max_ms']:>9.1f}"
+                )
+
+    @app.cli.command("rebuild-rollups")
+    @click.option("--business-id", type=int, default=None,
+                  help="Only rebuild this business. Defaults to all businesses.")
+    @click.option("--start", "start_date", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+                  help="First day to rebuild (YYYY-MM-DD).")
+    @click.option("--end", "end_date", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+                  help="Last day to rebuild (YYYY-MM-DD).")
+    def rebuild_rollups_command(business_id, start_date, end_date):
+        """Recompute daily_business_rollups from the document tables."""
+        from app.utils.rollups import rebuild_rollups
+
+        written = rebuild_rollups(
+            business_id=business_id,
+            start_date=start_date.date() if start_date else None,
+            end_date=end_date.date() if end_date else None,
+        )
+        print(f"Rebuilt {written} rollup row(s).")
+
+    @app.cli.command("run-jobs")
+    @click.option("--once", is_flag=True, help="Run every job once and exit instead of looping.")
+    def run_jobs_command(once):
+        """Run the housekeeping jobs (leader-elected across processes)."""
+        from app.utils.jobs import JobScheduler, run_jobs_once
+
+        if once:
+            results = run_jobs_once(app)
+            if results is None:
+                print("Another job runner holds the leader lock; nothing run.")
+                return
+            for name, result in results.items():
+                print(f"{name}: {result}")
+            return
+
+        scheduler = JobScheduler(app)
+        print(f"Running {len(scheduler.jobs)} job(s); press Ctrl+C to stop.")
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            pass
+
+    @app.cli.command("reconcile-party-balances")
+    @click.option("--business-id", type=int, default=None,
+                  help="Only reconcile this business. Defaults to all businesses.")
+    def reconcile_party_balances_command(business_id):
+        """Recompute party_balances from the invoice and note tables."""
+        from app.utils.party_balances import reconcile_party_balances
+
+        drifted, written = reconcile_party_balances(business_id=business_id)
+        print(f"Reconciled party balances: {drifted} row(s) had drifted, {written} row(s) written.")
+
+    @app.cli.command("reconcile-invoice-balances")
+    @click.option("--business-id", type=int, default=None,
+                  help="Only reconcile this business. Defaults to all businesses.")
+    def reconcile_invoice_balances_command(business_id):
+        """Recompute invoice credit note totals and effective balances from the credit notes."""
+        from app.utils.invoice_balances import reconcile_invoice_balances
+
+        corrected = reconcile_invoice_balances(business_id=business_id)
+        print(f"Reconciled invoice balances: {corrected} invoice(s) corrected.")
+
+    @app.cli.command("verify-indexes")
+    @click.option("--business-id", type=int, default=None,
+                  help="Business to plan the queries for. Defaults to the first business.")
+    @click.option("--verbose", is_flag=True, help="Print the full plan of every query.")
+    @click.option("--strict", is_flag=True,
+                  help="Exit non-zero if any hot query reads a document table with a sequential scan.")
+    def verify_indexes_command(business_id, verbose, strict):
+        """EXPLAIN the hot dashboard and list queries and report the indexes they use."""
+        import json
+
+        from app.models import Business
+        from app.utils.index_check import check_indexes
+
+        if business_id is None:
+            business = Business.query.order_by(Business.id).first()
+            business_id = business.id if business else 1
+
+        seq_scanned = 0
+        for label, indexes, seq_scans, plan in check_indexes(business_id):
+            if seq_scans:
+                status = "SEQ SCAN on " + ", ".join(seq_scans)
+            else:
+                status = ", ".join(indexes) or "no table scan"
+            print(f"{label:<36} {status}")
+            if verbose:
+                print(json.dumps(plan, indent=2))
+            seq_scanned += bool(seq_scans)
+
+        if seq_scanned:
+            print(f"\n{seq_scanned} hot queries use a sequential scan "
+                  "(expected on small tables; check a production-sized copy).")
+            if strict:
+                raise SystemExit(1)
+        else:
+            print("\nAll hot queries are served by an index.")
@@ -1,10 +1,76 @@
-from flask import g, request, jsonify, abort
+from flask import g, request, jsonify, abort, current_app
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
-from app.models.user import User
+from app.utils.user_cache import get_user_status
+from app.utils.tenant import TenantAccessDenied, resolve_tenant
 import logging
+import re
 
 logging.basicConfig(level=logging.ERROR)
 
+# Paths that are not Flask views of ours (static files, Swagger UI assets)
+# and are therefore public by prefix rather than by decorator.
+PUBLIC_PATH_PREFIXES = (
+    '/static',
+    '/api/static',
+    '/apidocs',
+    '/apispec_1.json',
+    '/flasgger_static',
+    '/favicon.ico',
+)
+
+# Matches a werkzeug rule placeholder such as <token>, <uuid:item_id> or <path:filename>
+_RULE_ARGUMENT = re.compile(r"<(?:(?P<converter>\w+)(?:\([^)]*\))?:)?\w+>")
+
+
+def _rule_to_pattern(rule):
+    """Translate a werkzeug rule string into an unanchored regex fragment."""
+    rule = rule.rstrip('/')
+    parts = []
+    position = 0
+    for match in _RULE_ARGUMENT.finditer(rule):
+        parts.append(re.escape(rule[position:match.start()]))
+        parts.append(".+" if match.group("converter") == "path" else "[^/]+")
+        position = match.end()
+    parts.append(re.escape(rule[position:]))
+    return "".join(parts)
+
+
+def _is_public_rule(app, rule):
+    view = app.view_functions.get(rule.endpoint)
+    if getattr(view, "is_public", False):
+        return True
+    blueprint_name = rule.endpoint.rpartition('.')[0]
+    blueprint = app.blueprints.get(blueprint_name) if blueprint_name else None
+    return bool(getattr(blueprint, "public", False))
+
+
+def init_public_routes(app):
+    """
+    Compile every public route into a single regex.
+
+    Must run after all blueprints are registered. Views opt in with
+    ``@public_endpoint`` (or ``blueprint.public = True``), so the list can no
+    longer drift from the routes actually registered in ``app/routes``.
+    """
+    patterns = sorted({
+        _rule_to_pattern(rule.rule)
+        for rule in app.url_map.iter_rules()
+        if _is_public_rule(app, rule)
+    })
+    prefixes = [re.escape(prefix.rstrip('/')) + r"(?:/.*)?" for prefix in PUBLIC_PATH_PREFIXES]
+
+    app.extensions["public_routes"] = re.compile(
+        r"^(?:" + "|".join(patterns + prefixes) + r")$"
+    )
+    app.logger.debug("Public routes: %s", ", ".join(patterns))
+
+
+def is_public_path(path):
+    """Return True when ``path`` (without trailing slash) needs no authentication."""
+    matcher = current_app.extensions.get("public_routes")
+    return bool(matcher and matcher.match(path))
+
+
 def extract_jwt_info():
     """
     Middleware to verify JWT and extract user_id and business_id.
@@ -18,44 +84,8 @@ def extract_jwt_info():
     # Normalize path (fix trailing slash issue)
     path = request.path.rstrip('/')
 
-    public_endpoints = [
-        '/api/auth/signup',
-        '/api/auth/login',
-        '/api/auth/forgot-password',
-        '/api/auth/reset-password-confirm',
-        '/api/auth/verify-reset-token',
-        '/api/auth/check-email',
-        '/api/auth/update-password',
-
-        # Swagger / Docs
-        '/apidocs',
-        '/apidocs/index.html',
-        '/apidocs/swagger.json',
-        '/apispec_1.json',
-
-        # Other
-        '/flasgger',
-        '/favicon.ico',
-
-        # Public exports
-        '/api/items/export/excel',
-        '/api/items/export/pdf',
-        '/api/items/export/print-pdf',
-
-        # Shared Documents
-        '/api/share-data/public/pdf'
-    ]
-
-    # Normalize public endpoints
-    public_paths = [endpoint.rstrip('/') for endpoint in public_endpoints]
-
     # Allow static + public endpoints
-    if (
-        path.startswith('/static') or
-        path.startswith('/api/static') or
-        path in public_paths or
-        any(path.startswith(p) for p in public_paths)
-    ):
+    if is_public_path(path):
         return None
 
     # Require Authorization for everything else
@@ -72,22 +102,27 @@ def extract_jwt_info():
 
         user_id = get_jwt_identity()
 
-        # Check user active
-        user = User.query.filter_by(uuid=user_id).first()
-        if not user or not user.isActive:
+        # Check user active (served from the per-worker user status cache)
+        status = get_user_status(user_id)
+        if not status or not status.is_active:
             return jsonify({
                 "message": "Account deactivated or user not found. Please log in again."
             }), 403
 
         # Store in global context
         g.user_id = user_id
+        g.user_status = status
 
-        claims = get_jwt()
-        g.business_id = claims.get("business_id")
-        g.role = claims.get("role")
+        # Resolve the tenant once; routes read it via current_business_id()
+        resolve_tenant(user_id, get_jwt(), status)
 
+    except TenantAccessDenied as e:
+        logging.error(f"Tenant check failed for user {g.get('user_id')}: {e}")
+        return jsonify({
+            "message": "You do not have access to this business. Please log in again."
+        }), 403
     except Exception as e:
         logging.error(f"JWT Verification Error: {e}")
         return jsonify({
             "message": "Invalid or expired token"
-        }), 401
\ No newline at end of file
+        }), 401
@@ -17,6 +17,9 @@ from .paymentOut import PaymentOut
 from .purchase_order import PurchaseOrder, PurchaseOrderItem
 from .purchase_invoice import PurchaseInvoice, PurchaseInvoiceItem
 from .debit_note import DebitNote, DebitNoteItem, DebitNotePayment
+from .rollup import DailyBusinessRollup
+from .party_balance import PartyBalance
+from .document_sequence import DocumentSequence
 
 __all__ = [ "User", "Role", "Address", 
            "Lead", "LeadAddress", 
@@ -29,4 +32,5 @@ __all__ = [ "User", "Role", "Address",
            "CreditNote", "CreditNoteItem", "CreditNotePayment", "Country", "UnionTerritory", "PaymentIn", "PaymentOut",
            "PurchaseOrder", "PurchaseOrderItem",
            "PurchaseInvoice", "PurchaseInvoiceItem",
-           "DebitNote", "DebitNoteItem", "DebitNotePayment"]
\ No newline at end of file
+           "DebitNote", "DebitNoteItem", "DebitNotePayment",
+           "DailyBusinessRollup", "PartyBalance", "DocumentSequence"]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from app.models.common import BaseMixin
-from sqlalchemy import Column, Integer, Numeric, ForeignKey, String, Text, Date, JSON, Boolean
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, String, Text, Date, JSON, Boolean, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -12,7 +12,7 @@ class CreditNote(BaseMixin, db.Model):
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
     # Human readable ID (e.g. CN-1001)
-    credit_note_number = Column(String(50), unique=True, nullable=False)
+    credit_note_number = Column(String(50), nullable=False)  # per-business, see app.utils.sequences
     
     # Link to source invoice (optional - credit note can exist without invoice)
     invoice_id = Column(UUID(as_uuid=True), ForeignKey("invoices.uuid", ondelete="SET NULL"), nullable=True)
@@ -56,6 +56,13 @@ class CreditNote(BaseMixin, db.Model):
     customer = relationship("Customer")
     items = relationship("CreditNoteItem", back_populates="credit_note", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        UniqueConstraint("business_id", "credit_note_number", name="uq_credit_notes_business_credit_note_number"),
+        # Tenant-scoped list / dashboard access paths; partial on live rows
+        Index("idx_credit_notes_business_created_active", "business_id", "created_at", postgresql_where=text("is_deleted = false")),
+        Index("idx_credit_notes_business_date_active",    "business_id", "credit_note_date", postgresql_where=text("is_deleted = false")),
+    )
+
     def __repr__(self):
         return f"<CreditNote {self.credit_note_number} | ₹{self.total_amount}>"
 
@@ -1,5 +1,5 @@
 from app.models.common import BaseMixin
-from sqlalchemy import Column, Integer, Numeric, ForeignKey, String, Text, Date, JSON, Boolean
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, String, Text, Date, JSON, Boolean, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -10,7 +10,7 @@ class DebitNote(BaseMixin, db.Model):
     __tablename__ = "debit_notes"
 
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    debit_note_number = Column(String(50), unique=True, nullable=False)
+    debit_note_number = Column(String(50), nullable=False)  # per-business, see app.utils.sequences
     vendor_id = Column(UUID(as_uuid=True), ForeignKey("vendors.uuid", ondelete="CASCADE"), nullable=False)
     business_id = Column(Integer, ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False)
     # Link to source purchase invoice (optional - debit note can exist without invoice)
@@ -35,6 +35,13 @@ class DebitNote(BaseMixin, db.Model):
     vendor = relationship("Vendor")
     items = relationship("DebitNoteItem", back_populates="debit_note", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        UniqueConstraint("business_id", "debit_note_number", name="uq_debit_notes_business_debit_note_number"),
+        # Tenant-scoped list / dashboard access paths; partial on live rows
+        Index("idx_debit_notes_business_created_active", "business_id", "created_at", postgresql_where=text("is_deleted = false")),
+        Index("idx_debit_notes_business_date_active",    "business_id", "debit_note_date", "created_at", postgresql_where=text("is_deleted = false")),
+    )
+
     def __repr__(self):
         return f"<DebitNote {self.debit_note_number} | ₹{self.total_amount}>"
 
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, String, DateTime
+from sqlalchemy.sql import func
+from app.extensions import db
+
+
+class DocumentSequence(db.Model):
+    """
+    Next document number per business and document kind (invoice, quotation,
+    purchase order, ...).
+
+    Allocated by app.utils.sequences with an upsert in the transaction that
+    creates the document, so a rolled-back create gives its number back and
+    concurrent creates queue on the row instead of colliding.
+    """
+    __tablename__ = "document_sequences"
+
+    business_id = Column(Integer, ForeignKey("businesses.id", ondelete="CASCADE"), primary_key=True)
+    kind = Column(String(30), primary_key=True)
+
+    # Numeric part of the number the next document of this kind gets
+    next_value = Column(BigInteger, nullable=False)
+
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<DocumentSequence {self.kind} business={self.business_id} next={self.next_value}>"
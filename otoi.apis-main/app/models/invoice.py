@@ -1,5 +1,5 @@
 from app.models.common import BaseMixin
-from sqlalchemy import Column, Integer, Numeric, ForeignKey, String, Text, Date, JSON, Boolean
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, String, Text, Date, JSON, Boolean, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -12,7 +12,7 @@ class Invoice(BaseMixin, db.Model):
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
     # Human readable ID (e.g. INV-1001)
-    invoice_number = Column(String(50), unique=True, nullable=False)
+    invoice_number = Column(String(50), nullable=False)  # per-business, see app.utils.sequences
     
     # Link to source quotation (optional - invoice can exist without quotation)
     quotation_id = Column(UUID(as_uuid=True), ForeignKey("quotations.uuid", ondelete="SET NULL"), nullable=True)
@@ -40,6 +40,13 @@ class Invoice(BaseMixin, db.Model):
     
     # Invoice status (unpaid, paid, refunded, cancelled)
     status = Column(String(20), default="unpaid", nullable=False)
+
+    # Credit notes and what is left to collect after them, maintained by
+    # app.utils.invoice_balances (repair with `flask reconcile-invoice-balances`)
+    credit_notes_total = Column(Numeric(12, 2), default=0, server_default="0", nullable=False)
+    effective_balance_due = Column(Numeric(12, 2), default=0, server_default="0", nullable=False)
+    # unpaid, partial, paid or refunded (fully covered by credit notes)
+    effective_status = Column(String(20), default="unpaid", server_default="unpaid", nullable=False)
     
     # Soft delete column
     is_deleted = Column(Boolean, default=False, nullable=False)
@@ -55,6 +62,17 @@ class Invoice(BaseMixin, db.Model):
     customer = relationship("Customer")
     items = relationship("InvoiceItem", back_populates="invoice", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        UniqueConstraint("business_id", "invoice_number", name="uq_invoices_business_invoice_number"),
+        # Tenant-scoped list / dashboard access paths; partial on live rows
+        Index("idx_invoices_business_created_active",      "business_id", "created_at", postgresql_where=text("is_deleted = false")),
+        Index("idx_invoices_business_invoice_date_active", "business_id", "invoice_date", postgresql_where=text("is_deleted = false")),
+        Index("idx_invoices_business_due_date_unpaid",     "business_id", "due_date", postgresql_where=text("is_deleted = false AND payment_status <> 'paid'")),
+        Index("idx_invoices_business_customer_unpaid",     "business_id", "customer_id", postgresql_where=text("is_deleted = false AND payment_status <> 'paid'")),
+        Index("idx_invoices_business_updated_paid",        "business_id", "updated_at", postgresql_where=text("is_deleted = false AND amount_paid > 0")),
+        Index("idx_invoices_business_effective_status",    "business_id", "effective_status", "created_at", postgresql_where=text("is_deleted = false")),
+    )
+
     def __repr__(self):
         return f"<Invoice {self.invoice_number} | ₹{self.total_amount}>"
 
@@ -0,0 +1,36 @@
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, Date, DateTime, String, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.extensions import db
+
+
+class PartyBalance(db.Model):
+    """
+    Open balance per business and party: unpaid sales invoices per customer,
+    unpaid purchase invoices per vendor.
+
+    Maintained by app.utils.party_balances from the session flush (same
+    transaction as the document write) and repaired with
+    ``flask reconcile-party-balances``.
+    """
+    __tablename__ = "party_balances"
+
+    business_id = Column(Integer, ForeignKey("businesses.id", ondelete="CASCADE"), primary_key=True)
+    party_type = Column(String(10), primary_key=True)  # customer, vendor
+    party_id = Column(UUID(as_uuid=True), primary_key=True)
+
+    # Sum of balance_due and number of non-deleted invoices not marked paid
+    outstanding = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    doc_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Latest document date (invoice, purchase invoice, credit or debit note)
+    last_activity = Column(Date, nullable=True)
+
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Top-N parties by balance: backward scan of one (business, type) range
+        Index("idx_party_balances_business_type_outstanding", "business_id", "party_type", "outstanding"),
+    )
+
+    def __repr__(self):
+        return f"<PartyBalance {self.party_type} {self.party_id} business={self.business_id}>"
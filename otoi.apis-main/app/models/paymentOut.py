@@ -1,5 +1,5 @@
 from app.models.common import BaseMixin
-from sqlalchemy import Column, Integer, Numeric, ForeignKey, String, Text, Date, Boolean
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, String, Text, Date, Boolean, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -16,7 +16,7 @@ class PaymentOut(BaseMixin, db.Model):
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     # Payment Number (e.g. POUT-1001)
-    payment_number = Column(String(50), unique=True, nullable=False)
+    payment_number = Column(String(50), nullable=False)  # per-business, see app.utils.sequences
 
     # Payment Date
     payment_date = Column(Date, nullable=False)
@@ -65,6 +65,13 @@ class PaymentOut(BaseMixin, db.Model):
     business = relationship("Business")
     user = relationship("User", foreign_keys=[created_by])
 
+    __table_args__ = (
+        UniqueConstraint("business_id", "payment_number", name="uq_payment_outs_business_payment_number"),
+        # Tenant-scoped list / dashboard access paths; partial on live rows
+        Index("idx_payment_outs_business_created",     "business_id", "created_at"),
+        Index("idx_payment_outs_business_date_active", "business_id", "payment_date", "created_at", postgresql_where=text("is_deleted = false")),
+    )
+
     def __repr__(self):
         return f"<PaymentOut {self.payment_number} | ₹{self.amount_paid} | {self.payment_mode}>"
 
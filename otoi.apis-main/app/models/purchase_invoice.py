@@ -1,6 +1,6 @@
 from app.models.common import BaseMixin
 from sqlalchemy import (
-    Column, Integer, Numeric, ForeignKey, String, Text, Date, JSON, Boolean
+    Column, Integer, Numeric, ForeignKey, String, Text, Date, JSON, Boolean, Index, UniqueConstraint, text
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -19,7 +19,7 @@ class PurchaseInvoice(BaseMixin, db.Model):
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     # Human-readable invoice number (e.g. PINV-1001)
-    invoice_number = Column(String(50), unique=True, nullable=False)
+    invoice_number = Column(String(50), nullable=False)  # per-business, see app.utils.sequences
 
     # Source Purchase Order (nullable so standalone purchase invoices are allowed later)
     purchase_order_id = Column(
@@ -80,6 +80,14 @@ class PurchaseInvoice(BaseMixin, db.Model):
         cascade="all, delete-orphan",
     )
 
+    __table_args__ = (
+        UniqueConstraint("business_id", "invoice_number", name="uq_purchase_invoices_business_invoice_number"),
+        # Tenant-scoped list / dashboard access paths; partial on live rows
+        Index("idx_purchase_invoices_business_created_active",      "business_id", "created_at", postgresql_where=text("is_deleted = false")),
+        Index("idx_purchase_invoices_business_invoice_date_active", "business_id", "invoice_date", postgresql_where=text("is_deleted = false")),
+        Index("idx_purchase_invoices_business_vendor_unpaid",       "business_id", "vendor_id", postgresql_where=text("is_deleted = false AND payment_status <> 'paid'")),
+    )
+
     def __repr__(self):
         return f"<PurchaseInvoice {self.invoice_number} | ₹{self.total_amount} | {self.payment_status}>"
 
@@ -1,5 +1,5 @@
 from app.models.common import BaseMixin
-from sqlalchemy import Column, Integer, Numeric, ForeignKey, String, Text, Date, JSON, Index
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, String, Text, Date, JSON, Index, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -12,7 +12,7 @@ class PurchaseOrder(BaseMixin, db.Model):
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     # Human-readable PO number (e.g. PO-1001)
-    po_number = Column(String(50), unique=True, nullable=False)
+    po_number = Column(String(50), nullable=False)  # per-business, see app.utils.sequences
 
     # Party / Owner
     business_id = Column(Integer, ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False)
@@ -46,12 +46,15 @@ class PurchaseOrder(BaseMixin, db.Model):
     )
 
     __table_args__ = (
+        UniqueConstraint("business_id", "po_number", name="uq_purchase_orders_business_po_number"),
         Index("idx_purchase_orders_vendor_id",                "vendor_id"),
         Index("idx_purchase_orders_business_id",              "business_id"),
         Index("idx_purchase_orders_status",                   "status"),
         Index("idx_purchase_orders_status_delivery_date",     "status", "delivery_date"),
         Index("idx_purchase_orders_business_status_delivery", "business_id", "status", "delivery_date"),
         Index("idx_purchase_orders_created_at",               "created_at"),
+        Index("idx_purchase_orders_business_open_created",    "business_id", "created_at",
+              postgresql_where=text("status = 'open'")),
     )
 
     def __repr__(self):
@@ -1,5 +1,5 @@
 from app.models.common import BaseMixin
-from sqlalchemy import Column, Integer, Numeric, ForeignKey, String, Text, Date, JSON, Index
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, String, Text, Date, JSON, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -12,7 +12,7 @@ class Quotation(BaseMixin, db.Model):
     uuid = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
     # Human readable ID (e.g. QT-1001)
-    quotation_number = Column(String(50), unique=True, nullable=False)
+    quotation_number = Column(String(50), nullable=False)  # per-business, see app.utils.sequences
     
     # Party / Owner
     business_id = Column(Integer, ForeignKey("businesses.id", ondelete="CASCADE"), nullable=False)
@@ -42,6 +42,7 @@ class Quotation(BaseMixin, db.Model):
     items = relationship("QuotationItem", back_populates="quotation", cascade="all, delete-orphan")
 
     __table_args__ = (
+        UniqueConstraint("business_id", "quotation_number", name="uq_quotations_business_quotation_number"),
         # FK lookup indexes
         Index('idx_quotations_customer_id',  'customer_id'),
         Index('idx_quotations_business_id',  'business_id'),
@@ -51,6 +52,8 @@ class Quotation(BaseMixin, db.Model):
         Index('idx_quotations_business_status_valid_till','business_id', 'status', 'valid_till'),
         # Pagination / number generation
         Index('idx_quotations_created_at',   'created_at'),
+        # Tenant-scoped "latest" listing
+        Index('idx_quotations_business_created', 'business_id', 'created_at'),
     )
 
     def __repr__(self):
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, Date, DateTime
+from sqlalchemy.sql import func
+from app.extensions import db
+
+
+class DailyBusinessRollup(db.Model):
+    """
+    Per-business, per-day totals of the document tables, keyed by document date.
+
+    Maintained by app.utils.rollups from the session flush (same transaction as
+    the document write) and rebuilt with ``flask rebuild-rollups``. Soft-deleted
+    documents are not counted.
+    """
+    __tablename__ = "daily_business_rollups"
+
+    business_id = Column(Integer, ForeignKey("businesses.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+
+    # Invoices (by invoice_date)
+    sales_total = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    sales_count = Column(Integer, nullable=False, default=0, server_default="0")
+    sales_received = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+
+    # Purchase invoices (by invoice_date)
+    purchases_total = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    purchases_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Payment-in records (by payment_date)
+    receipts_total = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    receipts_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Payment-out records (by payment_date)
+    payments_total = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    payments_count = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Credit notes (by credit_note_date); refunded = amount paid back to customers
+    credit_notes_total = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    credit_notes_count = Column(Integer, nullable=False, default=0, server_default="0")
+    credit_notes_refunded = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+
+    # Debit notes (by debit_note_date); credited = amount received on 'credited' notes
+    debit_notes_total = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    debit_notes_count = Column(Integer, nullable=False, default=0, server_default="0")
+    debit_notes_credited = Column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+
+    updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<DailyBusinessRollup business={self.business_id} day={self.day}>"
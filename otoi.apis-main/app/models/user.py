@@ -2,7 +2,7 @@ from app.models.common import BaseMixin
 from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, text
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import relationship
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.services.auth_service import hash_password, verify_password, needs_rehash
 from app.extensions import db
 from app.models.business import user_business
 from datetime import datetime
@@ -36,10 +36,13 @@ class User(BaseMixin, db.Model):
     businesses = relationship("Business", secondary=user_business, back_populates="users")
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(password, self.password_hash)
+
+    def password_needs_rehash(self):
+        return needs_rehash(self.password_hash)
 
     def update_ut_status(self):
         from app.models.location import UnionTerritory
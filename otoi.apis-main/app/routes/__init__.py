@@ -26,6 +26,7 @@ from app.routes.payment_out import payment_out_blueprint
 from app.routes.payment_in import payment_in_blueprint
 from app.routes.share import share_blueprint
 from app.routes.dashboard import dashboard_blueprint
+from app.routes.search import search_blueprint
 
 
 
@@ -58,6 +59,7 @@ def register_blueprints(app):
     app.register_blueprint(business_config_blueprint, url_prefix="/api/business-config")
     app.register_blueprint(share_blueprint, url_prefix="/api/share-data")
     app.register_blueprint(dashboard_blueprint, url_prefix="/api/dashboard")
+    app.register_blueprint(search_blueprint, url_prefix="/api/search")
     # app.register_blueprint(quotation_item_blueprint, url_prefix="/api/quotation-items")
 
 
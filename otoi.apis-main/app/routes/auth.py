@@ -3,6 +3,13 @@ from flask_jwt_extended import create_access_token
 from app.models.user import User, Role
 from app.extensions import db
 from app.services.mail_service import send_reset_password_email
+from app.utils.user_cache import invalidate_user
+from app.services.auth_service import (
+    PasswordHashPoolSaturated,
+    pool_hash_password,
+    pool_verify_password,
+)
+from app.utils.decorators import public_endpoint
 import os
 import jwt
 from datetime import datetime, timedelta
@@ -11,7 +18,17 @@ import base64
 
 auth_blueprint = Blueprint("auth", __name__)
 
+
+def _hash_pool_busy_response():
+    """503 returned when the password hashing pool cannot take more work."""
+    response = jsonify({"error": "Server is busy. Please try again in a moment."})
+    response.status_code = 503
+    response.headers["Retry-After"] = str(current_app.config.get("PASSWORD_HASH_RETRY_AFTER", 2))
+    return response
+
+
 @auth_blueprint.route("/signup", methods=["POST"])
+@public_endpoint
 def signup():
     """
     Register a new user
@@ -103,6 +120,12 @@ def signup():
     if User.query.filter_by(email=email).first() is not None:
         return jsonify({"error": "Email already exists"}), 400
 
+    # Hash on the KDF pool before any write so no transaction waits on it
+    try:
+        password_hash = pool_hash_password(password)
+    except PasswordHashPoolSaturated:
+        return _hash_pool_busy_response()
+
     # Resolve default role 'User' (auto-create if missing)
     role = Role.query.filter_by(name="User").first()
     if role is None:
@@ -113,7 +136,7 @@ def signup():
     # Create user
     try:
         user = User(firstName=firstName, lastName=lastName, username=username, email=email, mobileNo=mobileNo, role=role, state=state, country=country)
-        user.set_password(password)
+        user.password_hash = password_hash
         user.update_ut_status()
 
         # Persist and set audit fields
@@ -163,6 +186,7 @@ def signup():
     }), 201
 
 @auth_blueprint.route("/login", methods=["POST"])
+@public_endpoint
 def login():
     try:
         # Get data from JSON, Form, or Args (covering all possible sources including Swagger UI)
@@ -201,11 +225,19 @@ def login():
         if not user:
             return jsonify({"error": "Invalid email or password"}), 401
  
-        if not user.check_password(password):
-            return jsonify({"error": "Invalid password"}), 401
+        try:
+            if not pool_verify_password(password, user.password_hash):
+                return jsonify({"error": "Invalid password"}), 401
  
-        if not user.isActive:
-            return jsonify({"error": "Account Deactivated"}), 403
+            if not user.isActive:
+                return jsonify({"error": "Account Deactivated"}), 403
+
+            # Transparently move the stored hash to the configured method/cost;
+            # committed together with the UT status update below
+            if user.password_needs_rehash():
+                user.password_hash = pool_hash_password(password)
+        except PasswordHashPoolSaturated:
+            return _hash_pool_busy_response()
  
         business_id = user.businesses[0].id if user.businesses and len(user.businesses) > 0 else None
  
@@ -250,6 +282,7 @@ def login():
     
     
 @auth_blueprint.route("/check-email", methods=["POST"])
+@public_endpoint
 def check_email():
     """
     Check if the email exists in the database
@@ -280,6 +313,7 @@ def check_email():
     return jsonify({"message": "Email found"}), 200
 
 @auth_blueprint.route("/update-password", methods=["POST"])
+@public_endpoint
 def update_password():
     data = request.get_json()
     email = data.get("email")
@@ -291,10 +325,12 @@ def update_password():
 
     user.set_password(new_password)
     db.session.commit()
+    invalidate_user(user.uuid)
 
     return jsonify({"message": "Password updated"}), 200
 
 @auth_blueprint.route("/forgot-password", methods=["POST"])
+@public_endpoint
 def forgot_password():
     """
     Step 1: Accept email and send reset link with dynamic JWT
@@ -329,6 +365,7 @@ def forgot_password():
         return jsonify({"error": "Failed to send email. Please try again later."}), 500
 
 @auth_blueprint.route("/verify-reset-token", methods=["POST"])
+@public_endpoint
 def verify_reset_token():
     """
     Check if a reset token is still valid (on page load)
@@ -367,6 +404,7 @@ def verify_reset_token():
         return jsonify({"error": "Reset link has expired or is invalid.", "valid": False}), 400
 
 @auth_blueprint.route("/reset-password-confirm", methods=["POST"])
+@public_endpoint
 def reset_password_confirm():
     """
     Step 2: Verify token and update password
@@ -412,5 +450,6 @@ def reset_password_confirm():
     # Update password
     user.set_password(new_password)
     db.session.commit()
+    invalidate_user(user.uuid)
 
     return jsonify({"message": "Password has been successfully reset"}), 200
@@ -1,99 +1,24 @@
 from flask import Blueprint, request, jsonify, current_app, send_file
-from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import or_, func, desc, asc, and_
 from app.extensions import db
-from app.models import CreditNote, CreditNoteItem, CreditNotePayment, Invoice, Item, Customer
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.sequences import next_document_number
+from app.models import CreditNote, CreditNoteItem, CreditNotePayment, Invoice, Customer
 from app.utils.stamping import set_created_fields, set_updated_fields
 from app.utils.decorators import login_required
+from app.utils.document_loader import document_load_options, item_image_data_uri, item_image_url, load_document, main_item_image
 import uuid
 import sys
-import os
 from datetime import datetime, timedelta
-from app.config import Config
 from app.services.pdf_service import generate_credit_note_pdf
 
 credit_note_blueprint = Blueprint("credit_note", __name__)
 
 
-def generate_credit_note_number(max_retries=3):
-    """Generate a unique credit note number like CN-1834 with 4 digits"""
-    import time
-    
-    for attempt in range(max_retries):
-        try:
-            # Get the maximum number from existing credit notes
-            result = db.session.execute(
-                db.text("""
-                    SELECT MAX(CAST(SUBSTRING(credit_note_number FROM 5) AS INTEGER)) as max_num 
-                    FROM credit_notes 
-                    WHERE credit_note_number LIKE 'CN-%' 
-                    AND credit_note_number ~ 'CN-[0-9]{4}$'
-                    AND is_deleted = FALSE
-                """)
-            )
-            max_num = result.scalar()
-            
-            if max_num and max_num >= 1000:
-                # Start from max_num + 1, but keep it 4 digits
-                new_num = max_num + 1
-                # Ensure it doesn't exceed 9999
-                if new_num > 9999:
-                    new_num = 1000  # Reset to 1000 if we exceed 9999
-            else:
-                new_num = 1000  # Start from CN-1000
-            
-            # Format as 4-digit number
-            new_credit_note_number = f"CN-{new_num:04d}"
-            
-            # Quick check to see if this number exists
-            existing = CreditNote.query.filter_by(
-                credit_note_number=new_credit_note_number,
-                is_deleted=False
-            ).first()
-            
-            if existing:
-                # If it exists, try the next number
-                new_num += 1
-                if new_num > 9999:
-                    new_num = 1000  # Reset if we exceed 9999
-                new_credit_note_number = f"CN-{new_num:04d}"
-                
-                # Check one more time
-                existing = CreditNote.query.filter_by(
-                    credit_note_number=new_credit_note_number,
-                    is_deleted=False
-                ).first()
-                
-                if existing:
-                    continue
-                
-            return new_credit_note_number
-            
-        except Exception as e:
-            # Log error for debugging
-            current_app.logger.error(f"Error generating credit note number (attempt {attempt + 1}): {str(e)}")
-            
-            # Rollback any partial transaction to clean up state
-            try:
-                db.session.rollback()
-            except:
-                pass  # Ignore rollback errors
-            
-            if attempt == max_retries - 1:
-                # Last attempt, use a simple 4-digit fallback
-                timestamp = int(time.time())
-                fallback_num = timestamp % 9000 + 1000  # Ensure 4-digit number between 1000-9999
-                return f"CN-{fallback_num:04d}"
-            
-            # Brief delay before retry
-            time.sleep(0.1)
-            continue
-    
-    # Ultimate fallback - 4-digit number
-    timestamp = int(time.time())
-    fallback_num = timestamp % 9000 + 1000
-    return f"CN-{fallback_num:04d}"
+def generate_credit_note_number(business_id=None):
+    """Allocate the business's next credit note number (CN-1000, ...) in the current transaction"""
+    return next_document_number("credit_note", business_id)
 
 
 def update_invoice_payment_status(invoice_id):
@@ -108,14 +33,8 @@ def update_invoice_payment_status(invoice_id):
         if not invoice:
             return False
         
-        # Get all credit notes for this invoice
-        credit_notes = CreditNote.query.filter_by(
-            invoice_id=invoice_id, 
-            is_deleted=False
-        ).all()
-        
-        # Calculate total credit amount
-        total_credit_amount = sum(float(cn.total_amount) for cn in credit_notes)
+        # Kept current by app.utils.invoice_balances when credit notes are flushed
+        total_credit_amount = float(invoice.credit_notes_total or 0)
         
         # Calculate effective balance (original balance - credit amount)
         original_balance = float(invoice.balance_due) + float(invoice.amount_paid)
@@ -133,9 +52,8 @@ def update_invoice_payment_status(invoice_id):
             invoice.payment_status = "unpaid"
         
         # Update invoice status if there are credit notes
-        if credit_notes:
-            total_credit = sum(float(cn.total_amount) for cn in credit_notes)
-            if total_credit >= float(invoice.total_amount):
+        if total_credit_amount > 0:
+            if total_credit_amount >= float(invoice.total_amount):
                 invoice.status = "refunded"
             else:
                 invoice.status = "refunded"  # Still marked as refunded if any credit exists
@@ -497,16 +415,7 @@ def create_credit_note():
             credit_note_number = user_credit_note_number
         else:
             # Generate auto number only when not provided
-            # Using 4-digit sequential generation
-            try:
-                credit_note_number = generate_credit_note_number()
-            except Exception as e:
-                current_app.logger.error(f"Error in generate_credit_note_number: {str(e)}")
-                # Even this should not fail, but if it does, create a manual 4-digit number
-                import time
-                timestamp = int(time.time())
-                fallback_num = timestamp % 9000 + 1000  # Ensure 4-digit number between 1000-9999
-                credit_note_number = f"CN-{fallback_num:04d}"
+            credit_note_number = generate_credit_note_number(data["business_id"])
         
         
         # Create credit note with backend-calculated charges
@@ -574,40 +483,12 @@ def create_credit_note():
         
     except IntegrityError as e:
         db.session.rollback()
-        # Check if this is a duplicate credit_note_number error
-        if "credit_notes_credit_note_number_key" in str(e):
-            # Try to generate a new number and retry once
-            try:
-                # Clear session state before retry
-                db.session.rollback()
-                import time
-                timestamp = int(time.time())
-                fallback_num = timestamp % 9000 + 1000  # Ensure 4-digit number between 1000-9999
-                new_credit_note_number = f"CN-{fallback_num:04d}"
-                credit_note.credit_note_number = new_credit_note_number
-                db.session.add(credit_note)
-                db.session.commit()
-                
-                return jsonify({
-                    "message": "Credit note created successfully",
-                    "data": {
-                        "uuid": str(credit_note.uuid),
-                        "credit_note_number": credit_note.credit_note_number,
-                        "total_amount": float(credit_note.total_amount),
-                        "subtotal": float(totals["subtotal"]),
-                        "tax_total": float(totals["total_tax"]),
-                        "discount_total": float(totals["total_discount"]),
-                        "balance_amount": float(credit_note.balance_amount),
-                        "amount_received": float(credit_note.amount_received),
-                        "status": credit_note.status
-                    }
-                }), 201
-            except Exception as retry_error:
-                db.session.rollback()
-                return jsonify({
-                    "success": False, 
-                    "error": "Failed to generate unique credit note number. Please try again."
-                }), 500
+        # Only a user-provided number can collide; generated ones come from the sequence
+        if "uq_credit_notes_business_credit_note_number" in str(e):
+            return jsonify({
+                "success": False,
+                "error": f"Credit note number '{credit_note_number}' already exists"
+            }), 400
         else:
             return jsonify({
                 "success": False,
@@ -818,9 +699,7 @@ def list_credit_notes():
             query = query.order_by(desc(CreditNote.created_at))
         
         # Apply pagination
-        credit_notes = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
+        credit_notes = paginate(query, page=page, per_page=per_page)
         
         # Format response
         result = {
@@ -831,6 +710,7 @@ def list_credit_notes():
                     "page": page,
                     "per_page": per_page,
                     "total": credit_notes.total,
+                    "next_cursor": credit_notes.next_cursor,
                     "pages": credit_notes.pages
                 }
             }
@@ -854,6 +734,8 @@ def list_credit_notes():
         
         return jsonify(result)
         
+    except InvalidCursor as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "error": "An error occurred", "details": str(e)}), 500
 
@@ -879,7 +761,7 @@ def get_credit_note(credit_note_id):
         description: Credit note not found
     """
     try:
-        credit_note = CreditNote.query.filter_by(uuid=credit_note_id, is_deleted=False).first()
+        credit_note = load_document(CreditNote, uuid=credit_note_id, is_deleted=False)
         
         if not credit_note:
             return jsonify({"success": False, "error": "Credit note not found"}), 404
@@ -902,21 +784,13 @@ def get_credit_note(credit_note_id):
                 "image": None
             }
             
-            # Fetch product details including images if item_id exists
-            if item.item_id:
-                inventory_item = Item.query.get(item.item_id)
-                if inventory_item:
-                    # Update HSN/SAC code if missing
-                    if not item_info["hsn_sac_code"]:
-                        item_info["hsn_sac_code"] = inventory_item.hsn_code
-                    
-                    # Get the main image
-                    main_image_obj = next((img for img in (inventory_item.images or []) if img.is_main), None)
-                    if not main_image_obj and inventory_item.images:
-                        main_image_obj = inventory_item.images[0]
-                    
-                    if main_image_obj:
-                        item_info["image"] = f"/static/itemImages/{main_image_obj.item_id}/{main_image_obj.image}"
+            # Product details and image from the eagerly loaded inventory item
+            inventory_item = item.item
+            if inventory_item:
+                # Update HSN/SAC code if missing
+                if not item_info["hsn_sac_code"]:
+                    item_info["hsn_sac_code"] = inventory_item.hsn_code
+                item_info["image"] = item_image_url(main_item_image(inventory_item))
             
             items.append(item_info)
         
@@ -1525,7 +1399,7 @@ def update_status(credit_note_id):
 def download_credit_note_pdf(credit_note_id):
     """Download credit note as a PDF"""
     try:
-        credit_note = CreditNote.query.get_or_404(credit_note_id)
+        credit_note = CreditNote.query.options(*document_load_options(CreditNote)).get_or_404(credit_note_id)
 
         # Build items data (with product names, HSN codes, and images)
         items_data = []
@@ -1538,31 +1412,14 @@ def download_credit_note_pdf(credit_note_id):
                 "tax": item.tax or {},
                 "total_price": float(item.total_price) if item.total_price else 0,
             }
-            if item.item_id:
-                inventory_item = Item.query.options(
-                    selectinload(Item.images)
-                ).get(item.item_id)
-                if inventory_item:
-                    item_info["product_name"] = inventory_item.item_name
-                    item_info["hsn_sac_code"] = inventory_item.hsn_code
-                    # Get the feature image for the item
-                    main_image_obj = next((img for img in (inventory_item.images or []) if img.is_main), None)
-                    if not main_image_obj and inventory_item.images:
-                        main_image_obj = inventory_item.images[0]
-                    if main_image_obj:
-                        import base64
-                        # Resolve absolute path for PDF generation
-                        image_path = os.path.join(Config.ITEM_IMAGES_FOLDER, str(main_image_obj.item_id), main_image_obj.image)
-                        if os.path.exists(image_path):
-                            try:
-                                with open(image_path, "rb") as img_file:
-                                    encoded_string = base64.b64encode(img_file.read()).decode('utf-8')
-                                    extension = os.path.splitext(image_path)[1].lower()
-                                    mime_type = "image/png" if extension == ".png" else "image/jpeg"
-                                    item_info["image"] = f"data:{mime_type};base64,{encoded_string}"
-                            except Exception as e:
-                                current_app.logger.error(f"Error encoding image for PDF: {e}")
-                                item_info["image"] = None
+            inventory_item = item.item
+            if inventory_item:
+                item_info["product_name"] = inventory_item.item_name
+                item_info["hsn_sac_code"] = inventory_item.hsn_code
+                # Feature image embedded for PDF generation
+                image = main_item_image(inventory_item)
+                if image:
+                    item_info["image"] = item_image_data_uri(image)
             items_data.append(item_info)
 
         pdf_buffer = generate_credit_note_pdf(credit_note, items_data)
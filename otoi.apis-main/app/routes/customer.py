@@ -1,11 +1,15 @@
-from flask import Blueprint, current_app, jsonify, request, g
+from flask import Blueprint, current_app, jsonify, request
 from app.models.customer import Customer
 from app.models.person import Lead
 from app.models.common import Address, Shipping
 from app.extensions import db
+from app.utils.pagination import paginate
+from app.utils.streaming import stream_json_list
 from app.utils.address_utils import clean_orphaned_addresses, validate_address_type
-from sqlalchemy import func, or_
+from sqlalchemy import func
 from app.utils.stamping import set_created_fields, set_business, set_updated_fields
+from app.utils.tenant import current_business_id
+from app.utils.search import apply_search, full_name_expr
 from sqlalchemy.exc import IntegrityError
 from werkzeug.exceptions import HTTPException
 from flask import send_file
@@ -36,18 +40,14 @@ def get_customers():
 
     # Search query filter
     if "query" in request.args:
-        query_value = request.args.get("query", "").strip()
-        if query_value:
-            query = query.filter(
-                or_(
-                    Customer.first_name.ilike(f"%{query_value}%"),
-                    Customer.last_name.ilike(f"%{query_value}%"),
-                    func.concat(Customer.first_name, " ", Customer.last_name).ilike(f"%{query_value}%"), #For search customer by dropdown
-                    Customer.email.ilike(f"%{query_value}%"),
-                    Customer.mobile.ilike(f"%{query_value}%"),
-                    Customer.gst.ilike(f"%{query_value}%"),
-                )
-            )
+        query = apply_search(
+            query,
+            request.args.get("query", ""),
+            full_name_expr(Customer),  # For search customer by dropdown
+            Customer.email,
+            Customer.mobile,
+            Customer.gst,
+        )
 
     sort = request.args.get("sort", "created_at")  # Default sort by created_at
     order = request.args.get("order", "desc").upper()  # Default order is now 'desc'
@@ -85,20 +85,18 @@ def get_customers():
             else:
                 query = query.order_by(getattr(Customer, field, "uuid"))
 
-    # Return all customers for dropdown if requested
+    # Stream all customers for dropdown if requested
     if request.args.get("dropdown") == "true":
-        return jsonify([
-            {
-                "uuid": str(c.uuid),
-                "name": f"{c.first_name} {c.last_name}".strip()
-            }
-            for c in query.all()
-        ])
+        rows = query.with_entities(Customer.uuid, Customer.first_name, Customer.last_name)
+        return stream_json_list(rows, lambda c: {
+            "uuid": str(c.uuid),
+            "name": f"{c.first_name} {c.last_name}".strip()
+        })
 
     # Paginated results for the main grid
     page = int(request.args.get("page", 1))
     per_page = int(request.args.get("items_per_page", 5))
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    pagination = paginate(query, page=page, per_page=per_page)
     customers = pagination.items
 
     # Shape response to match frontend expectations: { data: [...], pagination: { total, ... } }
@@ -129,6 +127,7 @@ def get_customers():
 
             "pagination": {
                 "total": pagination.total,
+                "next_cursor": pagination.next_cursor,
                 "items_per_page": per_page,
                 "current_page": page,
                 "last_page": pagination.pages,
@@ -536,7 +535,7 @@ def create_customer():
                 shipping = Shipping(
                     customer_id=customer.uuid,
                     **shipping_data,
-                    business_id=getattr(g, 'business_id', None)
+                    business_id=current_business_id()
                 )
                 
                 # If this is the first address or explicitly set as default, make it default
@@ -927,7 +926,7 @@ def update_customer(customer_id):
                         shipping = Shipping(
                             customer_id=customer.uuid,
                             **address_data,
-                            business_id=getattr(g, 'business_id', None)
+                            business_id=current_business_id()
                         )
                         set_created_fields(shipping)
                         set_business(shipping)
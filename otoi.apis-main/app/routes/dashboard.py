@@ -1,5 +1,8 @@
-from flask import Blueprint, request, jsonify, g
-from sqlalchemy import func, and_, desc
+from flask import Blueprint, current_app, request, jsonify, g
+from sqlalchemy import func, and_, or_, cast, case, literal, literal_column, select, true, tuple_, union_all, Date, DateTime, String
+from sqlalchemy.orm import aliased
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from app.extensions import db
 from app.models.invoice import Invoice
@@ -12,11 +15,25 @@ from app.models.paymentOut import PaymentOut
 from app.models.customer import Customer
 from app.models.vendor import Vendor
 from app.models.quotation import Quotation
+from app.models.rollup import DailyBusinessRollup
+from app.models.party_balance import PartyBalance
+from app.utils.tenant import current_business_id
+from app.utils.pagination import encode_cursor, decode_cursor, InvalidCursor
+from app.utils.dashboard_cache import cached_dashboard_view, stats as dashboard_cache_stats
+from app.utils.decorators import role_required
 
 dashboard_blueprint = Blueprint("dashboard", __name__)
 
+# ?period= value -> date_trunc unit used to bucket the sales report
+SALES_REPORT_BUCKETS = {
+    "daily": "day",
+    "weekly": "week",
+    "monthly": "month",
+}
+
 
 @dashboard_blueprint.route("/summary", methods=["GET"])
+@cached_dashboard_view("summary")
 def get_dashboard_summary():
     """
     Returns business overview stats: To Collect, To Pay, and Total Cash+Bank Balance.
@@ -29,152 +46,142 @@ def get_dashboard_summary():
         description: Dashboard summary statistics
     """
     try:
-        business_id = g.get("business_id")
+        business_id = current_business_id()
+
+        # Every component is a one-row CTE; the final SELECT cross-joins them so the
+        # whole summary is a single round trip.
 
         # ------- To Collect (Net Receivables) -------
         # Sum of balance_due on all non-deleted, non-paid invoices (sales)
-        invoices_to_collect = (
-            db.session.query(func.coalesce(func.sum(Invoice.balance_due), 0))
-            .filter(
+        receivables = (
+            select(func.coalesce(func.sum(Invoice.balance_due), 0).label("invoices_to_collect"))
+            .where(
                 Invoice.business_id == business_id,
                 Invoice.is_deleted == False,
                 Invoice.payment_status != "paid",
             )
-            .scalar()
+            .cte("receivables")
         )
 
-        # Split credit notes into two buckets:
+        # Split outstanding credit notes into two buckets:
         # 1) CN against unpaid/partial invoices → offsets receivables (reduce "To Collect")
         # 2) CN against fully-paid invoices or refund CNs → actual refund owed (add to "To Pay")
+        linked_invoice = aliased(Invoice)
+        cn_balance = CreditNote.balance_amount
+        # invoice.balance_due = total_amount - amount_paid (raw DB value, not modified by CN)
+        invoice_remaining = func.coalesce(linked_invoice.balance_due, 0)
+        has_linked_invoice = linked_invoice.uuid.isnot(None)
+        # IS DISTINCT FROM so a legacy NULL payment_status counts as unpaid, as it always has
+        linked_unpaid = and_(has_linked_invoice, linked_invoice.payment_status.is_distinct_from("paid"))
 
-        # All outstanding (non-paid) credit notes for this business
-        outstanding_cns = (
-            CreditNote.query
-            .filter(
+        # offset = min(cn_balance, invoice_remaining) while the invoice is still unpaid/partial;
+        # the full CN when its invoice was deleted, or for a standalone non-refund CN
+        offset = case(
+            (linked_unpaid, func.least(cn_balance, invoice_remaining)),
+            (has_linked_invoice, 0),
+            (CreditNote.invoice_id.isnot(None), cn_balance),
+            (CreditNote.status == "refunded", 0),
+            else_=cn_balance,
+        )
+        # refund = excess beyond the linked invoice balance, or a standalone refund CN
+        refund = case(
+            (has_linked_invoice, func.greatest(cn_balance - invoice_remaining, 0)),
+            (CreditNote.invoice_id.isnot(None), 0),
+            (CreditNote.status == "refunded", cn_balance),
+            else_=0,
+        )
+        credit_notes = (
+            select(
+                func.coalesce(func.sum(offset), 0).label("credit_notes_offset"),
+                func.coalesce(func.sum(refund), 0).label("credit_notes_refund"),
+            )
+            .select_from(CreditNote)
+            .outerjoin(
+                linked_invoice,
+                and_(
+                    linked_invoice.uuid == CreditNote.invoice_id,
+                    linked_invoice.business_id == business_id,
+                    linked_invoice.is_deleted == False,
+                ),
+            )
+            .where(
                 CreditNote.business_id == business_id,
                 CreditNote.is_deleted == False,
                 CreditNote.status != "paid",
+                cn_balance > 0,
             )
-            .all()
+            .cte("credit_notes_split")
         )
 
-        credit_notes_offset = 0.0    # reduces To Collect (CN that offsets unpaid invoice balance)
-        credit_notes_refund = 0.0    # adds to To Pay (excess CN = actual refund owed to customer)
-
-        for cn in outstanding_cns:
-            cn_balance = float(cn.balance_amount or 0)
-            if cn_balance <= 0:
-                continue
-
-            if cn.invoice_id:
-                # Check the linked invoice
-                linked_invoice = Invoice.query.filter_by(
-                    uuid=cn.invoice_id,
-                    is_deleted=False
-                ).first()
-
-                if linked_invoice:
-                    # invoice.balance_due = total_amount - amount_paid (raw DB value, not modified by CN)
-                    invoice_remaining = float(linked_invoice.balance_due or 0)
-
-                    if linked_invoice.payment_status == "paid":
-                        # Invoice marked "paid" (CN + payments covered it fully).
-                        # The invoice is already excluded from invoices_to_collect.
-                        # offset portion = min(cn_balance, invoice_remaining) → already excluded, no action
-                        # refund portion = excess beyond invoice balance → To Pay
-                        refund_portion = max(0.0, cn_balance - invoice_remaining)
-                        credit_notes_refund += refund_portion
-                    else:
-                        # Invoice still unpaid/partial → included in invoices_to_collect
-                        # offset = min(cn_balance, invoice_remaining) → reduce To Collect
-                        offset = min(cn_balance, invoice_remaining)
-                        credit_notes_offset += offset
-                        # Any excess beyond invoice balance is a refund → To Pay
-                        excess = max(0.0, cn_balance - invoice_remaining)
-                        credit_notes_refund += excess
-                else:
-                    # Linked invoice was deleted; treat full CN as offset
-                    credit_notes_offset += cn_balance
-            else:
-                # No linked invoice
-                if cn.status == "refunded":
-                    credit_notes_refund += cn_balance
-                else:
-                    # Standalone unpaid CN – offset from receivables
-                    credit_notes_offset += cn_balance
-
         # Sum of balance_amount on outstanding Debit Notes (money vendors owe back to us)
-        debit_notes_to_receive = (
-            db.session.query(func.coalesce(func.sum(DebitNote.balance_amount), 0))
-            .filter(
+        debit_notes = (
+            select(func.coalesce(func.sum(DebitNote.balance_amount), 0).label("debit_notes_to_receive"))
+            .where(
                 DebitNote.business_id == business_id,
                 DebitNote.is_deleted == False,
                 func.lower(DebitNote.status) != "credited",
             )
-            .scalar()
+            .cte("debit_notes_outstanding")
         )
 
-        to_collect = round(float(invoices_to_collect) - credit_notes_offset + float(debit_notes_to_receive), 2)
-
         # ------- To Pay (Net Payables) -------
         # Sum of balance_due on all non-deleted, non-paid purchase invoices
-        invoices_to_pay = (
-            db.session.query(func.coalesce(func.sum(PurchaseInvoice.balance_due), 0))
-            .filter(
+        payables = (
+            select(func.coalesce(func.sum(PurchaseInvoice.balance_due), 0).label("invoices_to_pay"))
+            .where(
                 PurchaseInvoice.business_id == business_id,
                 PurchaseInvoice.is_deleted == False,
                 PurchaseInvoice.payment_status != "paid",
             )
-            .scalar()
+            .cte("payables")
         )
-        
-        # Credit notes refund added to To Pay (money owed to customers)
-        to_pay = round(float(invoices_to_pay) + credit_notes_refund, 2)
 
         # ------- Cash Book (Cash vs Bank Balance) -------
-        # Calculate from invoice payments since PaymentIn records are no longer created
-        
-        # Get payment info from invoices (amount_paid field stores total payments received)
-        total_payments_in = db.session.query(func.coalesce(func.sum(Invoice.amount_paid), 0)).filter(
-            Invoice.business_id == business_id,
-            Invoice.is_deleted == False,
-            Invoice.amount_paid > 0
-        ).scalar()
+        # Calculate from invoice payments since PaymentIn records are no longer created.
+        # All flows come from the maintained daily rollups (see app/utils/rollups.py):
+        # invoice amount_paid, 'credited' debit note receipts, credit note refunds
+        # and PaymentOut amounts, summed over the business's rollup rows.
+        cash_book = (
+            select(
+                func.coalesce(func.sum(DailyBusinessRollup.sales_received), 0).label("total_payments_in"),
+                func.coalesce(func.sum(DailyBusinessRollup.debit_notes_credited), 0).label("debit_notes_credited_amount"),
+                func.coalesce(func.sum(DailyBusinessRollup.credit_notes_refunded), 0).label("credit_notes_refunded_amount"),
+                func.coalesce(func.sum(DailyBusinessRollup.payments_total), 0).label("total_payments_out"),
+            )
+            .where(DailyBusinessRollup.business_id == business_id)
+            .cte("cash_book")
+        )
 
-        # Add payments received from 'credited' debit notes
-        debit_notes_credited_amount = db.session.query(func.coalesce(func.sum(DebitNote.amount_received), 0)).filter(
-            DebitNote.business_id == business_id,
-            DebitNote.is_deleted == False,
-            func.lower(DebitNote.status) == "credited"
-        ).scalar()
+        summary = db.session.execute(
+            select(receivables, credit_notes, debit_notes, payables, cash_book)
+            .select_from(
+                receivables
+                .join(credit_notes, true())
+                .join(debit_notes, true())
+                .join(payables, true())
+                .join(cash_book, true())
+            )
+        ).mappings().one()
 
-        # Subtract refunds paid to customers via credit notes
-        credit_notes_refunded_amount = db.session.query(func.coalesce(func.sum(CreditNote.amount_received), 0)).filter(
-            CreditNote.business_id == business_id,
-            CreditNote.is_deleted == False,
-            CreditNote.amount_received > 0
-        ).scalar()
-        
-        # PaymentOut remains the same (uses PaymentOut records)
-        pout_cash = db.session.query(func.coalesce(func.sum(PaymentOut.amount_paid), 0)).filter(
-            PaymentOut.business_id == business_id,
-            PaymentOut.is_deleted == False,
-            func.lower(PaymentOut.payment_mode) == 'cash'
-        ).scalar()
-        
-        pout_bank = db.session.query(func.coalesce(func.sum(PaymentOut.amount_paid), 0)).filter(
-            PaymentOut.business_id == business_id,
-            PaymentOut.is_deleted == False,
-            func.lower(PaymentOut.payment_mode) != 'cash'
-        ).scalar()
+        invoices_to_collect = float(summary["invoices_to_collect"])
+        credit_notes_offset = float(summary["credit_notes_offset"])
+        credit_notes_refund = float(summary["credit_notes_refund"])
+        debit_notes_to_receive = float(summary["debit_notes_to_receive"])
+        invoices_to_pay = float(summary["invoices_to_pay"])
+        credit_notes_refunded_amount = float(summary["credit_notes_refunded_amount"])
+
+        to_collect = round(invoices_to_collect - credit_notes_offset + debit_notes_to_receive, 2)
+
+        # Credit notes refund added to To Pay (money owed to customers)
+        to_pay = round(invoices_to_pay + credit_notes_refund, 2)
 
         # Sum all receipts (inflows)
-        total_receipts = float(total_payments_in) + float(debit_notes_credited_amount)
-        
+        total_receipts = float(summary["total_payments_in"]) + float(summary["debit_notes_credited_amount"])
+
         # Sum all payments (outflows)
-        total_payments = float(pout_cash) + float(pout_bank) + float(credit_notes_refunded_amount)
+        total_payments = float(summary["total_payments_out"]) + credit_notes_refunded_amount
 
-        # Since we can't distinguish cash vs bank from invoice payments alone, 
+        # Since we can't distinguish cash vs bank from invoice payments alone,
         # we'll show all payments as bank balance
         cash_in_hand = 0.0
         bank_balance = round(total_receipts - total_payments, 2)
@@ -186,19 +193,212 @@ def get_dashboard_summary():
             "cash_in_hand": cash_in_hand,
             "bank_balance": bank_balance,
             "cash_bank_balance": cash_bank_balance,
-            "total_receivables_gross": round(float(invoices_to_collect), 2),
+            "total_receivables_gross": round(invoices_to_collect, 2),
             "total_credit_notes": round(credit_notes_offset, 2),
-            "total_payables_gross": round(float(invoices_to_pay), 2),
-            "total_debit_notes": round(float(debit_notes_to_receive), 2),
+            "total_payables_gross": round(invoices_to_pay, 2),
+            "total_debit_notes": round(debit_notes_to_receive, 2),
             "credit_notes_refund": round(credit_notes_refund, 2),
-            "credit_notes_refunded_amount": round(float(credit_notes_refunded_amount), 2),
+            "credit_notes_refunded_amount": round(credit_notes_refunded_amount, 2),
         }), 200
 
     except Exception as e:
         return jsonify({"error": "Failed to load dashboard summary", "details": str(e)}), 500
 
 
+# ──────────────────────────────────────────
+# Latest-transactions timeline
+# ──────────────────────────────────────────
+
+LATEST_TRANSACTIONS_CURSOR = "latest-transactions"
+
+
+def _customer_name(customer):
+    full_name = func.trim(func.concat(func.coalesce(customer.first_name, ""), " ", func.coalesce(customer.last_name, "")))
+    return func.coalesce(func.nullif(full_name, ""), "-")
+
+
+def _vendor_name(vendor):
+    return func.coalesce(func.nullif(vendor.company_name, ""), func.nullif(vendor.vendor_name, ""), "-")
+
+
+def _timeline_select(kind, txn_type, uuid_col, route_path, date, txn_no, party_name, amount, sort_at):
+    """Project one document table onto the timeline's columns."""
+    return select(
+        literal(kind, String).label("kind"),
+        cast(uuid_col, String).label("record_id"),
+        route_path.label("route_path"),
+        cast(date, String).label("date"),
+        literal(txn_type, String).label("type"),
+        cast(txn_no, String).label("txn_no"),
+        party_name.label("party_name"),
+        func.coalesce(amount, 0).label("amount"),
+        sort_at.label("sort_at"),
+    )
+
+
+def _timeline_branch(kind, stmt, uuid_col, sort_at, after, limit):
+    """
+    Limit one timeline branch to rows after the cursor and to its own newest
+    ``limit`` rows, so each branch is a short scan of its (business_id, created_at) index.
+
+    The timeline is ordered by (sort_at, kind, record_id) descending.
+    """
+    record_id = cast(uuid_col, String)
+    stmt = stmt.where(sort_at.isnot(None))
+    if after is not None:
+        after_at, after_kind, after_id = after
+        if kind < after_kind:
+            stmt = stmt.where(sort_at <= after_at)
+        elif kind > after_kind:
+            stmt = stmt.where(sort_at < after_at)
+        else:
+            stmt = stmt.where(or_(sort_at < after_at, and_(sort_at == after_at, record_id < after_id)))
+    return stmt.order_by(sort_at.desc(), record_id.desc()).limit(limit)
+
+
+def _timeline_branches(business_id, after, limit):
+    from app.models.creditIn import CreditNotePayment
+
+    branches = []
+
+    # --- Sales Invoices ---
+    stmt = (
+        _timeline_select(
+            "invoice", "Sales Invoices", Invoice.uuid, func.concat("/invoices/", Invoice.uuid), Invoice.invoice_date,
+            Invoice.invoice_number, _customer_name(Customer), Invoice.total_amount, Invoice.created_at,
+        )
+        .select_from(Invoice)
+        .outerjoin(Customer, Customer.uuid == Invoice.customer_id)
+        .where(Invoice.business_id == business_id, Invoice.is_deleted == False)
+    )
+    branches.append(_timeline_branch("invoice", stmt, Invoice.uuid, Invoice.created_at, after, limit))
+
+    # --- Payment In ---
+    stmt = (
+        _timeline_select(
+            "payment_in", "Payment In", PaymentIn.uuid, func.concat("/payment-in/", PaymentIn.uuid), PaymentIn.payment_date,
+            PaymentIn.payment_number, func.coalesce(func.nullif(PaymentIn.party_name, ""), "-"),
+            PaymentIn.amount_received, PaymentIn.created_at,
+        )
+        .where(PaymentIn.business_id == business_id, PaymentIn.is_deleted == False)
+    )
+    branches.append(_timeline_branch("payment_in", stmt, PaymentIn.uuid, PaymentIn.created_at, after, limit))
+
+    # --- Invoice Payments (from amount_paid field, timed by the last invoice update) ---
+    stmt = (
+        _timeline_select(
+            "invoice_payment", "Payment In", Invoice.uuid, func.concat("/invoices/", Invoice.uuid), Invoice.updated_at,
+            func.concat("PAY-", Invoice.invoice_number), _customer_name(Customer),
+            Invoice.amount_paid, Invoice.updated_at,
+        )
+        .select_from(Invoice)
+        .outerjoin(Customer, Customer.uuid == Invoice.customer_id)
+        .where(Invoice.business_id == business_id, Invoice.is_deleted == False, Invoice.amount_paid > 0)
+    )
+    branches.append(_timeline_branch("invoice_payment", stmt, Invoice.uuid, Invoice.updated_at, after, limit))
+
+    # --- Payment Out ---
+    stmt = (
+        _timeline_select(
+            "payment_out", "Payment Out", PaymentOut.uuid, func.concat("/payment-out/", PaymentOut.uuid), PaymentOut.payment_date,
+            PaymentOut.payment_number, func.coalesce(func.nullif(PaymentOut.party_name, ""), "-"),
+            PaymentOut.amount_paid, PaymentOut.created_at,
+        )
+        .where(PaymentOut.business_id == business_id)
+    )
+    branches.append(_timeline_branch("payment_out", stmt, PaymentOut.uuid, PaymentOut.created_at, after, limit))
+
+    # --- Purchase Invoices ---
+    stmt = (
+        _timeline_select(
+            "purchase_invoice", "Purchase Invoices", PurchaseInvoice.uuid, func.concat("/purchases/purchase-invoices/", PurchaseInvoice.uuid),
+            PurchaseInvoice.invoice_date, PurchaseInvoice.invoice_number, _vendor_name(Vendor),
+            PurchaseInvoice.total_amount, PurchaseInvoice.created_at,
+        )
+        .select_from(PurchaseInvoice)
+        .outerjoin(Vendor, Vendor.uuid == PurchaseInvoice.vendor_id)
+        .where(PurchaseInvoice.business_id == business_id, PurchaseInvoice.is_deleted == False)
+    )
+    branches.append(_timeline_branch("purchase_invoice", stmt, PurchaseInvoice.uuid, PurchaseInvoice.created_at, after, limit))
+
+    # --- Purchase Orders (only "open" — closed/received POs are fulfilled) ---
+    # Overdue POs are closed by a scheduled job; hide ones it has not reached yet.
+    stmt = (
+        _timeline_select(
+            "purchase_order", "Purchase Orders", PurchaseOrder.uuid, func.concat("/purchases/purchase-orders/", PurchaseOrder.uuid),
+            PurchaseOrder.po_date, PurchaseOrder.po_number, _vendor_name(Vendor),
+            PurchaseOrder.total_amount, PurchaseOrder.created_at,
+        )
+        .select_from(PurchaseOrder)
+        .outerjoin(Vendor, Vendor.uuid == PurchaseOrder.vendor_id)
+        .where(
+            PurchaseOrder.business_id == business_id,
+            PurchaseOrder.status == "open",
+            or_(PurchaseOrder.delivery_date.is_(None), PurchaseOrder.delivery_date > func.current_date()),
+        )
+    )
+    branches.append(_timeline_branch("purchase_order", stmt, PurchaseOrder.uuid, PurchaseOrder.created_at, after, limit))
+
+    # --- Quotations ---
+    stmt = (
+        _timeline_select(
+            "quotation", "Quotation / Estimate", Quotation.uuid, func.concat("/quotes/", Quotation.uuid), Quotation.quotation_date,
+            Quotation.quotation_number, _customer_name(Customer), Quotation.total_amount, Quotation.created_at,
+        )
+        .select_from(Quotation)
+        .outerjoin(Customer, Customer.uuid == Quotation.customer_id)
+        .where(Quotation.business_id == business_id)
+    )
+    branches.append(_timeline_branch("quotation", stmt, Quotation.uuid, Quotation.created_at, after, limit))
+
+    # --- Credit Notes ---
+    stmt = (
+        _timeline_select(
+            "credit_note", "Credit Note", CreditNote.uuid, func.concat("/sales/credit-note/", CreditNote.uuid), CreditNote.credit_note_date,
+            CreditNote.credit_note_number, _customer_name(Customer), CreditNote.total_amount, CreditNote.created_at,
+        )
+        .select_from(CreditNote)
+        .outerjoin(Customer, Customer.uuid == CreditNote.customer_id)
+        .where(CreditNote.business_id == business_id, CreditNote.is_deleted == False)
+    )
+    branches.append(_timeline_branch("credit_note", stmt, CreditNote.uuid, CreditNote.created_at, after, limit))
+
+    # --- Credit Note Refund Payments (categorised as Payment Out since they are refunds) ---
+    stmt = (
+        _timeline_select(
+            "credit_note_refund", "Payment Out", CreditNotePayment.uuid,
+            func.concat("/sales/credit-note/", CreditNotePayment.credit_note_id),
+            CreditNotePayment.payment_date, func.concat("REF-", CreditNote.credit_note_number),
+            _customer_name(Customer), CreditNotePayment.payment_amount, CreditNotePayment.created_at,
+        )
+        .select_from(CreditNotePayment)
+        .join(CreditNote, CreditNote.uuid == CreditNotePayment.credit_note_id)
+        .outerjoin(Customer, Customer.uuid == CreditNote.customer_id)
+        .where(
+            CreditNote.business_id == business_id,
+            CreditNotePayment.is_deleted == False,
+            CreditNotePayment.status == "completed",
+        )
+    )
+    branches.append(_timeline_branch("credit_note_refund", stmt, CreditNotePayment.uuid, CreditNotePayment.created_at, after, limit))
+
+    # --- Debit Notes ---
+    stmt = (
+        _timeline_select(
+            "debit_note", "Debit Note", DebitNote.uuid, func.concat("/debit-note/view/", DebitNote.uuid), DebitNote.debit_note_date,
+            DebitNote.debit_note_number, _vendor_name(Vendor), DebitNote.total_amount, DebitNote.created_at,
+        )
+        .select_from(DebitNote)
+        .outerjoin(Vendor, Vendor.uuid == DebitNote.vendor_id)
+        .where(DebitNote.business_id == business_id, DebitNote.is_deleted == False)
+    )
+    branches.append(_timeline_branch("debit_note", stmt, DebitNote.uuid, DebitNote.created_at, after, limit))
+
+    return branches
+
+
 @dashboard_blueprint.route("/latest-transactions", methods=["GET"])
+@cached_dashboard_view("latest-transactions")
 def get_latest_transactions():
     """
     Returns the most recent transactions across invoices, purchase invoices,
@@ -211,320 +411,86 @@ def get_latest_transactions():
         in: query
         type: integer
         default: 5
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: next_cursor from the previous response, to load older transactions
     responses:
       200:
-        description: List of latest transactions
+        description: List of latest transactions and the cursor for the next page
+      400:
+        description: Invalid cursor
     """
     try:
-        business_id = g.get("business_id")
-        limit = int(request.args.get("limit", 5))
-        transactions = []
-
-        # Auto-close overdue POs so stale orders don't appear
-        from app.routes.purchase_order import auto_close_overdue_pos
-        try:
-            auto_close_overdue_pos()
-        except Exception:
-            pass
-
-        # --- Sales Invoices ---
-        try:
-            sinvs = (
-                Invoice.query
-                .filter(
-                    Invoice.business_id == business_id,
-                    Invoice.is_deleted == False,
-                )
-                .order_by(desc(Invoice.created_at))
-                .limit(limit)
-                .all()
-            )
-            for sinv in sinvs:
-                customer_name = "-"
-                if sinv.customer:
-                    customer_name = f"{sinv.customer.first_name or ''} {sinv.customer.last_name or ''}".strip() or "-"
-                transactions.append({
-                    "id": str(sinv.uuid),
-                    "route_path": f"/invoices/{sinv.uuid}",
-                    "date": str(sinv.invoice_date) if sinv.invoice_date else None,
-                    "type": "Sales Invoices",
-                    "txn_no": str(sinv.invoice_number),
-                    "party_name": customer_name,
-                    "amount": round(float(sinv.total_amount or 0), 2),
-                    "created_at": str(sinv.created_at) if sinv.created_at else None,
-                })
-        except Exception as e:
-            print("Error parsing Sales Invoices in latest transactions:", e)
-
-        # --- Payment In ---
-        try:
-            pay_ins = (
-                PaymentIn.query
-                .filter(
-                    PaymentIn.business_id == business_id,
-                    PaymentIn.is_deleted == False,
-                )
-                .order_by(desc(PaymentIn.created_at))
-                .limit(limit)
-                .all()
-            )
-            for pi in pay_ins:
-                transactions.append({
-                    "id": str(pi.uuid),
-                    "route_path": f"/payment-in/{pi.uuid}",
-                    "date": str(pi.payment_date) if pi.payment_date else None,
-                    "type": "Payment In",
-                    "txn_no": str(pi.payment_number),
-                    "party_name": pi.party_name or "-",
-                    "amount": round(float(pi.amount_received or 0), 2),
-                    "created_at": str(pi.created_at) if pi.created_at else None,
-                })
-        except Exception as e:
-            print("Error parsing Payment In transactions:", e)
-
-        # --- Invoice Payments (from amount_paid field) ---
-        try:
-            inv_payments = (
-                Invoice.query
-                .filter(
-                    Invoice.business_id == business_id,
-                    Invoice.is_deleted == False,
-                    Invoice.amount_paid > 0
-                )
-                .order_by(desc(Invoice.updated_at))
-                .limit(limit)
-                .all()
-            )
-            for inv in inv_payments:
-                customer_name = "-"
-                if inv.customer:
-                    customer_name = f"{inv.customer.first_name or ''} {inv.customer.last_name or ''}".strip() or "-"
-                transactions.append({
-                    "id": str(inv.uuid),
-                    "route_path": f"/invoices/{inv.uuid}",
-                    "date": str(inv.updated_at) if inv.updated_at else None,
-                    "type": "Payment In",
-                    "txn_no": f"PAY-{inv.invoice_number}",
-                    "party_name": customer_name,
-                    "amount": round(float(inv.amount_paid or 0), 2),
-                    "created_at": str(inv.updated_at) if inv.updated_at else None,
-                })
-        except Exception as e:
-            print("Error parsing Payment In transactions:", e)
-
-        # --- Payment Out ---
-        try:
-            pay_outs = (
-                PaymentOut.query
-                .filter(PaymentOut.business_id == business_id)
-                .order_by(desc(PaymentOut.created_at))
-                .limit(limit)
-                .all()
-            )
-            for po in pay_outs:
-                transactions.append({
-                    "id": str(po.uuid),
-                    "route_path": f"/payment-out/{po.uuid}",
-                    "date": str(po.payment_date) if po.payment_date else None,
-                    "type": "Payment Out",
-                    "txn_no": str(po.payment_number),
-                    "party_name": po.party_name or "-",
-                    "amount": round(float(po.amount_paid or 0), 2),
-                    "created_at": str(po.created_at) if po.created_at else None,
-                })
-        except Exception as e:
-            print("Error parsing Payment Out transactions:", e)
-
-        # --- Purchase Invoices ---
-        try:
-            pinvs = (
-                PurchaseInvoice.query
-                .filter(
-                    PurchaseInvoice.business_id == business_id,
-                    PurchaseInvoice.is_deleted == False,
-                )
-                .order_by(desc(PurchaseInvoice.created_at))
-                .limit(limit)
-                .all()
-            )
-            for pinv in pinvs:
-                vendor_name = "-"
-                if pinv.vendor:
-                    vendor_name = pinv.vendor.company_name or pinv.vendor.vendor_name or "-"
-                transactions.append({
-                    "id": str(pinv.uuid),
-                    "route_path": f"/purchases/purchase-invoices/{pinv.uuid}",
-                    "date": str(pinv.invoice_date) if pinv.invoice_date else None,
-                    "type": "Purchase Invoices",
-                    "txn_no": str(pinv.invoice_number),
-                    "party_name": vendor_name,
-                    "amount": round(float(pinv.total_amount or 0), 2),
-                    "created_at": str(pinv.created_at) if pinv.created_at else None,
-                })
-        except Exception as e:
-            print("Error parsing Purchase Invoices transactions:", e)
-
-        # --- Purchase Orders (only "open" — closed/received POs are fulfilled) ---
-        try:
-            pos = (
-                PurchaseOrder.query
-                .filter(
-                    PurchaseOrder.business_id == business_id,
-                    PurchaseOrder.status == "open",
-                )
-                .order_by(desc(PurchaseOrder.created_at))
-                .limit(limit)
-                .all()
-            )
-            for po_item in pos:
-                vendor_name = "-"
-                if po_item.vendor:
-                    vendor_name = po_item.vendor.company_name or po_item.vendor.vendor_name or "-"
-                transactions.append({
-                    "id": str(po_item.uuid),
-                    "route_path": f"/purchases/purchase-orders/{po_item.uuid}",
-                    "date": str(po_item.po_date) if po_item.po_date else None,
-                    "type": "Purchase Orders",
-                    "txn_no": str(po_item.po_number),
-                    "party_name": vendor_name,
-                    "amount": round(float(po_item.total_amount or 0), 2),
-                    "created_at": str(po_item.created_at) if po_item.created_at else None,
-                })
-        except Exception as e:
-            print("Error parsing Purchase Orders transactions:", e)
-
-        # --- Quotations ---
-        try:
-            quotations = (
-                Quotation.query
-                .filter(
-                    Quotation.business_id == business_id,
-                    Quotation.is_deleted == False,
-                )
-                .order_by(desc(Quotation.created_at))
-                .limit(limit)
-                .all()
-            )
-            for quot in quotations:
-                party_name = "-"
-                if quot.customer:
-                    party_name = f"{quot.customer.first_name or ''} {quot.customer.last_name or ''}".strip() or "-"
-                transactions.append({
-                    "id": str(quot.uuid),
-                    "route_path": f"/quotes/{quot.uuid}",
-                    "date": str(quot.quotation_date) if quot.quotation_date else None,
-                    "type": "Quotation / Estimate",
-                    "txn_no": str(quot.quotation_number),
-                    "party_name": party_name,
-                    "amount": round(float(quot.total_amount or 0), 2),
-                    "created_at": str(quot.created_at) if quot.created_at else None,
-                })
-        except Exception as e:
-            print("Error parsing Quotations transactions:", e)
-
-        # --- Credit Notes ---
-        try:
-            credit_notes = (
-                CreditNote.query
-                .filter(
-                    CreditNote.business_id == business_id,
-                    CreditNote.is_deleted == False,
-                )
-                .order_by(desc(CreditNote.created_at))
-                .limit(limit)
-                .all()
-            )
-            for cn in credit_notes:
-                party_name = "-"
-                if cn.customer:
-                    party_name = f"{cn.customer.first_name or ''} {cn.customer.last_name or ''}".strip() or "-"
-                transactions.append({
-                    "id": str(cn.uuid),
-                    "route_path": f"/sales/credit-note/{cn.uuid}",
-                    "date": str(cn.credit_note_date) if cn.credit_note_date else None,
-                    "type": "Credit Note",
-                    "txn_no": str(cn.credit_note_number),
-                    "party_name": party_name,
-                    "amount": round(float(cn.total_amount or 0), 2),
-                    "created_at": str(cn.created_at) if cn.created_at else None,
-                })
-        except Exception as e:
-            print("Error parsing Credit Notes transactions:", e)
-
-        # --- Credit Note Refund Payments ---
-        try:
-            from app.models.creditIn import CreditNotePayment
-            cn_payments = (
-                CreditNotePayment.query
-                .join(CreditNote)
-                .filter(
-                    CreditNote.business_id == business_id,
-                    CreditNotePayment.is_deleted == False,
-                    CreditNotePayment.status == "completed"
-                )
-                .order_by(desc(CreditNotePayment.created_at))
-                .limit(limit)
-                .all()
-            )
-            for cp in cn_payments:
-                party_name = "-"
-                if cp.credit_note and cp.credit_note.customer:
-                    cn_cust = cp.credit_note.customer
-                    party_name = f"{cn_cust.first_name or ''} {cn_cust.last_name or ''}".strip() or "-"
-                
-                transactions.append({
-                    "id": str(cp.uuid),
-                    "route_path": f"/sales/credit-note/{cp.credit_note_id}",
-                    "date": str(cp.payment_date) if cp.payment_date else None,
-                    "type": "Payment Out", # Categorize as Payment Out since it's a refund
-                    "txn_no": f"REF-{cp.credit_note.credit_note_number}" if cp.credit_note else "REF-CN",
-                    "party_name": party_name,
-                    "amount": round(float(cp.payment_amount or 0), 2),
-                    "created_at": str(cp.created_at) if cp.created_at else None,
-                })
-        except Exception as e:
-            print("Error parsing Credit Note Refund transactions:", e)
-
-        # --- Debit Notes ---
-        try:
-            debit_notes = (
-                DebitNote.query
-                .filter(
-                    DebitNote.business_id == business_id,
-                    DebitNote.is_deleted == False,
-                )
-                .order_by(desc(DebitNote.created_at))
-                .limit(limit)
-                .all()
-            )
-            for dn in debit_notes:
-                party_name = "-"
-                if dn.vendor:
-                    party_name = dn.vendor.company_name or dn.vendor.vendor_name or "-"
-                transactions.append({
-                    "id": str(dn.uuid),
-                    "route_path": f"/debit-note/view/{dn.uuid}",
-                    "date": str(dn.debit_note_date) if dn.debit_note_date else None,
-                    "type": "Debit Note",
-                    "txn_no": str(dn.debit_note_number),
-                    "party_name": party_name,
-                    "amount": round(float(dn.total_amount or 0), 2),
-                    "created_at": str(dn.created_at) if dn.created_at else None,
-                })
-        except Exception as e:
-            print("Error parsing Debit Notes transactions:", e)
-
-        # Sort all by created_at descending, take top `limit`
-        transactions.sort(key=lambda t: t.get("created_at") or "", reverse=True)
-        transactions = transactions[:limit]
-
-        return jsonify({"transactions": transactions}), 200
+        business_id = current_business_id()
+        limit = max(1, int(request.args.get("limit", 5)))
+
+        after = None
+        cursor = request.args.get("cursor")
+        if cursor:
+            after = tuple(decode_cursor(cursor, LATEST_TRANSACTIONS_CURSOR))
+            if len(after) != 3:
+                raise InvalidCursor("Malformed cursor")
+
+        # One UNION ALL over every document type; each branch contributes at most
+        # limit + 1 rows, and one more row than requested tells us there is a next page.
+        timeline = union_all(*_timeline_branches(business_id, after, limit + 1)).subquery("timeline")
+        rows = db.session.execute(
+            select(timeline)
+            .order_by(timeline.c.sort_at.desc(), timeline.c.kind.desc(), timeline.c.record_id.desc())
+            .limit(limit + 1)
+        ).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(LATEST_TRANSACTIONS_CURSOR, [last.sort_at, last.kind, last.record_id])
+
+        transactions = [
+            {
+                "id": row.record_id,
+                "route_path": row.route_path,
+                "date": row.date,
+                "type": row.type,
+                "txn_no": row.txn_no,
+                "party_name": row.party_name,
+                "amount": round(float(row.amount or 0), 2),
+                "created_at": str(row.sort_at),
+            }
+            for row in rows
+        ]
 
+        return jsonify({"transactions": transactions, "next_cursor": next_cursor}), 200
+
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Failed to load transactions", "details": str(e)}), 500
 
 
+def _bucket_start(day, unit, shift=0):
+    """First day of the ``unit`` bucket holding ``day`` (Python twin of date_trunc), moved ``shift`` buckets."""
+    if unit == "day":
+        return day + timedelta(days=shift)
+    if unit == "week":
+        return day - timedelta(days=day.weekday()) + timedelta(weeks=shift)
+    months = day.year * 12 + day.month - 1 + shift
+    return day.replace(year=months // 12, month=months % 12 + 1, day=1)
+
+
+def _bucket_count(start_date, end_date, unit):
+    """Number of ``unit`` buckets from the one holding start_date to the one holding end_date."""
+    if unit == "day":
+        return (end_date - start_date).days + 1
+    if unit == "week":
+        return (_bucket_start(end_date, unit) - _bucket_start(start_date, unit)).days // 7 + 1
+    return (end_date.year - start_date.year) * 12 + end_date.month - start_date.month + 1
+
+
 @dashboard_blueprint.route("/sales-report", methods=["GET"])
+@cached_dashboard_view("sales-report")
 def get_sales_report():
     """
     Returns aggregated sales data for charts.
@@ -542,99 +508,169 @@ def get_sales_report():
         in: query
         type: integer
         default: 7
+      - name: compare
+        in: query
+        type: string
+        description: >
+          "previous" adds the same number of buckets immediately before the
+          window: previous_value / previous_count per data point and a
+          previous totals block.
+      - name: cumulative
+        in: query
+        type: boolean
+        default: false
+        description: Add a running total (cumulative, and previous_cumulative with compare)
     responses:
       200:
         description: Sales chart data
     """
     try:
-        business_id = g.get("business_id")
+        business_id = current_business_id()
         period = request.args.get("period", "daily")
         days = int(request.args.get("days", 7))
+        compare = request.args.get("compare") == "previous"
+        cumulative = request.args.get("cumulative", "false").lower() == "true"
 
         today = datetime.utcnow().date()
         start_date = today - timedelta(days=days - 1)
 
-        # Get all non-deleted invoices in the date range
-        invoices = (
-            Invoice.query
+        unit = SALES_REPORT_BUCKETS.get(period, "month")
+        buckets = _bucket_count(start_date, today, unit)
+
+        # With compare=previous the series also covers the `buckets` buckets before the window
+        window_start = _bucket_start(start_date, unit)
+        previous_start = _bucket_start(start_date, unit, -buckets)
+        series_start = previous_start if compare else window_start
+
+        # Sum the daily rollup rows per date_trunc bucket in Postgres
+        bucket = func.date_trunc(unit, cast(DailyBusinessRollup.day, DateTime)).label("bucket")
+        sales = (
+            db.session.query(
+                bucket,
+                func.sum(DailyBusinessRollup.sales_total).label("value"),
+                func.sum(DailyBusinessRollup.sales_count).label("count"),
+            )
             .filter(
-                Invoice.business_id == business_id,
-                Invoice.is_deleted == False,
-                Invoice.invoice_date >= start_date,
-                Invoice.invoice_date <= today,
+                DailyBusinessRollup.business_id == business_id,
+                DailyBusinessRollup.day <= today,
+                # The window itself starts at start_date, even mid-bucket; the previous
+                # period is made of whole buckets
+                or_(
+                    DailyBusinessRollup.day >= start_date,
+                    and_(DailyBusinessRollup.day >= series_start, DailyBusinessRollup.day < window_start),
+                ),
             )
-            .all()
+            .group_by(bucket)
+            .subquery()
         )
 
-        total_sales = 0.0
-        invoices_made = 0
-
-        if period == "daily":
-            # Build a day-by-day bucket
-            data_points = []
-            for i in range(days):
-                d = start_date + timedelta(days=i)
-                day_total = sum(
-                    float(inv.total_amount)
-                    for inv in invoices
-                    if inv.invoice_date == d
-                )
-                day_count = sum(1 for inv in invoices if inv.invoice_date == d)
-                total_sales += day_total
-                invoices_made += day_count
-                data_points.append({
-                    "label": d.strftime("%a"),       # Thu, Fri, etc.
-                    "date": d.isoformat(),
-                    "value": round(day_total, 2),
-                    "count": day_count,
-                })
-        elif period == "weekly":
-            # Group by ISO week
-            from collections import OrderedDict
-            weeks = OrderedDict()
-            for inv in invoices:
-                week_num = inv.invoice_date.isocalendar()[1]
-                key = f"W{week_num}"
-                if key not in weeks:
-                    weeks[key] = {"value": 0.0, "count": 0}
-                weeks[key]["value"] += float(inv.total_amount)
-                weeks[key]["count"] += 1
-            data_points = [
-                {"label": k, "value": round(v["value"], 2), "count": v["count"]}
-                for k, v in weeks.items()
-            ]
-            total_sales = sum(d["value"] for d in data_points)
-            invoices_made = sum(d["count"] for d in data_points)
-        else:  # monthly
-            from collections import OrderedDict
-            months = OrderedDict()
-            for inv in invoices:
-                key = inv.invoice_date.strftime("%b %Y")
-                if key not in months:
-                    months[key] = {"value": 0.0, "count": 0}
-                months[key]["value"] += float(inv.total_amount)
-                months[key]["count"] += 1
-            data_points = [
-                {"label": k, "value": round(v["value"], 2), "count": v["count"]}
-                for k, v in months.items()
-            ]
-            total_sales = sum(d["value"] for d in data_points)
-            invoices_made = sum(d["count"] for d in data_points)
+        # Left-join the sums onto a continuous series so empty buckets come back as zero.
+        # Dates are cast to a plain timestamp; left alone, date_trunc would pick
+        # timestamptz and the session time zone.
+        series = func.generate_series(
+            cast(series_start, DateTime),
+            func.date_trunc(unit, cast(today, DateTime)),
+            literal_column(f"interval '1 {unit}'"),
+        ).table_valued("bucket").render_derived(name="series")
 
-        return jsonify({
+        value = func.coalesce(sales.c.value, 0)
+        count = func.coalesce(sales.c.count, 0)
+        in_window = series.c.bucket >= cast(window_start, DateTime)
+        filled = (
+            select(
+                series.c.bucket.label("bucket"),
+                in_window.label("in_window"),
+                value.label("value"),
+                count.label("count"),
+                # Running total, restarting at the start of the window
+                func.sum(value).over(partition_by=in_window, order_by=series.c.bucket).label("cumulative"),
+            )
+            .select_from(series)
+            .outerjoin(sales, sales.c.bucket == series.c.bucket)
+            .subquery("filled")
+        )
+
+        # The same bucket of the previous period sits exactly `buckets` rows earlier
+        ordered = filled.c.bucket
+        rows = db.session.execute(
+            select(
+                filled.c.bucket,
+                filled.c.in_window,
+                filled.c.value,
+                filled.c.count,
+                filled.c.cumulative,
+                func.lag(filled.c.bucket, buckets).over(order_by=ordered).label("previous_bucket"),
+                func.lag(filled.c.value, buckets).over(order_by=ordered).label("previous_value"),
+                func.lag(filled.c.count, buckets).over(order_by=ordered).label("previous_count"),
+                func.lag(filled.c.cumulative, buckets).over(order_by=ordered).label("previous_cumulative"),
+            ).order_by(ordered)
+        ).all()
+
+        # Week numbers repeat across years, so qualify them when the window spans two ISO years
+        spans_years = start_date.isocalendar()[0] != today.isocalendar()[0]
+
+        data_points = []
+        previous_sales = 0.0
+        previous_invoices = 0
+        for row in rows:
+            if not row.in_window:
+                continue
+            bucket_date = row.bucket.date()
+            if unit == "day":
+                label = bucket_date.strftime("%a")       # Thu, Fri, etc.
+            elif unit == "week":
+                iso_year, iso_week, _ = bucket_date.isocalendar()
+                label = f"W{iso_week} {iso_year}" if spans_years else f"W{iso_week}"
+            else:
+                label = bucket_date.strftime("%b %Y")
+            point = {
+                "label": label,
+                "date": bucket_date.isoformat(),
+                "value": round(float(row.value), 2),
+                "count": int(row.count),
+            }
+            if cumulative:
+                point["cumulative"] = round(float(row.cumulative), 2)
+            if compare:
+                point["previous_date"] = row.previous_bucket.date().isoformat() if row.previous_bucket else None
+                point["previous_value"] = round(float(row.previous_value or 0), 2)
+                point["previous_count"] = int(row.previous_count or 0)
+                previous_sales += point["previous_value"]
+                previous_invoices += point["previous_count"]
+                if cumulative:
+                    point["previous_cumulative"] = round(float(row.previous_cumulative or 0), 2)
+            data_points.append(point)
+
+        total_sales = sum(d["value"] for d in data_points)
+        invoices_made = sum(d["count"] for d in data_points)
+
+        report = {
             "period": period,
             "start_date": start_date.isoformat(),
             "end_date": today.isoformat(),
             "data_points": data_points,
             "total_sales": round(total_sales, 2),
             "invoices_made": invoices_made,
-        }), 200
+        }
+        if compare:
+            report["previous"] = {
+                "start_date": previous_start.isoformat(),
+                "end_date": (window_start - timedelta(days=1)).isoformat(),
+                "total_sales": round(previous_sales, 2),
+                "invoices_made": previous_invoices,
+            }
+            report["change_pct"] = (
+                round((total_sales - previous_sales) / previous_sales * 100, 1) if previous_sales else None
+            )
+
+        return jsonify(report), 200
 
     except Exception as e:
         return jsonify({"error": "Failed to load sales report", "details": str(e)}), 500
 
 
 @dashboard_blueprint.route("/overdue-summary", methods=["GET"])
+@cached_dashboard_view("overdue-summary")
 def get_overdue_summary():
     """
     Returns a summary of overdue invoices (past due_date, not fully paid).
@@ -646,7 +682,7 @@ def get_overdue_summary():
         description: Overdue invoice summary
     """
     try:
-        business_id = g.get("business_id")
+        business_id = current_business_id()
         today = datetime.utcnow().date()
 
         overdue_invoices = (
@@ -679,6 +715,7 @@ def get_overdue_summary():
 
 
 @dashboard_blueprint.route("/top-parties", methods=["GET"])
+@cached_dashboard_view("top-parties")
 def get_top_parties():
     """
     Returns top customers (receivable) or vendors (payable) by outstanding balance.
@@ -700,74 +737,377 @@ def get_top_parties():
         description: Top parties by outstanding balance
     """
     try:
-        business_id = g.get("business_id")
+        business_id = current_business_id()
         party_type = request.args.get("type", "receivable")
         limit = int(request.args.get("limit", 5))
 
-        parties = []
-
+        # Read the maintained per-party balances (see app/utils/party_balances.py)
+        # through idx_party_balances_business_type_outstanding
         if party_type == "receivable":
-            # Group invoices by customer, sum balance_due
-            results = (
-                db.session.query(
-                    Invoice.customer_id,
-                    func.sum(Invoice.balance_due).label("total_due"),
-                    func.count(Invoice.uuid).label("inv_count"),
-                )
-                .filter(
-                    Invoice.business_id == business_id,
-                    Invoice.is_deleted == False,
-                    Invoice.payment_status != "paid",
-                )
-                .group_by(Invoice.customer_id)
-                .order_by(func.sum(Invoice.balance_due).desc())
-                .limit(limit)
-                .all()
-            )
-
-            for customer_id, total_due, inv_count in results:
-                customer = Customer.query.get(customer_id)
-                if customer:
-                    name = f"{customer.first_name or ''} {customer.last_name or ''}".strip() or "-"
-                else:
-                    name = "-"
-                parties.append({
-                    "name": name,
-                    "amount": round(float(total_due or 0), 2),
-                    "count": inv_count,
-                })
+            party, party_name, balance_type = Customer, _customer_name(Customer), "customer"
         else:
-            # Group purchase invoices by vendor, sum balance_due
-            results = (
-                db.session.query(
-                    PurchaseInvoice.vendor_id,
-                    func.sum(PurchaseInvoice.balance_due).label("total_due"),
-                    func.count(PurchaseInvoice.uuid).label("inv_count"),
-                )
-                .filter(
-                    PurchaseInvoice.business_id == business_id,
-                    PurchaseInvoice.is_deleted == False,
-                    PurchaseInvoice.payment_status != "paid",
-                )
-                .group_by(PurchaseInvoice.vendor_id)
-                .order_by(func.sum(PurchaseInvoice.balance_due).desc())
-                .limit(limit)
-                .all()
+            party, party_name, balance_type = Vendor, _vendor_name(Vendor), "vendor"
+
+        results = (
+            db.session.query(party_name, PartyBalance.outstanding, PartyBalance.doc_count)
+            .select_from(PartyBalance)
+            .outerjoin(party, party.uuid == PartyBalance.party_id)
+            .filter(
+                PartyBalance.business_id == business_id,
+                PartyBalance.party_type == balance_type,
+                PartyBalance.doc_count > 0,
             )
+            .order_by(PartyBalance.outstanding.desc())
+            .limit(limit)
+            .all()
+        )
 
-            for vendor_id, total_due, inv_count in results:
-                vendor = Vendor.query.get(vendor_id) if vendor_id else None
-                if vendor:
-                    name = vendor.company_name or vendor.vendor_name or "-"
-                else:
-                    name = "-"
-                parties.append({
-                    "name": name,
-                    "amount": round(float(total_due or 0), 2),
-                    "count": inv_count,
-                })
+        parties = [
+            {"name": name, "amount": round(float(total_due or 0), 2), "count": inv_count}
+            for name, total_due, inv_count in results
+        ]
 
         return jsonify({"parties": parties}), 200
 
     except Exception as e:
         return jsonify({"error": "Failed to load top parties", "details": str(e)}), 500
+
+
+# ──────────────────────────────────────────
+# Aging report
+# ──────────────────────────────────────────
+
+# (response label, column name, first day, last day) — days past the due date;
+# items not yet due fall in the first bucket.
+AGING_BUCKETS = [
+    ("0-30", "days_0_30", None, 30),
+    ("31-60", "days_31_60", 31, 60),
+    ("61-90", "days_61_90", 61, 90),
+    ("90+", "days_90_plus", 91, None),
+]
+AGING_SIDES = ("receivable", "payable")
+DEFAULT_AGING_PARTY_LIMIT = 20
+MAX_AGING_PARTY_LIMIT = 100
+
+
+def _aging_ledger(side, business_id):
+    """
+    Open items of one side as (party_id, age_date, amount): unpaid invoice
+    balances, minus outstanding note balances aged from the note date.
+    """
+    if side == "receivable":
+        documents = select(
+            Invoice.customer_id.label("party_id"),
+            Invoice.due_date.label("age_date"),
+            Invoice.balance_due.label("amount"),
+        ).where(
+            Invoice.business_id == business_id,
+            Invoice.is_deleted == False,
+            Invoice.payment_status != "paid",
+        )
+        # Refund credit notes are owed to the customer, not offset against receivables
+        notes = select(
+            CreditNote.customer_id,
+            CreditNote.credit_note_date,
+            -CreditNote.balance_amount,
+        ).where(
+            CreditNote.business_id == business_id,
+            CreditNote.is_deleted == False,
+            CreditNote.status.notin_(("paid", "refunded")),
+            CreditNote.balance_amount > 0,
+        )
+    else:
+        documents = select(
+            PurchaseInvoice.vendor_id.label("party_id"),
+            func.coalesce(PurchaseInvoice.due_date, PurchaseInvoice.invoice_date).label("age_date"),
+            PurchaseInvoice.balance_due.label("amount"),
+        ).where(
+            PurchaseInvoice.business_id == business_id,
+            PurchaseInvoice.is_deleted == False,
+            PurchaseInvoice.payment_status != "paid",
+        )
+        notes = select(
+            DebitNote.vendor_id,
+            DebitNote.debit_note_date,
+            -DebitNote.balance_amount,
+        ).where(
+            DebitNote.business_id == business_id,
+            DebitNote.is_deleted == False,
+            func.lower(DebitNote.status) != "credited",
+            DebitNote.balance_amount > 0,
+        )
+    return union_all(documents, notes).subquery("ledger")
+
+
+def _aging_columns(ledger, today):
+    age = literal(today, Date) - ledger.c.age_date
+    columns = []
+    for _label, name, first_day, last_day in AGING_BUCKETS:
+        if first_day is None:
+            in_bucket = age <= last_day
+        elif last_day is None:
+            in_bucket = age >= first_day
+        else:
+            in_bucket = age.between(first_day, last_day)
+        columns.append(func.coalesce(func.sum(case((in_bucket, ledger.c.amount), else_=0)), 0).label(name))
+    columns.append(func.coalesce(func.sum(ledger.c.amount), 0).label("total"))
+    return columns
+
+
+def _aging_buckets(row):
+    return {
+        "buckets": {label: round(float(row[name]), 2) for label, name, _first, _last in AGING_BUCKETS},
+        "total": round(float(row["total"]), 2),
+    }
+
+
+def _aging_parties(side, business_id, today, limit, cursor):
+    """One page of per-party aging rows, largest balance first, and the next cursor."""
+    signature = f"aging-{side}"
+    ledger = _aging_ledger(side, business_id)
+    per_party = (
+        select(ledger.c.party_id, *_aging_columns(ledger, today))
+        .group_by(ledger.c.party_id)
+        .subquery("aging")
+    )
+
+    if side == "receivable":
+        party_name = _customer_name(Customer)
+        party_join = Customer.uuid == per_party.c.party_id
+        party = Customer
+    else:
+        party_name = _vendor_name(Vendor)
+        party_join = Vendor.uuid == per_party.c.party_id
+        party = Vendor
+
+    query = (
+        select(per_party, party_name.label("party_name"))
+        .select_from(per_party)
+        .outerjoin(party, party_join)
+        .where(per_party.c.total != 0)
+    )
+    if cursor:
+        values = decode_cursor(cursor, signature)
+        if len(values) != 2:
+            raise InvalidCursor("Malformed cursor")
+        query = query.where(tuple_(per_party.c.total, per_party.c.party_id) < tuple_(*values))
+
+    rows = db.session.execute(
+        query.order_by(per_party.c.total.desc(), per_party.c.party_id.desc()).limit(limit + 1)
+    ).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(signature, [rows[-1]["total"], rows[-1]["party_id"]])
+
+    parties = [
+        {"party_id": str(row["party_id"]), "name": row["party_name"], **_aging_buckets(row)}
+        for row in rows
+    ]
+    return parties, next_cursor
+
+
+@dashboard_blueprint.route("/aging", methods=["GET"])
+@cached_dashboard_view("aging")
+def get_aging_report():
+    """
+    Aging buckets (0-30 / 31-60 / 61-90 / 90+ days past due) of receivables
+    (invoices minus credit notes) and payables (purchase invoices minus debit notes).
+    ---
+    tags:
+      - Dashboard
+    parameters:
+      - name: type
+        in: query
+        type: string
+        description: receivable or payable. Defaults to both sides.
+      - name: by
+        in: query
+        type: string
+        description: "party" for a per-party drill-down of one side (requires type)
+      - name: limit
+        in: query
+        type: integer
+        default: 20
+        description: Parties per page in the drill-down (max 100)
+      - name: cursor
+        in: query
+        type: string
+        description: next_cursor of the previous drill-down page
+    responses:
+      200:
+        description: Bucket totals per side, or one page of per-party buckets
+      400:
+        description: Invalid type, grouping or cursor
+    """
+    try:
+        business_id = current_business_id()
+        today = datetime.utcnow().date()
+        side = request.args.get("type")
+        by = request.args.get("by")
+
+        if side is not None and side not in AGING_SIDES:
+            return jsonify({"error": f"type must be one of: {', '.join(AGING_SIDES)}"}), 400
+
+        if by == "party":
+            if side is None:
+                return jsonify({"error": "type is required with by=party"}), 400
+            limit = request.args.get("limit", DEFAULT_AGING_PARTY_LIMIT, type=int) or DEFAULT_AGING_PARTY_LIMIT
+            limit = max(1, min(limit, MAX_AGING_PARTY_LIMIT))
+            parties, next_cursor = _aging_parties(side, business_id, today, limit, request.args.get("cursor"))
+            return jsonify({
+                "as_of": today.isoformat(),
+                "type": side,
+                "parties": parties,
+                "next_cursor": next_cursor,
+            }), 200
+        if by is not None:
+            return jsonify({"error": "by must be 'party'"}), 400
+
+        result = {"as_of": today.isoformat()}
+        for each_side in (side,) if side else AGING_SIDES:
+            ledger = _aging_ledger(each_side, business_id)
+            row = db.session.execute(select(*_aging_columns(ledger, today))).mappings().one()
+            result[f"{each_side}s"] = _aging_buckets(row)
+        return jsonify(result), 200
+
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": "Failed to load aging report", "details": str(e)}), 500
+
+
+# ──────────────────────────────────────────
+# Batch
+# ──────────────────────────────────────────
+
+# ?widgets= name -> view; each is evaluated as if requested on its own
+DASHBOARD_WIDGETS = {
+    "summary": get_dashboard_summary,
+    "latest-transactions": get_latest_transactions,
+    "sales-report": get_sales_report,
+    "overdue-summary": get_overdue_summary,
+    "top-parties": get_top_parties,
+    "aging": get_aging_report,
+}
+
+# Request-scoped values the middleware puts on g; copied into pool threads
+_BATCH_CONTEXT_KEYS = ("tenant", "business_id", "role", "user_id", "user_status")
+
+_batch_executor = None
+_batch_executor_lock = threading.Lock()
+
+
+def _get_batch_executor(workers):
+    global _batch_executor
+    with _batch_executor_lock:
+        if _batch_executor is None:
+            _batch_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="dashboard-batch")
+        return _batch_executor
+
+
+def _widget_args(name):
+    """Query arguments for one widget: ``<widget>.<arg>=value`` becomes ``<arg>=value``."""
+    prefix = f"{name}."
+    return [(key[len(prefix):], value) for key, value in request.args.items(multi=True) if key.startswith(prefix)]
+
+
+def _run_widget(app, name, path, args):
+    """Evaluate one widget view in a request context carrying only its own arguments."""
+    with app.test_request_context(path, query_string=args):
+        response = app.make_response(DASHBOARD_WIDGETS[name]())
+        return {"status": response.status_code, "data": response.get_json(silent=True)}
+
+
+def _run_widget_in_thread(app, context, name, path, args):
+    # A fresh app context gives the thread its own DB session; the tenant comes along on g
+    with app.app_context():
+        for key, value in context.items():
+            setattr(g, key, value)
+        return _run_widget(app, name, path, args)
+
+
+@dashboard_blueprint.route("/batch", methods=["GET"])
+def get_dashboard_batch():
+    """
+    Evaluate several dashboard widgets in one request
+    ---
+    tags:
+      - Dashboard
+    parameters:
+      - name: widgets
+        in: query
+        type: string
+        description: >
+          Comma-separated widgets (summary, latest-transactions, sales-report,
+          overdue-summary, top-parties, aging). Defaults to the first five.
+          Pass a widget's own arguments as <widget>.<arg>, e.g.
+          sales-report.period=weekly or top-parties.type=payable.
+    responses:
+      200:
+        description: Map of widget name to its status code and response body
+      400:
+        description: Unknown widget requested
+    """
+    requested = request.args.get("widgets", "").strip()
+    if requested:
+        names = list(dict.fromkeys(w.strip() for w in requested.split(",") if w.strip()))
+    else:
+        names = [name for name in DASHBOARD_WIDGETS if name != "aging"]
+    unknown = [name for name in names if name not in DASHBOARD_WIDGETS]
+    if unknown:
+        return jsonify({
+            "error": f"Unknown widget(s): {', '.join(unknown)}",
+            "allowed_widgets": list(DASHBOARD_WIDGETS),
+        }), 400
+
+    app = current_app._get_current_object()
+    workers = int(app.config.get("DASHBOARD_BATCH_WORKERS", 4))
+    base_path = request.path.rsplit("/", 1)[0]
+    results = {}
+
+    if workers <= 1 or len(names) <= 1:
+        # Sequential: the pushed request contexts reuse this app context, so every
+        # widget shares the request's tenant context and DB session
+        for name in names:
+            results[name] = _run_widget(app, name, f"{base_path}/{name}", _widget_args(name))
+    else:
+        # Widgets are read-only and independent, so they can run side by side,
+        # each on its own pooled connection
+        context = {key: g.get(key) for key in _BATCH_CONTEXT_KEYS if key in g}
+        futures = {
+            name: _get_batch_executor(workers).submit(
+                _run_widget_in_thread, app, context, name, f"{base_path}/{name}", _widget_args(name),
+            )
+            for name in names
+        }
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = {"status": 500, "data": {"error": "Failed to load widget", "details": str(e)}}
+
+    return jsonify({"widgets": results}), 200
+
+
+# --- Dashboard Cache Statistics (Admin only) ---
+@dashboard_blueprint.route("/cache-stats", methods=["GET"])
+@role_required(["Admin"])
+def get_dashboard_cache_stats():
+    """
+    Hit counters of this worker's dashboard response cache
+    ---
+    tags:
+      - Dashboard
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Cache statistics for the worker that served the request
+    """
+    return jsonify({
+        "backend": current_app.config.get("DASHBOARD_CACHE_TYPE", "SimpleCache"),
+        "timeout": current_app.config.get("DASHBOARD_CACHE_TIMEOUT", 60),
+        **dashboard_cache_stats.as_dict(),
+    }), 200
@@ -1,20 +1,23 @@
 from flask import Blueprint, request, jsonify, current_app, send_file
-from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
-from sqlalchemy.orm import selectinload, joinedload
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import joinedload
 from sqlalchemy import func, and_, or_, desc, asc
 from app.extensions import db
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.streaming import stream_json_list
+from app.utils.sequences import next_document_number, peek_document_number
 from app.models.debit_note import DebitNote, DebitNoteItem, DebitNotePayment
 from app.models.vendor import Vendor
+from app.routes.vendor import vendor_names_query
 from app.models.inventory import Item
 from app.models.invoice import Invoice
 from app.models.purchase_invoice import PurchaseInvoice, PurchaseInvoiceItem
 from app.models import Customer
 from app.utils.decorators import login_required
-from app.config import Config
+from app.utils.tenant import current_tenant, current_business_id
+from app.utils.document_loader import document_load_options, item_image_data_uri, item_image_url, load_document, main_item_image
 from datetime import datetime
 import uuid
-import os
-import base64
 from app.services.pdf_service import generate_debit_note_pdf
 
 
@@ -103,97 +106,9 @@ def calculate_debit_note_balance_due(debit_note):
         return fallback_balance
 
 
-def generate_debit_note_number(max_retries=5):
-    """Generate a unique debit note number like DN-1834 with 4 digits - Production Ready"""
-    import time
-    import random
-    
-    for attempt in range(max_retries):
-        try:
-            
-            # Method 1: Try to get the MAX from active records only
-            result = db.session.execute(
-                db.text("""
-                    SELECT MAX(CAST(SUBSTRING(debit_note_number FROM 5) AS INTEGER)) as max_num 
-                    FROM debit_notes 
-                    WHERE debit_note_number LIKE 'DN-%' 
-                    AND debit_note_number ~ 'DN-[0-9]{4}$'
-                    AND is_deleted = FALSE
-                """)
-            )
-            max_num = result.scalar()
-            
-            # Method 2: Also check ALL records (including deleted) to avoid any conflicts
-            result_all = db.session.execute(
-                db.text("""
-                    SELECT MAX(CAST(SUBSTRING(debit_note_number FROM 5) AS INTEGER)) as max_num_all 
-                    FROM debit_notes 
-                    WHERE debit_note_number LIKE 'DN-%' 
-                    AND debit_note_number ~ 'DN-[0-9]{4}$'
-                """)
-            )
-            max_num_all = result_all.scalar()
-            
-            # Use the higher of the two to ensure no conflicts
-            effective_max = max(max_num or 0, max_num_all or 0)
-            
-            if effective_max >= 1000:
-                # Start from effective_max + 1
-                new_num = effective_max + 1
-                # Ensure it doesn't exceed 9999
-                if new_num > 9999:
-                    new_num = 1000  # Reset to 1000 if we exceed 9999
-            else:
-                new_num = 1000  # Start from DN-1000
-            
-            # Try up to 10 consecutive numbers to find a free one
-            for offset in range(10):
-                candidate_num = new_num + offset
-                if candidate_num > 9999:
-                    candidate_num = 1000 + (candidate_num - 10000)  # Wrap around
-                
-                candidate_number = f"DN-{candidate_num:04d}"
-                
-                # Check if this number exists in ANY state (active or deleted)
-                existing_any = DebitNote.query.filter_by(
-                    debit_note_number=candidate_number
-                ).first()
-                
-                if not existing_any:
-                    return candidate_number 
-                else:
-                    pass
-            
-            # If we get here, all 10 numbers were taken, try a random approach
-            for random_attempt in range(5):
-                random_num = random.randint(1000, 9999)
-                random_number = f"DN-{random_num:04d}"
-                
-                existing_random = DebitNote.query.filter_by(
-                    debit_note_number=random_number
-                ).first()
-                
-                if not existing_random:
-                    return random_number
-            
-            
-        except Exception as e:
-            
-            # Rollback any partial transaction
-            try:
-                db.session.rollback()
-            except:
-                pass
-        
-        # Brief delay before retry
-        if attempt < max_retries - 1:
-            time.sleep(0.1 * (attempt + 1))  # Increasing delay
-    
-    # Final fallback - use timestamp with random suffix
-    timestamp = int(time.time())
-    random_suffix = random.randint(100, 999)
-    fallback_num = (timestamp + random_suffix) % 9000 + 1000
-    return f"DN-{fallback_num:04d}"
+def generate_debit_note_number(business_id=None):
+    """Allocate the business's next debit note number (DN-1000, ...) in the current transaction"""
+    return next_document_number("debit_note", business_id)
 
 
 def update_purchase_invoice_payment_status(purchase_invoice_id):
@@ -324,7 +239,7 @@ def _date_filter_query(query, model, date_filter: str):
 def get_next_debit_note_number():
     """Get the next available debit note number for the business"""
     try:
-        next_number = generate_debit_note_number()
+        next_number = peek_document_number("debit_note")
         
         return jsonify({
             "success": True,
@@ -347,19 +262,9 @@ def get_next_debit_note_number():
 def create_debit_note():
     """Create a new debit note"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        
-                
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            # If JWT identity is a string (UUID), parse it
-            user_id = jwt_claims
-            business_id = 1  # Default fallback
-        else:
-            # If JWT claims is a dict, extract from claims
-            user_id = jwt_claims.get('sub') or jwt_claims.get('user_id')
-            business_id = jwt_claims.get('business_id', 1)
+        tenant = current_tenant()
+        business_id = tenant.business_id
+        user_id = tenant.user_id
         
         data = request.get_json()
         
@@ -371,10 +276,6 @@ def create_debit_note():
         if 'customer_id' in data and data['customer_id']:
             data['vendor_id'] = data['customer_id']
         
-        # Generate debit note number if not provided or empty
-        if not data.get('debit_note_number') or data.get('debit_note_number') == '':
-            data['debit_note_number'] = generate_debit_note_number()
-        
         # Validate required fields
         required_fields = ['vendor_id', 'debit_note_date']
         for field in required_fields:
@@ -385,8 +286,8 @@ def create_debit_note():
                     "status": 400
                 }), 400
         
-        # Check if debit note number already exists
-        existing_debit_note = DebitNote.query.filter_by(
+        # Check if a provided debit note number already exists in this business
+        existing_debit_note = data.get('debit_note_number') and DebitNote.query.filter_by(
             debit_note_number=data['debit_note_number'],
             is_deleted=False
         ).first()
@@ -565,6 +466,11 @@ def create_debit_note():
             amount_received = 0
             balance_amount = total_amount
         
+        # Generate debit note number if not provided or empty; allocated last so
+        # the sequence row stays locked only for the insert and commit
+        if not data.get('debit_note_number'):
+            data['debit_note_number'] = generate_debit_note_number(business_id)
+        
         # Create debit note
         debit_note = DebitNote(
             debit_note_number=data['debit_note_number'],
@@ -712,14 +618,7 @@ def create_debit_note():
 def get_purchase_invoice_for_debit_note(invoice_id):
     """Get purchase invoice details for creating debit note"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            business_id = 1  # Default fallback
-        else:
-            business_id = jwt_claims.get('business_id', 1)
+        business_id = current_business_id()
         
         # Get purchase invoice with vendor details
         invoice = PurchaseInvoice.query.filter_by(
@@ -770,14 +669,7 @@ def get_purchase_invoice_for_debit_note(invoice_id):
 def get_available_purchase_invoices():
     """Get purchase invoices that don't have existing debit notes"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            business_id = 1  # Default fallback
-        else:
-            business_id = jwt_claims.get('business_id', 1)
+        business_id = current_business_id()
         
         # Get subquery for invoice IDs that have debit notes
         invoices_with_debit_notes = db.session.query(DebitNote.invoice_id).filter(
@@ -829,14 +721,7 @@ def get_available_purchase_invoices():
 def get_debit_note_dropdown():
     """Get dropdown data for debit note filters - vendor names with UUID and invoice numbers"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            business_id = 1  # Default fallback
-        else:
-            business_id = jwt_claims.get('business_id', 1)
+        business_id = current_business_id()
         
         dropdown_type = request.args.get('type', '').strip()
         
@@ -923,14 +808,7 @@ def get_debit_note_dropdown():
 def get_debit_notes():
     """List all debit notes with pagination and filtering"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            business_id = 1  # Default fallback
-        else:
-            business_id = jwt_claims.get('business_id', 1)
+        business_id = current_business_id()
         
         # Get query parameters
         page = request.args.get('page', 1, type=int)
@@ -967,7 +845,7 @@ def get_debit_notes():
 
         if request.args.get("vendor_dropdown_all") == "true":
             # Get all vendors that have debit notes
-            vendor_query = db.session.query(Vendor.uuid, Vendor.vendor_name, Vendor.company_name).distinct()
+            vendor_query = Vendor.query
             
             # Only filter by business_id if it's available
             if business_id:
@@ -976,17 +854,11 @@ def get_debit_notes():
                     DebitNote.business_id == business_id
                 )
             
-            rows = vendor_query.all()
-            
-            # Format response to match purchase_order format
-            result = []
-            for r in rows:
-                if r.uuid:
-                    name = r.vendor_name or r.company_name or ""
-                    if name:
-                        result.append({"uuid": str(r.uuid), "name": name})
-            result.sort(key=lambda x: x["name"].lower())
-            return jsonify(result), 200
+            # Same format as the purchase_order vendor dropdown
+            return stream_json_list(
+                vendor_names_query(vendor_query),
+                lambda r: {"uuid": str(r.uuid), "name": r.name},
+            )
 
         if request.args.get("vendor_names_dropdown") == "true":
             # Get vendor names for dropdown
@@ -1103,11 +975,7 @@ def get_debit_notes():
             query = query.order_by(desc(DebitNote.debit_note_date), desc(DebitNote.created_at))
         
         # Paginate
-        pagination = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False
-        )
+        pagination = paginate(query, page=page, per_page=per_page)
         
         # Serialize data
         debit_notes = []
@@ -1154,12 +1022,15 @@ def get_debit_notes():
                     "current_page": pagination.page,
                     "last_page": pagination.pages,
                     "per_page": per_page,
-                    "total": pagination.total
+                    "total": pagination.total,
+                    "next_cursor": pagination.next_cursor
                 }
             },
             "status": 200
         }), 200
         
+    except InvalidCursor as e:
+        return jsonify({"success": False, "error": str(e)}), 400
     except Exception as e:
         return jsonify({
             "success": False,
@@ -1175,22 +1046,14 @@ def get_debit_notes():
 def get_debit_note(debit_note_id):
     """Get a specific debit note by ID"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
+        business_id = current_business_id()
         
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            business_id = 1  # Default fallback
-        else:
-            business_id = jwt_claims.get('business_id', 1)
-        
-        debit_note = DebitNote.query.options(
-            joinedload(DebitNote.items)
-        ).filter_by(
+        debit_note = load_document(
+            DebitNote,
             uuid=debit_note_id,
             business_id=business_id,
             is_deleted=False
-        ).first()
+        )
         
         if not debit_note:
             return jsonify({"error": "Debit note not found"}), 404
@@ -1221,14 +1084,8 @@ def get_debit_note(debit_note_id):
         # Get items
         items = []
         for item in debit_note.items:
-            item_image = None
-            if item.item and item.item.images:
-                main_img = next((img for img in item.item.images if img.is_main), None)
-                if not main_img and item.item.images:
-                    main_img = item.item.images[0]
-                if main_img:
-                    item_image = f"/static/itemImages/{main_img.item_id}/{main_img.image}"
-                    
+            item_image = item_image_url(main_item_image(item.item))
+
             items.append({
                 "uuid": item.uuid,
                 "item_id": item.item_id,
@@ -1361,16 +1218,9 @@ def _build_debit_note_item(item_data):
 def update_debit_note(debit_note_id):
     """Update an existing debit note"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            user_id = jwt_claims
-            business_id = 1  # Default fallback
-        else:
-            user_id = jwt_claims.get('sub') or jwt_claims.get('user_id')
-            business_id = jwt_claims.get('business_id', 1)
+        tenant = current_tenant()
+        business_id = tenant.business_id
+        user_id = tenant.user_id
         
         data = request.get_json()
         
@@ -1566,14 +1416,7 @@ def update_debit_note(debit_note_id):
 def check_invoice_debit_notes(invoice_id):
     """Check if debit notes already exist for a given invoice"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            business_id = 1  # Default fallback
-        else:
-            business_id = jwt_claims.get('business_id', 1)
+        business_id = current_business_id()
         
         # Check if invoice exists (both types)
         invoice = None
@@ -1639,16 +1482,9 @@ def check_invoice_debit_notes(invoice_id):
 def delete_debit_note(debit_note_id):
     """Delete a debit note (soft delete)"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            business_id = 1  # Default fallback
-            user_id = jwt_claims
-        else:
-            business_id = jwt_claims.get('business_id', 1)
-            user_id = jwt_claims.get('sub') or jwt_claims.get('user_id')
+        tenant = current_tenant()
+        business_id = tenant.business_id
+        user_id = tenant.user_id
         
         debit_note = DebitNote.query.filter_by(
             uuid=debit_note_id,
@@ -1696,14 +1532,7 @@ def delete_debit_note(debit_note_id):
 def get_debit_note_statistics():
     """Get debit note statistics for dashboard"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            business_id = 1  # Default fallback
-        else:
-            business_id = jwt_claims.get('business_id', 1)
+        business_id = current_business_id()
         
         # Get counts by status
         status_counts = db.session.query(
@@ -1780,16 +1609,9 @@ def get_debit_note_statistics():
 def create_debit_note_payment(debit_note_id):
     """Record a payment for a debit note"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            business_id = 1  # Default fallback
-            user_id = jwt_claims
-        else:
-            business_id = jwt_claims.get('business_id', 1)
-            user_id = jwt_claims.get('sub') or jwt_claims.get('user_id')
+        tenant = current_tenant()
+        business_id = tenant.business_id
+        user_id = tenant.user_id
         data = request.get_json()
         
         # Validate debit note exists
@@ -1871,14 +1693,7 @@ def create_debit_note_payment(debit_note_id):
 def get_debit_note_payments(debit_note_id):
     """Get payment history for a debit note"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            business_id = 1  # Default fallback
-        else:
-            business_id = jwt_claims.get('business_id', 1)
+        business_id = current_business_id()
         
         # Validate debit note exists
         debit_note = DebitNote.query.filter_by(
@@ -1930,7 +1745,7 @@ def download_debit_note_pdf(debit_note_id):
     try:
         debit_note = DebitNote.query.options(
             joinedload(DebitNote.business),
-            joinedload(DebitNote.vendor)
+            *document_load_options(DebitNote)
         ).get_or_404(debit_note_id)
 
         # Build items data (with product names, HSN codes, and images)
@@ -1944,30 +1759,14 @@ def download_debit_note_pdf(debit_note_id):
                 "tax": item.tax or {},
                 "total_price": float(item.total_price) if item.total_price else 0,
             }
-            if item.item_id:
-                inventory_item = Item.query.options(
-                    selectinload(Item.images)
-                ).get(item.item_id)
-                if inventory_item:
-                    item_info["product_name"] = inventory_item.item_name
-                    item_info["hsn_sac_code"] = inventory_item.hsn_code
-                    # Get the feature image for the item
-                    main_image_obj = next((img for img in (inventory_item.images or []) if img.is_main), None)
-                    if not main_image_obj and inventory_item.images:
-                        main_image_obj = inventory_item.images[0]
-                    if main_image_obj:
-                        # Resolve absolute path for PDF generation
-                        image_path = os.path.join(Config.ITEM_IMAGES_FOLDER, str(main_image_obj.item_id), main_image_obj.image)
-                        if os.path.exists(image_path):
-                            try:
-                                with open(image_path, "rb") as img_file:
-                                    encoded_string = base64.b64encode(img_file.read()).decode('utf-8')
-                                    extension = os.path.splitext(image_path)[1].lower()
-                                    mime_type = "image/png" if extension == ".png" else "image/jpeg"
-                                    item_info["image"] = f"data:{mime_type};base64,{encoded_string}"
-                            except Exception as e:
-                                current_app.logger.error(f"Error encoding image for PDF: {e}")
-                                item_info["image"] = None
+            inventory_item = item.item
+            if inventory_item:
+                item_info["product_name"] = inventory_item.item_name
+                item_info["hsn_sac_code"] = inventory_item.hsn_code
+                # Feature image embedded for PDF generation
+                image = main_item_image(inventory_item)
+                if image:
+                    item_info["image"] = item_image_data_uri(image)
             items_data.append(item_info)
 
         pdf_buffer = generate_debit_note_pdf(debit_note, items_data)
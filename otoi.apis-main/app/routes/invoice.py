@@ -1,38 +1,53 @@
-from flask import Blueprint, request, jsonify, send_file, g
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy import or_, func, desc, asc, and_
-from sqlalchemy.orm import selectinload
-import base64
-import os
+from collections import Counter
+from flask import Blueprint, request, jsonify, send_file, g, current_app
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy import func, desc, asc, and_
+from sqlalchemy.orm import aliased
 from app.models.paymentIn import PaymentIn
 from datetime import datetime
 from app.extensions import db
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.streaming import stream_json_list
+from app.utils.sequences import next_document_number, next_document_numbers
 from app.models.invoice import Invoice, InvoiceItem
 from app.models.customer import Customer
+from app.models.quotation import Quotation
+from app.utils.search import apply_search, display_name_expr, full_name_expr
 from app.models.creditIn import CreditNote
-from app.models.inventory import Item
 from app.services.pdf_service import generate_invoice_pdf
 from app.utils.stamping import set_updated_fields
 from app.routes.creditIn import update_invoice_payment_status
 from app.utils.decorators import login_required
+from app.utils.tenant import current_business_id
+from app.utils.document_loader import document_load_options, item_image_data_uri, item_image_url, main_item_image
 import uuid
 from datetime import datetime, timedelta, date
-from app.config import Config
 
 
 invoice_blueprint = Blueprint("invoice", __name__)
 
 
-def generate_invoice_number():
-    """Generate a unique invoice number like INV-1001"""
-    last_invoice = Invoice.query.order_by(Invoice.created_at.desc()).first()
-    if last_invoice and last_invoice.invoice_number:
-        try:
-            last_num = int(last_invoice.invoice_number.split('-')[1])
-            return f"INV-{last_num + 1}"
-        except (IndexError, ValueError):
-            pass
-    return "INV-1001"
+def _customer_names_query(invoice_query):
+    """Distinct named customers of the invoices in ``invoice_query``, ordered by name (case-insensitive)."""
+    name = display_name_expr(Customer)
+    sort_name = func.lower(name).label("sort_name")
+    return (
+        invoice_query
+        .join(Customer, Invoice.customer_id == Customer.uuid)
+        .filter(name != "")
+        .with_entities(Customer.uuid, name.label("name"), sort_name)
+        .distinct()
+        .order_by(sort_name, Customer.uuid)
+    )
+
+
+def _customer_name_option(customer):
+    return {"uuid": str(customer.uuid), "name": customer.name}
+
+
+def generate_invoice_number(business_id=None):
+    """Allocate the business's next invoice number (INV-1001, ...) in the current transaction"""
+    return next_document_number("invoice", business_id)
 
 def _build_invoice_item(item_data):
     discount = {
@@ -65,6 +80,51 @@ def _calculate_total_amount(charges):
     return subtotal + tax_total - discount_total + additional_charges_total + round_off
 
 
+def _build_invoice(data, invoice_number):
+    """Build an Invoice (with its items) from a create payload."""
+    # Build charges JSON
+    charges = {
+        "subtotal": data.get("subtotal", 0),
+        "tax_total": data.get("total_tax", 0),
+        "discount_total": data.get("total_discount", 0),
+        "additional_charges_total": data.get("additional_charges_total", 0),
+        "round_off": data.get("round_off", 0),
+    }
+
+    # Build additional_notes JSON
+    additional_notes = {
+        "notes": data.get("notes", ""),
+        "terms_and_conditions": data.get("terms_and_conditions", ""),
+        "payment_terms": data.get("payment_terms", ""),
+    }
+
+    # Calculate balance due
+    total_amount = float(data.get("total_amount", 0))
+    amount_paid = float(data.get("amount_paid", 0))
+    payment_discount = float(data.get("payment_discount", 0))
+    balance_due = round(total_amount - amount_paid - payment_discount, 2)
+
+    invoice = Invoice(
+        invoice_number=invoice_number,
+        quotation_id=data.get("quotation_id"),
+        business_id=data["business_id"],
+        customer_id=data["customer_id"],
+        invoice_date=data["invoice_date"],
+        due_date=data.get("due_date") or (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d"),
+        total_amount=total_amount,
+        amount_paid=amount_paid,
+        balance_due=balance_due,
+        payment_discount=payment_discount,
+        charges=charges,
+        payment_status="paid" if balance_due <= 0 else ("partial" if amount_paid > 0 else "unpaid"),
+        additional_notes=additional_notes,
+    )
+    # Items are inserted after the header in the same flush, batched per table
+    for item_data in data.get("items", []):
+        invoice.items.append(_build_invoice_item(item_data))
+    return invoice
+
+
 @invoice_blueprint.route("/", methods=["POST"])
 def create_invoice():
     """
@@ -163,53 +223,10 @@ def create_invoice():
     
     try:
         # Generate invoice number
-        invoice_number = data.get("invoice_number") or generate_invoice_number()
-        
-        # Build charges JSON
-        charges = {
-            "subtotal": data.get("subtotal", 0),
-            "tax_total": data.get("total_tax", 0),
-            "discount_total": data.get("total_discount", 0),
-            "additional_charges_total": data.get("additional_charges_total", 0),
-            "round_off": data.get("round_off", 0),
-        }
-        
-        # Build additional_notes JSON
-        additional_notes = {
-            "notes": data.get("notes", ""),
-            "terms_and_conditions": data.get("terms_and_conditions", ""),
-            "payment_terms": data.get("payment_terms", ""),
-        }
-        
-        # Calculate balance due
-        total_amount = float(data.get("total_amount", 0))
-        amount_paid = float(data.get("amount_paid", 0))
-        payment_discount = float(data.get("payment_discount", 0))
-        balance_due = round(total_amount - amount_paid - payment_discount, 2)
+        invoice_number = data.get("invoice_number") or generate_invoice_number(data["business_id"])
         
-        invoice = Invoice(
-            invoice_number=invoice_number,
-            quotation_id=data.get("quotation_id"),
-            business_id=data["business_id"],
-            customer_id=data["customer_id"],
-            invoice_date=data["invoice_date"],
-            due_date=data.get("due_date") or (datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d"),
-            total_amount=total_amount,
-            amount_paid=amount_paid,
-            balance_due=balance_due,
-            payment_discount=payment_discount,
-            charges=charges,
-            payment_status="paid" if balance_due <= 0 else ("partial" if amount_paid > 0 else "unpaid"),
-            additional_notes=additional_notes,
-        )
+        invoice = _build_invoice(data, invoice_number)
         db.session.add(invoice)
-        db.session.flush()
-
-        # Process items
-        for item_data in data.get("items", []):
-            item = _build_invoice_item(item_data)
-            item.invoice_id = invoice.uuid
-            db.session.add(item)
 
         # If created from quotation, update quotation status
         if data.get("quotation_id"):
@@ -236,6 +253,175 @@ def create_invoice():
         return jsonify({"error": "An error occurred", "details": str(e)}), 500
 
 
+def _bulk_invoice_error(data):
+    """Validation error of one bulk invoice payload, or None."""
+    if not isinstance(data, dict):
+        return "Invoice must be an object"
+    for field in ("business_id", "customer_id", "invoice_date"):
+        if not data.get(field):
+            return f"Missing required field: {field}"
+    try:
+        int(data["business_id"])
+    except (TypeError, ValueError):
+        return "business_id must be an integer"
+    try:
+        uuid.UUID(str(data["customer_id"]))
+    except ValueError:
+        return "customer_id must be a UUID"
+    for field in ("invoice_date", "due_date"):
+        if data.get(field):
+            try:
+                date.fromisoformat(str(data[field]))
+            except ValueError:
+                return f"{field} must be a YYYY-MM-DD date"
+    for field in ("total_amount", "amount_paid", "payment_discount"):
+        try:
+            float(data.get(field, 0))
+        except (TypeError, ValueError):
+            return f"{field} must be a number"
+    items = data.get("items", [])
+    if not isinstance(items, list):
+        return "items must be a list"
+    for position, item in enumerate(items):
+        if not isinstance(item, dict) or item.get("quantity") is None:
+            return f"items[{position}]: quantity is required"
+    return None
+
+
+def _insert_bulk_invoices(rows):
+    """
+    Number, add and flush the invoices of ``rows`` ([(index, payload)]).
+    Numbers are allocated with one sequence call per business; the flush
+    writes headers and items as multi-row INSERTs. Returns [(index, invoice)].
+    """
+    counts = Counter(int(data["business_id"]) for _, data in rows if not data.get("invoice_number"))
+    numbers = {
+        business_id: iter(next_document_numbers("invoice", count, business_id))
+        for business_id, count in sorted(counts.items())
+    }
+
+    created = []
+    for index, data in rows:
+        invoice_number = data.get("invoice_number") or next(numbers[int(data["business_id"])])
+        created.append((index, _build_invoice(data, invoice_number)))
+    db.session.add_all([invoice for _, invoice in created])
+
+    quotation_ids = {data["quotation_id"] for _, data in rows if data.get("quotation_id")}
+    if quotation_ids:
+        for quotation in Quotation.query.filter(Quotation.uuid.in_(quotation_ids)):
+            quotation.status = "invoiced"
+
+    db.session.flush()
+    return created
+
+
+@invoice_blueprint.route("/bulk", methods=["POST"])
+@login_required
+def create_invoices_bulk():
+    """
+    Create many invoices in one request
+    ---
+    tags:
+      - Invoices
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            required:
+              - invoices
+            properties:
+              invoices:
+                type: array
+                description: Invoice payloads as accepted by POST /api/invoices/
+                items:
+                  type: object
+              atomic:
+                type: boolean
+                default: true
+                description: >
+                  true creates all invoices or none; false creates every valid
+                  invoice and reports the rest in errors
+    responses:
+      201:
+        description: Invoices created (with per-row errors when atomic is false)
+      400:
+        description: Validation error (including a business_id other than the caller's), or no invoice could be created
+      403:
+        description: The token carries no business
+      500:
+        description: Server error
+    """
+    payload = request.get_json(silent=True) or {}
+    rows = payload.get("invoices") if isinstance(payload, dict) else payload
+    atomic = payload.get("atomic", True) if isinstance(payload, dict) else True
+    if isinstance(atomic, str):
+        atomic = atomic.lower() != "false"
+
+    if not isinstance(rows, list) or not rows:
+        return jsonify({"error": "invoices must be a non-empty list"}), 400
+    max_rows = current_app.config.get("INVOICE_BULK_MAX_ROWS", 500)
+    if len(rows) > max_rows:
+        return jsonify({"error": f"At most {max_rows} invoices per request"}), 400
+
+    # Invoices only ever go to the caller's business; a payload may repeat it but not name another
+    business_id = current_business_id()
+    if business_id is None:
+        return jsonify({"error": "No business selected"}), 403
+
+    valid, errors = [], []
+    for index, data in enumerate(rows):
+        error = None
+        if isinstance(data, dict):
+            if data.get("business_id") not in (None, "") and str(data["business_id"]) != str(business_id):
+                error = "business_id does not match the current business"
+            data = {**data, "business_id": business_id}
+        error = error or _bulk_invoice_error(data)
+        if error:
+            errors.append({"index": index, "error": error})
+        else:
+            valid.append((index, data))
+
+    try:
+        if atomic:
+            if errors:
+                return jsonify({"error": "Validation failed", "errors": errors}), 400
+            created = _insert_bulk_invoices(valid)
+        else:
+            try:
+                with db.session.begin_nested():
+                    created = _insert_bulk_invoices(valid)
+            except DBAPIError:
+                # A row the database rejects (unknown customer, duplicate number)
+                # fails the whole flush; retry row by row to isolate it. Each
+                # failed savepoint also gives back the number it allocated.
+                created = []
+                for index, data in valid:
+                    try:
+                        with db.session.begin_nested():
+                            created.extend(_insert_bulk_invoices([(index, data)]))
+                    except DBAPIError as e:
+                        errors.append({"index": index, "error": str(e.orig).strip()})
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        return jsonify({"error": "Integrity error", "details": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "An error occurred", "details": str(e)}), 500
+
+    errors.sort(key=lambda error: error["index"])
+    return jsonify({
+        "message": f"{len(created)} invoice(s) created",
+        "created": [
+            {"index": index, "invoice_uuid": str(invoice.uuid), "invoice_number": invoice.invoice_number}
+            for index, invoice in sorted(created, key=lambda row: row[0])
+        ],
+        "errors": errors,
+    }), 201 if created else 400
+
+
 @invoice_blueprint.route("/", methods=["GET"])
 def get_invoices():
     """
@@ -323,41 +509,31 @@ def get_invoices():
         # Apply search filters with priority to search parameter
         if search:
             # If search parameter is provided, use it for both party name and invoice number
-            # Also handle multiple spaces by normalizing them
-            normalized_search = ' '.join(search.split())
-            query = query.outerjoin(Customer, Invoice.customer_id == Customer.uuid).filter(
-                or_(
-                    Invoice.invoice_number.ilike(f'%{search}%'),
-                    Customer.first_name.ilike(f'%{search}%'),
-                    Customer.last_name.ilike(f'%{search}%'),
-                    func.concat(Customer.first_name, ' ', Customer.last_name).ilike(f'%{search}%'),
-                    func.concat(Customer.first_name, ' ', Customer.last_name).ilike(f'%{normalized_search}%')
-                )
+            query = apply_search(
+                query.outerjoin(Customer, Invoice.customer_id == Customer.uuid),
+                search,
+                Invoice.invoice_number,
+                full_name_expr(Customer),
             )
         else:
             # If no search parameter, check individual filters
             if party_name:
-                # Handle multiple spaces by normalizing them
-                normalized_party_name = ' '.join(party_name.split())
-                query = query.outerjoin(Customer, Invoice.customer_id == Customer.uuid).filter(
-                    or_(
-                        Customer.first_name.ilike(f'%{party_name}%'),
-                        Customer.last_name.ilike(f'%{party_name}%'),
-                        func.concat(Customer.first_name, ' ', Customer.last_name).ilike(f'%{party_name}%'),
-                        func.concat(Customer.first_name, ' ', Customer.last_name).ilike(f'%{normalized_party_name}%')
-                    )
+                query = apply_search(
+                    query.outerjoin(Customer, Invoice.customer_id == Customer.uuid),
+                    party_name,
+                    full_name_expr(Customer),
                 )
             
             if invoice_number:
-                query = query.filter(Invoice.invoice_number.ilike(f'%{invoice_number}%'))
+                query = apply_search(query, invoice_number, Invoice.invoice_number)
             
             # If no filters are applied, ensure we still have the customer join for consistent behavior
             if not party_name and not invoice_number:
                 query = query.outerjoin(Customer, Invoice.customer_id == Customer.uuid)
 
-        # Apply payment_status filter if provided
+        # Apply payment_status filter if provided (the status shown, i.e. after credit notes)
         if payment_status and payment_status != '':
-            query = query.filter(Invoice.payment_status == payment_status)
+            query = query.filter(Invoice.effective_status == payment_status)
         
         # Apply exclude_linked_to_credit_notes filter if provided
         if exclude_linked_to_credit_notes:
@@ -397,9 +573,14 @@ def get_invoices():
                 query = query.order_by(Invoice.total_amount)
         elif sort == "payment_status":
             if order == "desc":
-                query = query.order_by(db.desc(Invoice.payment_status))
+                query = query.order_by(db.desc(Invoice.effective_status))
+            else:
+                query = query.order_by(Invoice.effective_status)
+        elif sort == "balance_due":
+            if order == "desc":
+                query = query.order_by(db.desc(Invoice.effective_balance_due))
             else:
-                query = query.order_by(Invoice.payment_status)
+                query = query.order_by(Invoice.effective_balance_due)
         else:
             # Handle other fields (including created_at)
             if sort.startswith("-"):
@@ -407,17 +588,22 @@ def get_invoices():
             else:
                 query = query.order_by(getattr(Invoice, sort, "id"))
 
-        # Return all invoices for dropdown if requested
+        # Stream all invoices for dropdown if requested
         if request.args.get("dropdown") == "true":
-            invoices = query.outerjoin(Customer, Invoice.customer_id == Customer.uuid).all()
-            return jsonify([
-                {
-                    "uuid": str(inv.uuid),
-                    "invoice_number": inv.invoice_number,
-                    "customer_name": f"{inv.customer.first_name} {inv.customer.last_name}" if inv.customer else None
-                }
-                for inv in invoices
-            ]), 200
+            # Aliased: the filters above may already have joined Customer
+            customer = aliased(Customer)
+            rows = query.outerjoin(customer, Invoice.customer_id == customer.uuid).with_entities(
+                Invoice.uuid,
+                Invoice.invoice_number,
+                customer.uuid.label("customer_uuid"),
+                customer.first_name,
+                customer.last_name,
+            )
+            return stream_json_list(rows, lambda inv: {
+                "uuid": str(inv.uuid),
+                "invoice_number": inv.invoice_number,
+                "customer_name": f"{inv.first_name} {inv.last_name}" if inv.customer_uuid else None
+            })
         
         # Return customer names dropdown if requested
         if request.args.get("customer_dropdown") == "true":
@@ -441,122 +627,54 @@ def get_invoices():
             result.sort(key=lambda x: x['name'])
             return jsonify(result), 200
 
-        # Return all customers (party names) for dropdown if requested
+        # Stream all customers (party names) for dropdown if requested
         if request.args.get("customer_dropdown_all") == "true":
-            # Get all unique customers from ALL invoices (not just current page)
-            customer_query = Invoice.query.outerjoin(Customer, Invoice.customer_id == Customer.uuid).with_entities(
-                Customer.uuid,
-                Customer.first_name,
-                Customer.last_name
-            ).distinct().all()
-            
-            result = []
-            for customer in customer_query:
-                if customer.uuid and (customer.first_name or customer.last_name):  # Only include customers with valid UUID and name
-                    full_name = f"{customer.first_name or ''} {customer.last_name or ''}".strip()
-                    if full_name:  # Only include if name is not empty after stripping
-                        result.append({
-                            "uuid": str(customer.uuid),
-                            "name": full_name
-                        })
-            
-            # Sort by name alphabetically
-            result.sort(key=lambda x: x['name'].lower())
-            return jsonify(result), 200
+            # All unique customers from ALL invoices (not just current page), by name
+            return stream_json_list(
+                _customer_names_query(Invoice.query),
+                _customer_name_option,
+            )
 
-        # Return only customers with active (non-deleted) invoices for dropdown
+        # Stream only customers with active (non-deleted) invoices for dropdown
         if request.args.get("customer_dropdown_active") == "true":
-            customer_query = Invoice.query.filter(Invoice.is_deleted == False).outerjoin(Customer, Invoice.customer_id == Customer.uuid)
-            customers = customer_query.with_entities(
-                Customer.uuid,
-                Customer.first_name,
-                Customer.last_name,
-                func.concat(Customer.first_name, ' ', Customer.last_name).label('full_name')
-            ).distinct().all()
-            
-            result = []
-            for customer in customers:
-                if customer.uuid and (customer.first_name or customer.last_name):
-                    full_name = f"{customer.first_name or ''} {customer.last_name or ''}".strip()
-                    if full_name:
-                        result.append({
-                            "uuid": str(customer.uuid),
-                            "name": full_name
-                        })
-            
-            result.sort(key=lambda x: x['name'].lower())
-            return jsonify(result), 200
+            return stream_json_list(
+                _customer_names_query(Invoice.query.filter(Invoice.is_deleted == False)),
+                _customer_name_option,
+            )
 
-        # Return only invoice numbers with customer IDs for optimized dropdown
+        # Stream only invoice numbers with customer IDs for optimized dropdown
         if request.args.get("invoice_numbers_only") == "true":
-            invoice_query = Invoice.query.filter(Invoice.is_deleted == False)
-            invoices = invoice_query.with_entities(
+            invoice_query = Invoice.query.filter(
+                Invoice.is_deleted == False,
+                Invoice.invoice_number.isnot(None),
+                Invoice.invoice_number != "",
+            )
+            rows = invoice_query.with_entities(
                 Invoice.uuid,
                 Invoice.invoice_number,
                 Invoice.customer_id
-            ).all()
-            
-            result = []
-            for invoice in invoices:
-                if invoice.uuid and invoice.invoice_number:
-                    result.append({
-                        "uuid": str(invoice.uuid),
-                        "invoice_number": invoice.invoice_number,
-                        "customer_id": str(invoice.customer_id) if invoice.customer_id else None
-                    })
-            
-            result.sort(key=lambda x: x['invoice_number'])
-            return jsonify(result), 200
+            ).order_by(Invoice.invoice_number)
+            return stream_json_list(rows, lambda invoice: {
+                "uuid": str(invoice.uuid),
+                "invoice_number": invoice.invoice_number,
+                "customer_id": str(invoice.customer_id) if invoice.customer_id else None
+            })
 
         # Paginated results for main grid (same pattern as quotation.py)
         page = int(request.args.get("page", 1))
         # Accept both 'per_page' and 'items_per_page' for frontend compatibility
         per_page = int(request.args.get("per_page") or request.args.get("items_per_page") or 5)
         
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        pagination = paginate(query, page=page, per_page=per_page)
         invoices = pagination.items
 
         # Get customer data separately to avoid relationship issues
         customer_ids = [inv.customer_id for inv in invoices]
         customers = {c.uuid: c for c in Customer.query.filter(Customer.uuid.in_(customer_ids)).all()} if customer_ids else {}
 
-        # Get credit notes data for all invoices to calculate effective balance
-        invoice_ids = [str(inv.uuid) for inv in invoices]  # Convert to strings
-        credit_notes_by_invoice = {}
-        if invoice_ids:
-            credit_notes = CreditNote.query.filter(
-                CreditNote.invoice_id.in_(invoice_ids),
-                CreditNote.is_deleted == False
-            ).all()
-            for cn in credit_notes:
-                # Use string as key to match our lookup
-                invoice_key = str(cn.invoice_id)
-                if invoice_key not in credit_notes_by_invoice:
-                    credit_notes_by_invoice[invoice_key] = 0
-                credit_notes_by_invoice[invoice_key] += float(cn.total_amount)
-        
-        # Debug: Print final credit_notes_by_invoice
-
         # Shape response to match frontend expectations: { data: [...], pagination: { total, ... } }
         result = []
         for inv in invoices:
-            # Calculate effective balance due considering credit notes
-            credit_notes_total = credit_notes_by_invoice.get(str(inv.uuid), 0)
-            effective_balance_due = round(max(0, float(inv.total_amount) - float(inv.amount_paid) - float(inv.payment_discount or 0) - credit_notes_total), 2)
-            
-            # Debug: Print calculation for this invoice
-            
-            # Calculate effective payment status based on credit notes and payments
-            if effective_balance_due <= 0:
-                if credit_notes_total >= float(inv.total_amount):
-                    effective_payment_status = "refunded"
-                else:
-                    effective_payment_status = "paid"
-            elif float(inv.amount_paid) > 0 or credit_notes_total > 0:
-                effective_payment_status = "partial"
-            else:
-                effective_payment_status = "unpaid"
-                        
             result.append({
                 "uuid": str(inv.uuid),
                 "invoice_number": inv.invoice_number,
@@ -567,10 +685,10 @@ def get_invoices():
                 "customer_name": f"{customers[inv.customer_id].first_name} {customers[inv.customer_id].last_name}" if inv.customer_id in customers else None,
                 "total_amount": round(float(inv.total_amount) if inv.total_amount else 0, 2),
                 "amount_paid": round(float(inv.amount_paid) if inv.amount_paid else 0, 2),
-                "balance_due": effective_balance_due,  
+                "balance_due": round(float(inv.effective_balance_due or 0), 2),
                 "payment_discount": round(float(inv.payment_discount) if inv.payment_discount else 0, 2),
-                "credit_notes_total": round(credit_notes_total, 2),  
-                "payment_status": effective_payment_status,  
+                "credit_notes_total": round(float(inv.credit_notes_total or 0), 2),
+                "payment_status": inv.effective_status,
                 "charges": inv.charges,
                 "created_at": inv.created_at.isoformat() if inv.created_at else None,
             })
@@ -579,6 +697,7 @@ def get_invoices():
             "data": result,
             "pagination": {
                 "total": pagination.total,
+                "next_cursor": pagination.next_cursor,
                 "items_per_page": per_page,
                 "current_page": page,
                 "last_page": pagination.pages,
@@ -594,6 +713,8 @@ def get_invoices():
         
         return jsonify(response_data), 200
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({
             "error": "Failed to fetch invoices",
@@ -620,7 +741,7 @@ def get_invoice(invoice_id):
       404:
         description: Invoice not found
     """
-    invoice = Invoice.query.get_or_404(invoice_id)
+    invoice = Invoice.query.options(*document_load_options(Invoice)).get_or_404(invoice_id)
     
     # Get credit notes linked to this invoice
     credit_notes_data = []
@@ -648,42 +769,19 @@ def get_invoice(invoice_id):
             "total_price": float(item.total_price) if item.total_price else 0,
         }
         
-        # Fetch product details from linked inventory item
-        if item.item_id:
-            inventory_item = Item.query.options(
-                selectinload(Item.images)
-            ).get(item.item_id)
-            if inventory_item:
-                item_info["product_name"] = inventory_item.item_name
-                item_info["hsn_sac_code"] = inventory_item.hsn_code
-                item_info["measuring_unit_id"] = inventory_item.measuring_unit_id
-                # Get the feature image for the item
-                main_image_obj = next((img for img in (inventory_item.images or []) if img.is_main), None)
-                if not main_image_obj and inventory_item.images:
-                    main_image_obj = inventory_item.images[0]
-                if main_image_obj:
-                    # Return the path for the frontend (handled by resolveImageUrl)
-                    item_info["image"] = f"/static/itemImages/{main_image_obj.item_id}/{main_image_obj.image}"
+        # Product details from the eagerly loaded inventory item
+        inventory_item = item.item
+        if inventory_item:
+            item_info["product_name"] = inventory_item.item_name
+            item_info["hsn_sac_code"] = inventory_item.hsn_code
+            item_info["measuring_unit_id"] = inventory_item.measuring_unit_id
+            # Path of the feature image for the frontend (handled by resolveImageUrl)
+            image_url = item_image_url(main_item_image(inventory_item))
+            if image_url:
+                item_info["image"] = image_url
         
         items_data.append(item_info)
 
-    # Calculate credit notes total (include all non-deleted credit notes, same as helper function)
-    credit_notes_total = sum(float(cn.total_amount) for cn in credit_notes)
-    
-    # Calculate effective balance due considering credit notes
-    effective_balance_due = round(max(0, float(invoice.total_amount) - float(invoice.amount_paid) - float(invoice.payment_discount or 0) - credit_notes_total), 2)
-    
-    # Calculate effective payment status based on credit notes and payments
-    if effective_balance_due <= 0:
-        if credit_notes_total >= float(invoice.total_amount):
-            effective_payment_status = "refunded"
-        else:
-            effective_payment_status = "paid"
-    elif float(invoice.amount_paid) > 0 or credit_notes_total > 0:
-        effective_payment_status = "partial"
-    else:
-        effective_payment_status = "unpaid"
-
     invoice_data = {
         "uuid": str(invoice.uuid),
         "invoice_number": invoice.invoice_number,
@@ -701,14 +799,14 @@ def get_invoice(invoice_id):
         "due_date": invoice.due_date.isoformat() if invoice.due_date else None,
         "total_amount": round(float(invoice.total_amount) if invoice.total_amount else 0, 2),
         "amount_paid": round(float(invoice.amount_paid) if invoice.amount_paid else 0, 2),
-        "balance_due": effective_balance_due, 
+        "balance_due": round(float(invoice.effective_balance_due or 0), 2),
         "payment_discount": round(float(invoice.payment_discount) if invoice.payment_discount else 0, 2),
         "charges": invoice.charges or {},
-        "payment_status": effective_payment_status, 
+        "payment_status": invoice.effective_status,
         "additional_notes": invoice.additional_notes or {},
         "items": items_data,
         "credit_notes": credit_notes_data,
-        "credit_notes_total": round(credit_notes_total, 2), 
+        "credit_notes_total": round(float(invoice.credit_notes_total or 0), 2),
         "created_at": invoice.created_at.isoformat() if invoice.created_at else None,
         "updated_at": invoice.updated_at.isoformat() if invoice.updated_at else None,
     }
@@ -1002,7 +1100,7 @@ def create_invoice_from_quotation(quotation_id):
     quotation = Quotation.query.get_or_404(quotation_id)
     
     try:
-        invoice_number = generate_invoice_number()
+        invoice_number = generate_invoice_number(quotation.business_id)
         
         invoice = Invoice(
             invoice_number=invoice_number,
@@ -1106,9 +1204,7 @@ def record_payment(invoice_id):
         current_total_paid = float(invoice.amount_paid or 0)
         current_discount = float(invoice.payment_discount or 0)
         
-        # Get credit notes for this invoice
-        credit_notes = CreditNote.query.filter_by(invoice_id=str(invoice.uuid), is_deleted=False).all()
-        total_credit_amount = sum(float(cn.total_amount) for cn in credit_notes)
+        total_credit_amount = float(invoice.credit_notes_total or 0)
         
         # Calculate maximum allowed payment considering credit notes
         max_allowed_payment = float(invoice.total_amount) - current_total_paid - current_discount - total_credit_amount
@@ -1172,18 +1268,13 @@ def record_payment(invoice_id):
         # Refresh invoice to get the latest committed values
         db.session.refresh(invoice)
         
-        # Calculate effective balance due considering credit notes for response
-        credit_notes = CreditNote.query.filter_by(invoice_id=str(invoice.uuid), is_deleted=False).all()
-        credit_notes_total = sum(float(cn.total_amount) for cn in credit_notes)
-        effective_balance_due = round(max(0, float(invoice.total_amount) - float(invoice.amount_paid) - float(invoice.payment_discount or 0) - credit_notes_total), 2)
-        
         return jsonify({
             "message": "Payment recorded successfully",
             "amount_paid": round(float(invoice.amount_paid), 2),
-            "balance_due": effective_balance_due, 
+            "balance_due": round(float(invoice.effective_balance_due or 0), 2),
             "payment_status": invoice.payment_status,
             "payment_discount": round(float(invoice.payment_discount) if invoice.payment_discount else 0, 2),
-            "credit_notes_total": round(credit_notes_total, 2)  
+            "credit_notes_total": round(float(invoice.credit_notes_total or 0), 2)
         }), 200
         
     except Exception as e:
@@ -1276,7 +1367,7 @@ def download_invoice_pdf(invoice_id):
         description: PDF generation failed
     """
     try:
-        invoice = Invoice.query.get_or_404(invoice_id)
+        invoice = Invoice.query.options(*document_load_options(Invoice)).get_or_404(invoice_id)
 
         # Build items data (same logic as get_invoice, with images)
         items_data = []
@@ -1289,29 +1380,14 @@ def download_invoice_pdf(invoice_id):
                 "tax": item.tax or {},
                 "total_price": float(item.total_price) if item.total_price else 0,
             }
-            if item.item_id:
-                inventory_item = Item.query.options(
-                    selectinload(Item.images)
-                ).get(item.item_id)
-                if inventory_item:
-                    item_info["product_name"] = inventory_item.item_name
-                    item_info["hsn_sac_code"] = inventory_item.hsn_code
-                    # Get the feature image for the item
-                    main_image_obj = next((img for img in (inventory_item.images or []) if img.is_main), None)
-                    if not main_image_obj and inventory_item.images:
-                        main_image_obj = inventory_item.images[0]
-                    if main_image_obj:
-                        # Resolve absolute path for PDF generation
-                        image_path = os.path.join(Config.ITEM_IMAGES_FOLDER, str(main_image_obj.item_id), main_image_obj.image)
-                        if os.path.exists(image_path):
-                            try:
-                                with open(image_path, "rb") as img_file:
-                                    encoded_string = base64.b64encode(img_file.read()).decode('utf-8')
-                                    extension = os.path.splitext(image_path)[1].lower()
-                                    mime_type = "image/png" if extension == ".png" else "image/jpeg"
-                                    item_info["image"] = f"data:{mime_type};base64,{encoded_string}"
-                            except Exception as e:
-                                item_info["image"] = None
+            inventory_item = item.item
+            if inventory_item:
+                item_info["product_name"] = inventory_item.item_name
+                item_info["hsn_sac_code"] = inventory_item.hsn_code
+                # Feature image embedded for PDF generation
+                image = main_item_image(inventory_item)
+                if image:
+                    item_info["image"] = item_image_data_uri(image)
             items_data.append(item_info)
 
         pdf_buffer = generate_invoice_pdf(invoice, items_data)
@@ -9,11 +9,15 @@ import uuid
 from flask import Blueprint, request, jsonify, Response, send_file, current_app
 from flask_jwt_extended import jwt_required, get_jwt
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy import func, or_
+from sqlalchemy import func
 from app.extensions import db
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.streaming import stream_json_list
 from app.models import Item, ItemCategory, MeasuringUnit, ItemType
 from app.services.pdf_service import generate_inventory_pdf
 from app.utils.stamping import set_created_fields, set_updated_fields
+from app.utils.decorators import public_endpoint
+from app.utils.search import apply_search
 # Excel export imports
 try:
     import openpyxl
@@ -182,27 +186,25 @@ def get_items():
                 
                 if filter_key == "category":
                     # Filter by category name
-                    query = query.outerjoin(ItemCategory).filter(ItemCategory.name.ilike(f"%{arg_value}%"))
+                    query = apply_search(query.outerjoin(ItemCategory), arg_value, ItemCategory.name)
                 elif filter_key == "item_name":
-                    query = query.filter(Item.item_name.ilike(f"%{arg_value}%"))
+                    query = apply_search(query, arg_value, Item.item_name)
                 elif filter_key == "item_code":
-                    query = query.filter(Item.item_code.ilike(f"%{arg_value}%"))
+                    query = apply_search(query, arg_value, Item.item_code)
                 elif hasattr(Item, filter_key):
                     # Basic exact match for other fields if they exist on Item model
                     query = query.filter(getattr(Item, filter_key) == arg_value)
 
         # Search query filter (already handles item_name, item_code, etc. but keep for compatibility)
         if "query" in request.args:
-            query_value = request.args.get("query", "").strip()
-            if query_value:
-                query = query.filter(
-                    or_(
-                        Item.item_name.ilike(f"%{query_value}%"),
-                        Item.item_code.ilike(f"%{query_value}%"),
-                        Item.description.ilike(f"%{query_value}%"),
-                        Item.hsn_code.ilike(f"%{query_value}%")
-                    )
-                )
+            query = apply_search(
+                query,
+                request.args.get("query", ""),
+                Item.item_name,
+                Item.item_code,
+                Item.description,
+                Item.hsn_code,
+            )
 
         # Handle low_stock filter - only applies to Products (Services have no stock)
         low_stock = request.args.get("low_stock")
@@ -238,22 +240,19 @@ def get_items():
                 else:
                     query = query.order_by(getattr(Item, field, "id"))
 
-        # Return all items for dropdown if requested
+        # Stream all items for dropdown if requested
         if request.args.get("dropdown") == "true":
-            items = query.all()
-            return jsonify([
-                {
-                    "id": str(item.id),
-                    "item_name": item.item_name or "",
-                    "item_code": item.item_code or ""
-                }
-                for item in items
-            ])
+            rows = query.with_entities(Item.id, Item.item_name, Item.item_code)
+            return stream_json_list(rows, lambda item: {
+                "id": str(item.id),
+                "item_name": item.item_name or "",
+                "item_code": item.item_code or ""
+            })
 
         # Paginated results for the main grid
         page = int(request.args.get("page", 1))
         per_page = int(request.args.get("items_per_page", 5))
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        pagination = paginate(query, page=page, per_page=per_page)
         items = pagination.items
 
         # Shape response to match frontend expectations: { data: [...], pagination: { total, ... } }
@@ -296,6 +295,7 @@ def get_items():
             "data": result,
             "pagination": {
                 "total": pagination.total,
+                "next_cursor": pagination.next_cursor,
                 "items_per_page": per_page,
                 "current_page": page,
                 "last_page": pagination.pages,
@@ -310,6 +310,8 @@ def get_items():
         }
         return jsonify(response_data)
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({
             "error": "Failed to fetch items",
@@ -872,6 +874,7 @@ def delete_item(item_id):
 # ── EXCEL EXPORT ───────────────────────────────────────────────────────────
 
 @item_blueprint.route("/export/excel", methods=["GET"])
+@public_endpoint
 def export_items_excel():
     """
     Export items to Excel file with search filtering.
@@ -908,13 +911,7 @@ def export_items_excel():
         ).filter(Item.is_deleted == False)
         
         # Apply search filter
-        if search:
-            query = query.filter(
-                or_(
-                    Item.item_name.ilike(f"%{search}%"),
-                    Item.item_code.ilike(f"%{search}%")
-                )
-            )
+        query = apply_search(query, search, Item.item_name, Item.item_code)
         
         # Get results
         items = query.all()
@@ -977,6 +974,7 @@ def export_items_excel():
 # ── PDF EXPORT ────────────────────────────────────────────────────
 
 @item_blueprint.route("/export/pdf", methods=["POST"])
+@public_endpoint
 def export_items_pdf():
     """
     Export items to PDF file with search filtering for printing.
@@ -1039,6 +1037,7 @@ def export_items_pdf():
 # ── PRINT PDF ─────────────────────────────────────────────────────
 
 @item_blueprint.route("/export/print-pdf", methods=["GET", "POST"])
+@public_endpoint
 def print_items_pdf():
     """
     Print items PDF with search filtering - opens browser print dialog.
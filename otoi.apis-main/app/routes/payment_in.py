@@ -2,41 +2,23 @@ from datetime import datetime, date
 from flask import Blueprint, request, jsonify, g
 from sqlalchemy import or_, desc, asc
 from app.extensions import db
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.sequences import next_document_number
 from app.models.paymentIn import PaymentIn
 from app.models.invoice import Invoice
 from app.models.customer import Customer
 from app.utils.stamping import set_updated_fields
 from app.utils.decorators import login_required
+from app.utils.tenant import current_business_id
 
 payment_in_blueprint = Blueprint("payment_in", __name__)
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def generate_payment_in_number() -> str:
-    """Generate a unique payment-in number like PIN-1001."""
-    # Get the maximum payment number from existing payments (including soft-deleted)
-    result = db.session.execute(
-        db.text("""
-            SELECT MAX(CAST(SUBSTRING(payment_number FROM 5) AS INTEGER)) as max_num 
-            FROM payment_ins 
-            WHERE payment_number LIKE 'PIN-%' 
-            AND payment_number ~ 'PIN-[0-9]{4}$'
-        """)
-    )
-    max_num = result.scalar()
-    
-    if max_num and max_num >= 1000:
-        # Start from max_num + 1, but keep it 4 digits
-        new_num = max_num + 1
-        # Ensure it doesn't exceed 9999
-        if new_num > 9999:
-            new_num = 1000  # Reset to 1000 if we exceed 9999
-    else:
-        new_num = 1000  # Start from PIN-1000
-    
-    # Format as 4-digit number
-    return f"PIN-{new_num:04d}"
+def generate_payment_in_number(business_id=None) -> str:
+    """Allocate the business's next payment-in number (PIN-1000, ...) in the current transaction."""
+    return next_document_number("payment_in", business_id)
 
 
 def _date_filter_query(query, model, date_filter: str):
@@ -117,7 +99,7 @@ def list_payment_ins():
 
         # Dropdown shortcuts
         if request.args.get("party_names_dropdown") == "true":
-            business_id = getattr(g, "business_id", None)
+            business_id = current_business_id()
             names = (
                 db.session.query(PaymentIn.party_name)
                 .filter(PaymentIn.business_id == business_id, PaymentIn.is_deleted == False)
@@ -128,7 +110,7 @@ def list_payment_ins():
             return jsonify([n[0] for n in names if n[0]]), 200
 
         if request.args.get("payment_numbers_dropdown") == "true":
-            business_id = getattr(g, "business_id", None)
+            business_id = current_business_id()
             numbers = (
                 db.session.query(PaymentIn.payment_number)
                 .filter(PaymentIn.business_id == business_id, PaymentIn.is_deleted == False)
@@ -138,7 +120,7 @@ def list_payment_ins():
             )
             return jsonify([n[0] for n in numbers if n[0]]), 200
 
-        business_id = getattr(g, "business_id", None)
+        business_id = current_business_id()
         query = (
             PaymentIn.query
             .outerjoin(Invoice, PaymentIn.invoice_id == Invoice.uuid)
@@ -161,7 +143,7 @@ def list_payment_ins():
             query = _date_filter_query(query, PaymentIn, date_filter)
 
         query = query.order_by(desc(PaymentIn.payment_date), desc(PaymentIn.created_at))
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        pagination = paginate(query, page=page, per_page=per_page)
 
         result = []
         for p in pagination.items:
@@ -191,6 +173,7 @@ def list_payment_ins():
             "data": result,
             "pagination": {
                 "total":        pagination.total,
+                "next_cursor":  pagination.next_cursor,
                 "per_page":     per_page,
                 "current_page": page,
                 "last_page":    pagination.pages,
@@ -199,6 +182,8 @@ def list_payment_ins():
             },
         }), 200
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Failed to fetch payment-in records", "details": str(e)}), 500
 
@@ -218,8 +203,8 @@ def create_payment_in():
     """
     data = request.get_json() or {}
     try:
-        payment_number = data.get("payment_number") or generate_payment_in_number()
-        business_id = data.get("business_id") or getattr(g, "business_id", None)
+        business_id = data.get("business_id") or current_business_id()
+        payment_number = data.get("payment_number") or generate_payment_in_number(business_id)
 
         pi = PaymentIn(
             payment_number      = payment_number,
@@ -378,7 +363,7 @@ def get_customer_invoices():
     try:
         customer_name = request.args.get("customer_name", "").strip()
         per_page      = int(request.args.get("per_page", 1000))
-        business_id   = getattr(g, "business_id", None)
+        business_id   = current_business_id()
 
         query = (
             Invoice.query
@@ -412,15 +397,9 @@ def get_customer_invoices():
             total = float(inv.total_amount or 0)
             payment_discount = float(inv.payment_discount or 0)
 
-            # Calculate correct balance including discount
-            from app.models.creditIn import CreditNote
-            credit_notes = CreditNote.query.filter_by(
-                invoice_id=inv.uuid,
-                is_deleted=False
-            ).all()
-            total_credit_amount = sum(float(cn.total_amount) for cn in credit_notes)
-
-            balance = max(0.0, total - amt_paid - payment_discount - total_credit_amount)
+            # Balance after payments, discount and credit notes
+            total_credit_amount = float(inv.credit_notes_total or 0)
+            balance = float(inv.effective_balance_due or 0)
             status = "unpaid"
             if balance <= 0 and amt_paid > 0:
                 status = "paid"
@@ -3,27 +3,22 @@ from flask import Blueprint, request, jsonify, g
 from sqlalchemy import or_, desc, asc
 from sqlalchemy.orm import selectinload
 from app.extensions import db
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.sequences import next_document_number
 from app.models.paymentOut import PaymentOut
 from app.models.purchase_invoice import PurchaseInvoice
 from app.models.vendor import Vendor
 from app.models.inventory import Item
+from app.utils.tenant import current_business_id
 
 payment_out_blueprint = Blueprint("payment_out", __name__)
 
 
 # ── Helpers ───────────────────────────────────────────────────────────────────
 
-def generate_payment_out_number() -> str:
-    """Generate a unique payment-out number like POUT-1001."""
-    last = PaymentOut.query.order_by(PaymentOut.created_at.desc()).first()
-    if last and last.payment_number:
-        try:
-            last_num = int(last.payment_number.split("-")[1])
-            return f"POUT-{last_num + 1}"
-        except (IndexError, ValueError):
-            pass
-    return "POUT-1001"
-
+def generate_payment_out_number(business_id=None) -> str:
+    """Allocate the business's next payment-out number (POUT-1001, ...) in the current transaction."""
+    return next_document_number("payment_out", business_id)
 
 
 def _date_filter_query(query, model, date_filter: str):
@@ -134,7 +129,7 @@ def list_payment_outs():
 
         # Dropdown shortcuts
         if request.args.get("party_names_dropdown") == "true":
-            business_id = getattr(g, "business_id", None)
+            business_id = current_business_id()
             names = (
                 db.session.query(PaymentOut.party_name)
                 .filter(PaymentOut.business_id == business_id)
@@ -146,7 +141,7 @@ def list_payment_outs():
             return jsonify([n[0] for n in names if n[0]]), 200
 
         if request.args.get("payment_numbers_dropdown") == "true":
-            business_id = getattr(g, "business_id", None)
+            business_id = current_business_id()
             numbers = (
                 db.session.query(PaymentOut.payment_number)
                 .filter(PaymentOut.business_id == business_id)
@@ -157,7 +152,7 @@ def list_payment_outs():
             )
             return jsonify([n[0] for n in numbers if n[0]]), 200
 
-        business_id = getattr(g, "business_id", None)
+        business_id = current_business_id()
         
         if party_name:
             # Simple query for party name filtering
@@ -194,7 +189,7 @@ def list_payment_outs():
             query = _date_filter_query(query, PaymentOut, date_filter)
 
         query = query.order_by(desc(PaymentOut.payment_date), desc(PaymentOut.created_at))
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        pagination = paginate(query, page=page, per_page=per_page)
 
         result = []
         for p in pagination.items:
@@ -224,6 +219,7 @@ def list_payment_outs():
             "data": result,
             "pagination": {
                 "total":        pagination.total,
+                "next_cursor":  pagination.next_cursor,
                 "per_page":     per_page,
                 "current_page": page,
                 "last_page":    pagination.pages,
@@ -232,6 +228,8 @@ def list_payment_outs():
             },
         }), 200
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Failed to fetch payment-out records", "details": str(e)}), 500
 
@@ -251,7 +249,7 @@ def create_payment_out():
     """
     data = request.get_json() or {}
     try:
-        payment_number = data.get("payment_number") or generate_payment_out_number()
+        payment_number = data.get("payment_number") or generate_payment_out_number(data["business_id"])
 
         po = PaymentOut(
             payment_number      = payment_number,
@@ -364,7 +362,7 @@ def record_payment_out(invoice_id):
 
         # Create PaymentOut record
         po_record = PaymentOut(
-            payment_number      = generate_payment_out_number(),
+            payment_number      = generate_payment_out_number(invoice.business_id),
             payment_date        = date.today(),
             purchase_invoice_id = invoice.uuid,
             party_name          = party_name,
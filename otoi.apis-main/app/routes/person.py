@@ -1,12 +1,14 @@
 from app.models.inventory import Item
 from flask import Blueprint, request, jsonify
 from app.extensions import db
+from app.utils.pagination import paginate, InvalidCursor
 from app.models.person import Lead, LeadAddress
 from app.models.customer import Customer
 from app.models.active import Active, ActiveType
 from app.models.common import Address
 from app.utils.stamping import set_created_fields, set_updated_fields, set_business
 from app.utils.lead_utils import sync_lead_to_customer
+from app.utils.search import apply_search, full_name_expr
 from flask import current_app
 from sqlalchemy import String, cast, or_, func
 from sqlalchemy.orm import joinedload
@@ -109,32 +111,22 @@ def get_leads():
 
         # Filtering by name/email
         if "filter[name]" in request.args:
-            filter_value = request.args.get("filter[name]", "")
-            query = query.filter(
-                or_(
-                    Lead.first_name.ilike(f"%{filter_value}%"),
-                    Lead.last_name.ilike(f"%{filter_value}%"),
-                    Lead.email.ilike(f"%{filter_value}%")
-                )
-            )
+            query = apply_search(query, request.args.get("filter[name]", ""), full_name_expr(Lead), Lead.email)
 
         # General query search
         if "query" in request.args:
-            query_value = request.args.get("query", "")
-            query = query.filter(
-                or_(
-                    Lead.first_name.ilike(f"%{query_value}%"),
-                    Lead.last_name.ilike(f"%{query_value}%"),
-                    func.concat(Lead.first_name, " ", Lead.last_name).ilike(f"%{query_value}%"),
-                    Lead.email.ilike(f"%{query_value}%"),
-                    Lead.gst.ilike(f"%{query_value}%"),
-                    Lead.mobile.ilike(f"%{query_value}%"),
-                )
+            query = apply_search(
+                query,
+                request.args.get("query", ""),
+                full_name_expr(Lead),
+                Lead.email,
+                Lead.gst,
+                Lead.mobile,
             )
 
         # Mobile filter (partial match)
         if "mobile" in request.args:
-            query = query.filter(Lead.mobile.ilike(f"%{request.args['mobile']}%"))
+            query = apply_search(query, request.args["mobile"], Lead.mobile)
 
         # Exact filtering for duplicate checks (OR logic)
         exact_filters = []
@@ -203,7 +195,7 @@ def get_leads():
         # Pagination
         page = int(request.args.get("page", 1))
         per_page = int(request.args.get("items_per_page", 5))
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        pagination = paginate(query, page=page, per_page=per_page)
         leads = pagination.items
 
         # Build response
@@ -241,8 +233,10 @@ def get_leads():
         return jsonify({
             "pages": pagination.pages,
             "data": result,
-            "pagination": {"total": pagination.total}
+            "pagination": {"total": pagination.total, "next_cursor": pagination.next_cursor}
         })
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         db.session.rollback()
         import traceback; print("ERROR in get_leads:", traceback.format_exc())
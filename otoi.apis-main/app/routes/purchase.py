@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from app.extensions import db
+from app.utils.pagination import paginate, InvalidCursor
 from app.models.purchase import PurchaseEntry
 from app.utils.stamping import set_created_fields, set_updated_fields, set_business
 from sqlalchemy import or_
@@ -79,7 +80,7 @@ def get_purchase_entries():
         # Pagination
         page = int(request.args.get("page", 1))
         per_page = int(request.args.get("items_per_page", 5))
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        pagination = paginate(query, page=page, per_page=per_page)
         entries = pagination.items
 
         result = []
@@ -95,8 +96,10 @@ def get_purchase_entries():
         return jsonify({
             "pages": pagination.pages,
             "data": result,
-            "pagination": {"total": pagination.total}
+            "pagination": {"total": pagination.total, "next_cursor": pagination.next_cursor}
         })
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         import traceback
         current_app.logger.error(f"ERROR in get_purchase_entries: {traceback.format_exc()}")
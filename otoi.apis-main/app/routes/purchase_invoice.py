@@ -21,10 +21,14 @@ from sqlalchemy import desc, or_, func, asc
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 from app.utils.decorators import login_required
-from flask_jwt_extended import jwt_required, get_jwt
+from app.utils.tenant import current_business_id
+from app.utils.document_loader import document_load_options, item_image_data_uri, item_image_url, main_item_image
+from flask_jwt_extended import jwt_required
 from app.models.debit_note import DebitNote
 
 from app.extensions import db
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.sequences import next_document_number
 from app.models.purchase_invoice import PurchaseInvoice, PurchaseInvoiceItem
 from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem
 from app.models.inventory import Item
@@ -89,21 +93,9 @@ def _date_filter_query(query, model_class, date_filter):
 
     return query
 
-def _generate_invoice_number():
-    """Generate a sequential purchase invoice number."""
-    # Find the highest invoice number from ALL records (including deleted) to generate next unique number
-    last = PurchaseInvoice.query.order_by(desc(PurchaseInvoice.created_at)).first()
-    if last and last.invoice_number:
-        try:
-            num = int(last.invoice_number.split("-")[1])
-            next_num = num + 1
-            # Make sure this number doesn't exist (check both active and deleted)
-            while PurchaseInvoice.query.filter_by(invoice_number=f"PINV-{next_num}").first():
-                next_num += 1
-            return f"PINV-{next_num}"
-        except (IndexError, ValueError):
-            pass
-    return "PINV-1001"
+def _generate_invoice_number(business_id=None):
+    """Allocate the business's next purchase invoice number (PINV-1001, ...) in the current transaction."""
+    return next_document_number("purchase_invoice", business_id)
 
 
 def _credit_inventory(invoice: PurchaseInvoice) -> None:
@@ -138,7 +130,7 @@ def _debit_inventory(invoice: PurchaseInvoice) -> None:
     invoice.inventory_updated = False
 
 
-def _serialize_item(inv_item: PurchaseInvoiceItem, product_map: dict) -> dict:
+def _serialize_item(inv_item: PurchaseInvoiceItem) -> dict:
     discount_data = inv_item.discount or {}
     tax_data = inv_item.tax or {}   
     
@@ -156,24 +148,16 @@ def _serialize_item(inv_item: PurchaseInvoiceItem, product_map: dict) -> dict:
         "tax_amount": float(tax_data.get("tax_amount") or 0),
         "total_price": float(inv_item.total_price) if inv_item.total_price else 0,
     }
-    if inv_item.item_id and inv_item.item_id in product_map:
-        p = product_map[inv_item.item_id]
+    p = inv_item.item
+    if p:
         row["product_name"] = p.item_name
         row["hsn_sac_code"] = p.hsn_code
         row["measuring_unit_id"] = p.measuring_unit_id
         row["measuring_unit_name"] = p.measuring_unit.name if p.measuring_unit else "PCS"
-        
+
         # Add product image
-        main_image_obj = next((img for img in (p.images or []) if img.is_main), None)
-        if not main_image_obj and p.images:
-            main_image_obj = p.images[0]
-            
-        if main_image_obj:
-            row["product_image"] = f"/static/itemImages/{p.id}/{main_image_obj.image}"
-            row["image"]          = row["product_image"]  # Consistency with frontend
-        else:
-            row["product_image"] = None
-            row["image"]          = None
+        row["product_image"] = item_image_url(main_item_image(p))
+        row["image"]          = row["product_image"]  # Consistency with frontend
     return row
 
 
@@ -236,7 +220,7 @@ def create_from_purchase_order(po_id):
     today = datetime.utcnow().date()
 
     try:
-        invoice_number = _generate_invoice_number()
+        invoice_number = _generate_invoice_number(po.business_id)
         invoice_date_str = data.get("invoice_date")
         due_date_str = data.get("due_date")
 
@@ -380,11 +364,11 @@ def create_purchase_invoice():
         description: Created
     """
     data = request.get_json() or {}
-    business_id = request.headers.get("X-Business-Id") or 1  # Fallback for now
+    business_id = current_business_id()
 
     try:
         # Always generate a new invoice number to avoid duplicates
-        invoice_number = _generate_invoice_number()
+        invoice_number = _generate_invoice_number(business_id)
         today = datetime.utcnow().date()
 
         invoice_date_str = data.get("invoice_date")
@@ -479,7 +463,7 @@ def create_purchase_invoice():
             party_name = vendor.vendor_name if vendor else "Initial Payment"
             
             po_record = PaymentOut(
-                payment_number      = generate_payment_out_number(),
+                payment_number      = generate_payment_out_number(invoice.business_id),
                 payment_date        = date.today(),
                 purchase_invoice_id = invoice.uuid,
                 party_name          = party_name,
@@ -517,14 +501,7 @@ def create_purchase_invoice():
 def get_purchase_invoice_dropdown():
     """Get dropdown data for purchase invoice filters - vendor names with UUID and invoice numbers"""
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        
-        # Handle different JWT token formats
-        if isinstance(jwt_claims, str):
-            business_id = 1  # Default fallback
-        else:
-            business_id = jwt_claims.get('business_id', 1)
+        business_id = current_business_id()
         
         dropdown_type = request.args.get('type', '').strip()
         
@@ -640,7 +617,7 @@ def list_purchase_invoices():
         description: Paginated list of purchase invoices or dropdown values
     """
     try:
-        business_id = getattr(g, "business_id", None)
+        business_id = current_business_id()
         query = db.session.query(PurchaseInvoice).outerjoin(Vendor, PurchaseInvoice.vendor_id == Vendor.uuid).filter(PurchaseInvoice.is_deleted == False).filter(PurchaseInvoice.business_id == business_id)
 
         search = request.args.get("search", "").strip()
@@ -694,7 +671,7 @@ def list_purchase_invoices():
             or request.args.get("items_per_page")
             or 10
         )
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        pagination = paginate(query, page=page, per_page=per_page)
         invoices = pagination.items
 
         # Batch-fetch vendors
@@ -789,12 +766,15 @@ def list_purchase_invoices():
             "data": result,
             "pagination": {
                 "total": pagination.total,
+                "next_cursor": pagination.next_cursor,
                 "items_per_page": per_page,
                 "current_page": page,
                 "last_page": pagination.pages,
             },
         }), 200
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Failed to fetch purchase invoices", "details": str(e)}), 500
 
@@ -816,7 +796,7 @@ def get_purchase_invoice(invoice_id):
     """
     invoice = (
         PurchaseInvoice.query
-        .options(selectinload(PurchaseInvoice.items))
+        .options(*document_load_options(PurchaseInvoice))
         .filter_by(uuid=invoice_id, is_deleted=False)
         .first_or_404(description="Purchase invoice not found")
     )
@@ -851,12 +831,6 @@ def get_purchase_invoice(invoice_id):
     
 
     # NOW prepare the response with updated values
-    item_ids = [i.item_id for i in invoice.items if i.item_id]
-    product_map = (
-        {p.id: p for p in Item.query.filter(Item.id.in_(item_ids)).all()}
-        if item_ids else {}
-    )
-
     v = invoice.vendor
     
     # Create response with UPDATED values
@@ -890,7 +864,7 @@ def get_purchase_invoice(invoice_id):
         "payment_mode": invoice.payment_mode,
         "inventory_updated": invoice.inventory_updated,
         "additional_notes": invoice.additional_notes or {},
-        "items": [_serialize_item(i, product_map) for i in invoice.items],
+        "items": [_serialize_item(i) for i in invoice.items],
         "created_at": invoice.created_at.isoformat() if invoice.created_at else None,
         "updated_at": invoice.updated_at.isoformat() if invoice.updated_at else None,
     }
@@ -1078,18 +1052,11 @@ def download_purchase_invoice_pdf(invoice_id):
     try:
         invoice = (
             PurchaseInvoice.query
-            .options(selectinload(PurchaseInvoice.items))
+            .options(*document_load_options(PurchaseInvoice))
             .filter_by(uuid=invoice_id, is_deleted=False)
             .first_or_404(description="Purchase invoice not found")
         )
 
-        # Build items_data list
-        item_ids = [i.item_id for i in invoice.items if i.item_id]
-        product_map = (
-            {p.id: p for p in Item.query.filter(Item.id.in_(item_ids)).all()}
-            if item_ids else {}
-        )
-
         items_data = []
         for inv_item in invoice.items:
             row = {
@@ -1100,20 +1067,17 @@ def download_purchase_invoice_pdf(invoice_id):
                 "tax": inv_item.tax or {},
                 "total_price": float(inv_item.total_price) if inv_item.total_price else 0,
             }
-            if inv_item.item_id and inv_item.item_id in product_map:
-                p = product_map[inv_item.item_id]
+            p = inv_item.item
+            if p:
                 row["product_name"] = p.item_name
                 row["hsn_sac_code"] = p.hsn_code
                 row["measuring_unit_id"] = p.measuring_unit_id
                 row["measuring_unit_name"] = p.measuring_unit.name if p.measuring_unit else "PCS"
-                
+
                 # Add image for PDF (base64 data URI)
-                from app.services.pdf_service import get_item_image_data_uri
-                main_image_obj = next((img for img in (p.images or []) if img.is_main), None)
-                if not main_image_obj and p.images:
-                    main_image_obj = p.images[0]
-                if main_image_obj:
-                    row["image"] = get_item_image_data_uri(p.id, main_image_obj.image)
+                image = main_item_image(p)
+                if image:
+                    row["image"] = item_image_data_uri(image)
             else:
                 row["product_name"] = inv_item.description or "Item"
             items_data.append(row)
@@ -1290,12 +1254,7 @@ def update_purchase_invoice_status(invoice_id):
         description: Invalid status or business logic violation
     """
     try:
-        # Get JWT claims
-        jwt_claims = get_jwt()
-        if isinstance(jwt_claims, str):
-            business_id = 1
-        else:
-            business_id = jwt_claims.get('business_id', 1)
+        business_id = current_business_id()
         
         invoice = PurchaseInvoice.query.filter_by(
             uuid=invoice_id, 
@@ -1,14 +1,17 @@
 from datetime import datetime, date
 from flask import Blueprint, request, jsonify, send_file
 from sqlalchemy import or_, func, desc, asc, and_, update
-from sqlalchemy.orm import selectinload
 from sqlalchemy.orm.attributes import flag_modified
 from sqlalchemy.exc import IntegrityError
 from app.extensions import db
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.streaming import stream_json_list
+from app.utils.sequences import next_document_number, peek_document_number
 from app.models.purchase_order import PurchaseOrder, PurchaseOrderItem
 from app.models.vendor import Vendor
-from app.models.inventory import Item
+from app.routes.vendor import vendor_names_query
 from app.services.pdf_service import generate_purchase_order_pdf
+from app.utils.document_loader import document_load_options, item_image_data_uri, item_image_url, load_document, main_item_image
 
 
 purchase_order_blueprint = Blueprint("purchase_order", __name__)
@@ -70,20 +73,17 @@ def _date_filter_query(query, model_class, date_filter):
 
     return query
 
-def generate_po_number():
-    """Generate a unique PO number like PO-1001."""
-    last = PurchaseOrder.query.order_by(PurchaseOrder.created_at.desc()).first()
-    if last and last.po_number:
-        try:
-            last_num = int(last.po_number.split("-")[1])
-            return f"PO-{last_num + 1}"
-        except (IndexError, ValueError):
-            pass
-    return "PO-1001"
+def generate_po_number(business_id=None):
+    """Allocate the business's next PO number (PO-1001, ...) in the current transaction."""
+    return next_document_number("purchase_order", business_id)
 
 
 def auto_close_overdue_pos():
-    """Bulk-close open POs whose delivery_date has passed."""
+    """
+    Bulk-close open POs whose delivery_date has passed.
+
+    Run by the ``close-overdue-purchase-orders`` job (app/utils/jobs.py), not by requests.
+    """
     today = date.today()
     result = db.session.execute(
         update(PurchaseOrder)
@@ -115,7 +115,7 @@ def get_next_po_number():
         description: Next PO number
     """
     try:
-        return jsonify({"next_po_number": generate_po_number()}), 200
+        return jsonify({"next_po_number": peek_document_number("purchase_order")}), 200
     except Exception as e:
         return jsonify({"error": "Failed to generate PO number", "details": str(e)}), 500
 
@@ -267,7 +267,7 @@ def create_purchase_order():
     """
     data = request.get_json()
     try:
-        po_number = data.get("po_number") or generate_po_number()
+        po_number = data.get("po_number") or generate_po_number(data["business_id"])
 
         charges = {
             "subtotal":                data.get("subtotal", 0),
@@ -380,26 +380,12 @@ def get_purchase_orders():
         description: Paginated list of purchase orders
     """
     try:
-        # Auto-close overdue POs
-        auto_close_overdue_pos()
-
         # ── Vendor dropdown shortcut ───────────────────────────────────────
         if request.args.get("vendor_dropdown_all") == "true":
-            rows = (
-                PurchaseOrder.query
-                .outerjoin(Vendor, PurchaseOrder.vendor_id == Vendor.uuid)
-                .with_entities(Vendor.uuid, Vendor.vendor_name, Vendor.company_name)
-                .distinct()
-                .all()
+            return stream_json_list(
+                vendor_names_query(PurchaseOrder.query.join(Vendor, PurchaseOrder.vendor_id == Vendor.uuid)),
+                lambda r: {"uuid": str(r.uuid), "name": r.name},
             )
-            result = []
-            for r in rows:
-                if r.uuid:
-                    name = r.vendor_name or r.company_name or ""
-                    if name:
-                        result.append({"uuid": str(r.uuid), "name": name})
-            result.sort(key=lambda x: x["name"].lower())
-            return jsonify(result), 200
 
         # ── Base query with vendor join ────────────────────────────────────
         query = PurchaseOrder.query.outerjoin(Vendor, PurchaseOrder.vendor_id == Vendor.uuid)
@@ -453,7 +439,7 @@ def get_purchase_orders():
         # ── Pagination ────────────────────────────────────────────────────
         page     = int(request.args.get("page", 1))
         per_page = int(request.args.get("per_page") or request.args.get("items_per_page") or 5)
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        pagination = paginate(query, page=page, per_page=per_page)
         pos = pagination.items
 
         # Batch-fetch vendors and purchase invoices
@@ -498,6 +484,7 @@ def get_purchase_orders():
             "data": result,
             "pagination": {
                 "total":          pagination.total,
+                "next_cursor":    pagination.next_cursor,
                 "items_per_page": per_page,
                 "current_page":   page,
                 "last_page":      pagination.pages,
@@ -509,6 +496,8 @@ def get_purchase_orders():
             },
         }), 200
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Failed to fetch purchase orders", "details": str(e)}), 500
 
@@ -535,22 +524,10 @@ def get_purchase_order(po_id):
         description: Not found
     """
     try:
-        po = (
-            PurchaseOrder.query
-            .options(selectinload(PurchaseOrder.items))
-            .filter_by(uuid=po_id)
-            .first()
-        )
+        po = load_document(PurchaseOrder, uuid=po_id)
         if not po:
             return jsonify({"error": "Purchase order not found"}), 404
 
-        # Batch-fetch inventory items
-        item_ids = [i.item_id for i in po.items if i.item_id]
-        inventory_map = {}
-        if item_ids:
-            inv_items = Item.query.filter(Item.id.in_(item_ids)).all()
-            inventory_map = {i.id: i for i in inv_items}
-
         items_data = []
         for poi in po.items:
             row = {
@@ -563,24 +540,16 @@ def get_purchase_order(po_id):
                 "tax":         poi.tax or {},
                 "total_price": float(poi.total_price) if poi.total_price else 0,
             }
-            if poi.item_id and poi.item_id in inventory_map:
-                inv = inventory_map[poi.item_id]
+            inv = poi.item
+            if inv:
                 row["product_name"]      = inv.item_name
                 row["hsn_sac_code"]      = inv.hsn_code
                 row["measuring_unit_id"] = inv.measuring_unit_id
                 row["measuring_unit_name"] = inv.measuring_unit.name if inv.measuring_unit else "PCS"
-                
+
                 # Add product image URL for the frontend
-                main_image_obj = next((img for img in (inv.images or []) if img.is_main), None)
-                if not main_image_obj and inv.images:
-                    main_image_obj = inv.images[0]
-                
-                if main_image_obj:
-                    row["product_image"] = f"/static/itemImages/{inv.id}/{main_image_obj.image}"
-                    row["image"]          = row["product_image"]  # Consistency with frontend
-                else:
-                    row["product_image"] = None
-                    row["image"]          = None
+                row["product_image"] = item_image_url(main_item_image(inv))
+                row["image"]         = row["product_image"]  # Consistency with frontend
             items_data.append(row)
 
         v = po.vendor
@@ -782,18 +751,11 @@ def download_purchase_order_pdf(po_id):
     try:
         po = (
             PurchaseOrder.query
-            .options(selectinload(PurchaseOrder.items))
+            .options(*document_load_options(PurchaseOrder))
             .filter_by(uuid=po_id)
             .first_or_404(description="Purchase order not found")
         )
 
-        # Build items_data list
-        item_ids = [i.item_id for i in po.items if i.item_id]
-        product_map = (
-            {p.id: p for p in Item.query.filter(Item.id.in_(item_ids)).all()}
-            if item_ids else {}
-        )
-
         items_data = []
         for poi in po.items:
             row = {
@@ -804,20 +766,17 @@ def download_purchase_order_pdf(po_id):
                 "tax":         poi.tax or {},
                 "total_price": float(poi.total_price) if poi.total_price else 0,
             }
-            if poi.item_id and poi.item_id in product_map:
-                p = product_map[poi.item_id]
+            p = poi.item
+            if p:
                 row["product_name"]      = p.item_name
                 row["hsn_sac_code"]      = p.hsn_code
                 row["measuring_unit_id"] = p.measuring_unit_id
                 row["measuring_unit_name"] = p.measuring_unit.name if p.measuring_unit else "PCS"
-                
+
                 # Add image for PDF (base64 data URI)
-                from app.services.pdf_service import get_item_image_data_uri
-                main_image_obj = next((img for img in (p.images or []) if img.is_main), None)
-                if not main_image_obj and p.images:
-                    main_image_obj = p.images[0]
-                if main_image_obj:
-                    row["image"] = get_item_image_data_uri(p.id, main_image_obj.image)
+                image = main_item_image(p)
+                if image:
+                    row["image"] = item_image_data_uri(image)
             else:
                 row["product_name"] = poi.description or "Item"
             items_data.append(row)
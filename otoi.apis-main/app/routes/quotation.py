@@ -1,39 +1,37 @@
-import base64
-import os
 from datetime import datetime, date
 from flask import Blueprint, request, jsonify, send_file
 from flask_cors import cross_origin
-from sqlalchemy import or_, func, desc, asc, and_, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy import func, desc, asc, and_, update
+from sqlalchemy.orm import aliased
 from sqlalchemy.orm.attributes import flag_modified
 from app.extensions import db
+from app.utils.pagination import paginate, InvalidCursor
+from app.utils.streaming import stream_json_list
+from app.utils.sequences import next_document_number, peek_document_number
 from app.models.quotation import Quotation, QuotationItem
 from app.models.customer import Customer
-from app.models.inventory import Item
+from app.utils.search import apply_search, contains_any, display_name_expr, full_name_expr
 from app.models.business import Business
 from app.models.user import User
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy.exc import IntegrityError
 from app.services.pdf_service import generate_quotation_pdf
-from app.config import Config
+from app.utils.document_loader import document_load_options, item_image_data_uri, item_image_url, load_document, main_item_image
 
 
 quotation_blueprint = Blueprint("quotation", __name__)
 
-def generate_quotation_number():
-    """Generate a unique quotation number like QT-1001"""
-    last_quotation = Quotation.query.order_by(Quotation.created_at.desc()).first()
-    if last_quotation and last_quotation.quotation_number:
-        try:
-            last_num = int(last_quotation.quotation_number.split('-')[1])
-            return f"QT-{last_num + 1}"
-        except (IndexError, ValueError):
-            pass
-    return "QT-1001"
+def generate_quotation_number(business_id=None):
+    """Allocate the business's next quotation number (QT-1001, ...) in the current transaction"""
+    return next_document_number("quotation", business_id)
 
 
 def check_and_update_quotation_status():
-    """Check and update quotation status based on valid_till date using a single bulk UPDATE."""
+    """
+    Check and update quotation status based on valid_till date using a single bulk UPDATE.
+
+    Run by the ``close-expired-quotations`` job (app/utils/jobs.py), not by requests.
+    """
     today = date.today()
 
     # Single bulk UPDATE — no Python-side loop, no extra SELECT
@@ -68,7 +66,7 @@ def get_next_quotation_number():
         description: Next quotation number
     """
     try:
-        next_number = generate_quotation_number()
+        next_number = peek_document_number("quotation")
         return jsonify({"next_quotation_number": next_number}), 200
     except Exception as e:
         return jsonify({"error": "Failed to generate quotation number", "details": str(e)}), 500
@@ -124,7 +122,7 @@ def create_quotation():
     data = request.get_json()
     try:
         # Generate quotation number
-        quotation_number = data.get("quotation_number") or generate_quotation_number()
+        quotation_number = data.get("quotation_number") or generate_quotation_number(data["business_id"])
         
         # Build charges JSON
         charges = {
@@ -274,9 +272,6 @@ def get_quotations():
         description: A paginated list of quotations.
     """
     try:
-        # Check and update quotation status based on valid_till date
-        check_and_update_quotation_status()
-        
         # Start with base query
         query = Quotation.query
         
@@ -289,33 +284,23 @@ def get_quotations():
         # Apply search filters with priority to search parameter
         if search:
             # If search parameter is provided, use it for both party name and quotation number
-            # Also handle multiple spaces by normalizing them
-            normalized_search = ' '.join(search.split())
-            query = query.outerjoin(Customer, Quotation.customer_id == Customer.uuid).filter(
-                or_(
-                    Quotation.quotation_number.ilike(f'%{search}%'),
-                    Customer.first_name.ilike(f'%{search}%'),
-                    Customer.last_name.ilike(f'%{search}%'),
-                    func.concat(Customer.first_name, ' ', Customer.last_name).ilike(f'%{search}%'),
-                    func.concat(Customer.first_name, ' ', Customer.last_name).ilike(f'%{normalized_search}%')
-                )
+            query = apply_search(
+                query.outerjoin(Customer, Quotation.customer_id == Customer.uuid),
+                search,
+                Quotation.quotation_number,
+                full_name_expr(Customer),
             )
         else:
             # If no search parameter, check individual filters
             if party_name:
-                # Handle multiple spaces by normalizing them
-                normalized_party_name = ' '.join(party_name.split())
-                query = query.outerjoin(Customer, Quotation.customer_id == Customer.uuid).filter(
-                    or_(
-                        Customer.first_name.ilike(f'%{party_name}%'),
-                        Customer.last_name.ilike(f'%{party_name}%'),
-                        func.concat(Customer.first_name, ' ', Customer.last_name).ilike(f'%{party_name}%'),
-                        func.concat(Customer.first_name, ' ', Customer.last_name).ilike(f'%{normalized_party_name}%')
-                    )
+                query = apply_search(
+                    query.outerjoin(Customer, Quotation.customer_id == Customer.uuid),
+                    party_name,
+                    full_name_expr(Customer),
                 )
             
             if quotation_number:
-                query = query.filter(Quotation.quotation_number.ilike(f'%{quotation_number}%'))
+                query = apply_search(query, quotation_number, Quotation.quotation_number)
             
             # If no filters are applied, ensure we still have the customer join for consistent behavior
             if not party_name and not quotation_number:
@@ -362,17 +347,22 @@ def get_quotations():
             else:
                 query = query.order_by(getattr(Quotation, sort, "id"))
 
-        # Return all quotations for dropdown if requested
+        # Stream all quotations for dropdown if requested
         if request.args.get("dropdown") == "true":
-            quotations = query.outerjoin(Customer, Quotation.customer_id == Customer.uuid).all()
-            return jsonify([
-                {
-                    "uuid": str(q.uuid),
-                    "quotation_number": q.quotation_number,
-                    "customer_name": f"{q.customer.first_name} {q.customer.last_name}" if q.customer else None
-                }
-                for q in quotations
-            ]), 200
+            # Aliased: the filters above may already have joined Customer
+            customer = aliased(Customer)
+            rows = query.outerjoin(customer, Quotation.customer_id == customer.uuid).with_entities(
+                Quotation.uuid,
+                Quotation.quotation_number,
+                customer.uuid.label("customer_uuid"),
+                customer.first_name,
+                customer.last_name,
+            )
+            return stream_json_list(rows, lambda q: {
+                "uuid": str(q.uuid),
+                "quotation_number": q.quotation_number,
+                "customer_name": f"{q.first_name} {q.last_name}" if q.customer_uuid else None
+            })
         
         # Return customer names dropdown if requested
         if request.args.get("customer_dropdown") == "true":
@@ -413,40 +403,30 @@ def get_quotations():
             
             return jsonify(result), 200
 
-        # Return all customers (party names) for dropdown if requested
+        # Stream all customers (party names) for dropdown if requested
         if request.args.get("customer_dropdown_all") == "true":
-            # Single JOIN query — fetch all distinct customers that have at least one quotation
+            # Single JOIN query — all distinct named customers with at least one quotation, by name
+            name = display_name_expr(Customer)
+            sort_name = func.lower(name).label("sort_name")
             customer_query = (
                 Quotation.query
-                .outerjoin(Customer, Quotation.customer_id == Customer.uuid)
-                .with_entities(
-                    Customer.uuid,
-                    Customer.first_name,
-                    Customer.last_name
-                )
+                .join(Customer, Quotation.customer_id == Customer.uuid)
+                .filter(name != "")
+                .with_entities(Customer.uuid, name.label("name"), sort_name)
                 .distinct()
-                .all()
+                .order_by(sort_name, Customer.uuid)
             )
-
-            result = []
-            for customer in customer_query:
-                if customer.uuid and (customer.first_name or customer.last_name):
-                    full_name = f"{customer.first_name or ''} {customer.last_name or ''}".strip()
-                    if full_name:
-                        result.append({
-                            "uuid": str(customer.uuid),
-                            "name": full_name
-                        })
-
-            result.sort(key=lambda x: x['name'].lower())
-            return jsonify(result), 200
+            return stream_json_list(customer_query, lambda customer: {
+                "uuid": str(customer.uuid),
+                "name": customer.name
+            })
 
         # Paginated results for main grid (same pattern as item.py)
         page = int(request.args.get("page", 1))
         # Accept both 'per_page' and 'items_per_page' for frontend compatibility
         per_page = int(request.args.get("per_page") or request.args.get("items_per_page") or 5)
         
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        pagination = paginate(query, page=page, per_page=per_page)
         quotations = pagination.items
 
         # Get customer data separately to avoid relationship issues
@@ -473,6 +453,7 @@ def get_quotations():
             "data": result,
             "pagination": {
                 "total": pagination.total,
+                "next_cursor": pagination.next_cursor,
                 "items_per_page": per_page,
                 "current_page": page,
                 "last_page": pagination.pages,
@@ -488,6 +469,8 @@ def get_quotations():
 
         return jsonify(response_data), 200
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({
             "error": "Failed to fetch quotations",
@@ -516,28 +499,11 @@ def get_quotation(quotation_id):
         description: Quotation not found
     """
     try:
-        # Check and update quotation status based on valid_till date
-        check_and_update_quotation_status()
-
-        # Eagerly load items in one extra SELECT (avoids lazy-load per attribute access)
-        quotation = (
-            Quotation.query
-            .options(selectinload(Quotation.items))
-            .filter_by(uuid=quotation_id)
-            .first()
-        )
+        # Lines, their inventory items and images load up front in a fixed number of queries
+        quotation = load_document(Quotation, uuid=quotation_id)
         if not quotation:
             return jsonify({"error": "Quotation not found"}), 404
 
-        # Batch-fetch all linked inventory items in a single IN query
-        item_ids = [qi.item_id for qi in quotation.items if qi.item_id]
-        inventory_map = {}
-        if item_ids:
-            inventory_items = Item.query.options(
-                selectinload(Item.images)
-            ).filter(Item.id.in_(item_ids)).all()
-            inventory_map = {i.id: i for i in inventory_items}
-
         items_data = []
         for item in quotation.items:
             item_info = {
@@ -551,19 +517,15 @@ def get_quotation(quotation_id):
                 "total_price": float(item.total_price) if item.total_price else 0,
             }
 
-            # Look up inventory item from pre-fetched map (no extra DB round-trip)
-            if item.item_id and item.item_id in inventory_map:
-                inv = inventory_map[item.item_id]
+            inv = item.item
+            if inv:
                 item_info["product_name"] = inv.item_name
                 item_info["hsn_sac_code"] = inv.hsn_code
                 item_info["measuring_unit_id"] = inv.measuring_unit_id
-                # Get the feature image for the item
-                main_image_obj = next((img for img in (inv.images or []) if img.is_main), None)
-                if not main_image_obj and inv.images:
-                    main_image_obj = inv.images[0]
-                if main_image_obj:
-                    # Return the path for the frontend (handled by resolveImageUrl)
-                    item_info["image"] = f"/static/itemImages/{main_image_obj.item_id}/{main_image_obj.image}"
+                # Path of the feature image for the frontend (handled by resolveImageUrl)
+                image_url = item_image_url(main_item_image(inv))
+                if image_url:
+                    item_info["image"] = image_url
 
             items_data.append(item_info)
 
@@ -892,11 +854,7 @@ def get_suggestions():
                 Customer.last_name,
                 func.concat(Customer.first_name, ' ', Customer.last_name).label('full_name')
             ).filter(
-                or_(
-                    Customer.first_name.ilike(f'%{search_term}%'),
-                    Customer.last_name.ilike(f'%{search_term}%'),
-                    func.concat(Customer.first_name, ' ', Customer.last_name).ilike(f'%{search_term}%')
-                )
+                contains_any(search_term, full_name_expr(Customer))
             ).distinct().limit(limit).all()
             
             suggestions = []
@@ -911,7 +869,7 @@ def get_suggestions():
         elif search_type == 'quotation_number':
             # Get quotation numbers
             quotations = Quotation.query.filter(
-                Quotation.quotation_number.ilike(f'%{search_term}%')
+                contains_any(search_term, Quotation.quotation_number)
             ).with_entities(
                 Quotation.quotation_number
             ).distinct().limit(limit).all()
@@ -960,24 +918,13 @@ def download_quotation_pdf(quotation_id):
         description: PDF generation failed
     """
     try:
-        # Eagerly load items so quotation.items is already populated
         quotation = (
             Quotation.query
-            .options(selectinload(Quotation.items))
+            .options(*document_load_options(Quotation))
             .filter_by(uuid=quotation_id)
             .first_or_404()
         )
 
-        # Batch-fetch all linked inventory items in one query (with images)
-        item_ids = [qi.item_id for qi in quotation.items if qi.item_id]
-        inventory_map = {}
-        if item_ids:
-            inventory_items = Item.query.options(
-                selectinload(Item.images)
-            ).filter(Item.id.in_(item_ids)).all()
-            inventory_map = {i.id: i for i in inventory_items}
-
-        # Build items data using the pre-fetched inventory map
         items_data = []
         for item in quotation.items:
             item_info = {
@@ -988,27 +935,14 @@ def download_quotation_pdf(quotation_id):
                 "tax": item.tax or {},
                 "total_price": float(item.total_price) if item.total_price else 0,
             }
-            if item.item_id and item.item_id in inventory_map:
-                inv = inventory_map[item.item_id]
+            inv = item.item
+            if inv:
                 item_info["product_name"] = inv.item_name
                 item_info["hsn_sac_code"] = inv.hsn_code
-                # Get the feature image for the item
-                main_image_obj = next((img for img in (inv.images or []) if img.is_main), None)
-                if not main_image_obj and inv.images:
-                    main_image_obj = inv.images[0]
-                if main_image_obj:
-                    # Resolve absolute path for PDF generation
-                    image_path = os.path.join(Config.ITEM_IMAGES_FOLDER, str(main_image_obj.item_id), main_image_obj.image)
-                    if os.path.exists(image_path):
-                        try:
-                            with open(image_path, "rb") as img_file:
-                                encoded_string = base64.b64encode(img_file.read()).decode('utf-8')
-                                extension = os.path.splitext(image_path)[1].lower()
-                                mime_type = "image/png" if extension == ".png" else "image/jpeg"
-                                item_info["image"] = f"data:{mime_type};base64,{encoded_string}"
-                        except Exception as e:
-                            print(f"Error encoding image for PDF: {e}")
-                            item_info["image"] = None
+                # Feature image embedded for PDF generation
+                image = main_item_image(inv)
+                if image:
+                    item_info["image"] = item_image_data_uri(image)
             items_data.append(item_info)
 
         pdf_buffer = generate_quotation_pdf(quotation, items_data)
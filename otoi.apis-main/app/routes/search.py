@@ -0,0 +1,95 @@
+from flask import Blueprint, jsonify, request
+
+from app.utils.decorators import role_required
+from app.utils.suggest import get_sources, suggest, suggest_index
+from app.utils.tenant import current_business_id
+
+search_blueprint = Blueprint("search", __name__)
+
+DEFAULT_SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 50
+
+
+@search_blueprint.route("/suggest", methods=["GET"])
+def get_suggestions():
+    """
+    Typeahead suggestions across parties, items and document numbers
+    ---
+    tags:
+      - Search
+    parameters:
+      - name: q
+        in: query
+        required: true
+        schema:
+          type: string
+        description: Text typed so far
+      - name: types
+        in: query
+        required: false
+        schema:
+          type: string
+        description: >
+          Comma-separated kinds to search (customer, vendor, item, invoice,
+          quotation, purchase_invoice, debit_note). Defaults to all.
+      - name: limit
+        in: query
+        required: false
+        schema:
+          type: integer
+          default: 10
+          maximum: 50
+    responses:
+      200:
+        description: >
+          Suggestions ranked by label prefix, then word prefix, then substring
+          match. Each has type, id, label, detail and match.
+      400:
+        description: Unknown type requested
+      403:
+        description: The token carries no business
+    """
+    try:
+        business_id = current_business_id()
+        if business_id is None:
+            return jsonify({"success": False, "error": "No business selected"}), 403
+
+        term = request.args.get("q", "")
+        limit = request.args.get("limit", DEFAULT_SUGGEST_LIMIT, type=int) or DEFAULT_SUGGEST_LIMIT
+        limit = max(1, min(limit, MAX_SUGGEST_LIMIT))
+
+        kinds = None
+        types = request.args.get("types", "").strip()
+        if types:
+            kinds = [kind.strip() for kind in types.split(",") if kind.strip()]
+            unknown = [kind for kind in kinds if kind not in get_sources()]
+            if unknown:
+                return jsonify({
+                    "success": False,
+                    "error": f"Unknown type(s): {', '.join(unknown)}",
+                    "allowed_types": list(get_sources().keys()),
+                }), 400
+
+        results = suggest(term, kinds=kinds, business_id=business_id, limit=limit)
+        return jsonify({"success": True, "data": results}), 200
+
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+# --- Suggest Index Statistics (Admin only) ---
+@search_blueprint.route("/index-stats", methods=["GET"])
+@role_required(["Admin"])
+def get_suggest_index_stats():
+    """
+    Size and hit counters of this worker's suggest prefix index
+    ---
+    tags:
+      - Search
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Index statistics for the worker that served the request
+    """
+    return jsonify(suggest_index.stats()), 200
@@ -1,7 +1,10 @@
-from flask import Blueprint, jsonify, request, send_file, current_app
+from flask import Blueprint, jsonify, request, send_file
 from flask_cors import CORS
-from app.models import Invoice, Quotation, PurchaseOrder, PurchaseInvoice, Item, CreditNote, DebitNote
+from app.models import Invoice, Quotation, PurchaseOrder, PurchaseInvoice, CreditNote, DebitNote
 from app.extensions import db
+from app.utils.decorators import public_endpoint
+from app.utils.document_loader import item_image_data_uri, load_document, main_item_image
+from app.utils.tenant import set_tenant
 from app.services.mail_service import send_email
 from app.services.pdf_service import (
     generate_invoice_pdf, 
@@ -12,7 +15,6 @@ from app.services.pdf_service import (
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
 import os
 import traceback
-import base64
 import datetime
 
 def get_base_url():
@@ -52,7 +54,7 @@ def verify_pdf_token(token, max_age=604800):  # 7 days expiry
         return None, None
 
 def _get_items_data(entity):
-    """Refactored from individual routes to build items_data for PDF service"""
+    """Refactored from individual routes to build items_data for PDF service; expects ``load_document`` output"""
     items_data = []
     for item in entity.items:
         item_info = {
@@ -66,54 +68,16 @@ def _get_items_data(entity):
             "total_price": float(item.total_price) if item.total_price else 0,
         }
         
-        if item.item_id:
-            inventory_item = Item.query.get(item.item_id)
-            if inventory_item:
-                item_info["product_name"] = inventory_item.item_name
-                item_info["hsn_sac_code"] = inventory_item.hsn_code
-                
-                # Fetch image if available
-                main_image_obj = next((img for img in (inventory_item.images or []) if img.is_main), None)
-                if not main_image_obj and inventory_item.images:
-                    main_image_obj = inventory_item.images[0]
-                if main_image_obj and main_image_obj.image:
-                    img_raw = main_image_obj.image
-                    # Robust handling for bytes vs string paths/data
-                    if isinstance(img_raw, str):
-                        if img_raw.startswith("data:"):
-                            item_info["image"] = img_raw
-                        else:
-                            # Item images are nested: static/itemImages/<item_uuid>/<filename>
-                            images_dir = current_app.config.get('ITEM_IMAGES_FOLDER')
-                            if images_dir:
-                                item_uuid = str(main_image_obj.item_id)
-                                # Primary: try standard nested path
-                                p = os.path.join(images_dir, item_uuid, img_raw)
-                                
-                                # Fallback: scan all subfolders for the filename (robust for manual uploads)
-                                if not os.path.exists(p):
-                                    for folder in os.listdir(images_dir):
-                                        candidate_p = os.path.join(images_dir, folder, img_raw)
-                                        if os.path.exists(candidate_p):
-                                            p = candidate_p
-                                            break
-                                
-                                # Final verification
-                                if os.path.exists(p):
-                                    print(f"--- PDF Item Image Debug ---")
-                                    print(f"Found image: {p}")
-                                    with open(p, "rb") as f:
-                                        encoded_string = base64.b64encode(f.read()).decode("utf-8")
-                                        ext = os.path.splitext(p)[1].lower()
-                                        mime = "image/png" if ext == ".png" else "image/jpeg"
-                                        item_info["image"] = f"data:{mime};base64,{encoded_string}"
-                                else:
-                                    print(f"--- PDF Item Image MISSING ---")
-                                    print(f"Key: {img_raw}, Tried: {p}")
-                    else:
-                        # It's already bytes (binary column)
-                        item_info["image"] = f"data:image/jpeg;base64,{base64.b64encode(img_raw).decode('utf-8')}"
-        
+        inventory_item = item.item
+        if inventory_item:
+            item_info["product_name"] = inventory_item.item_name
+            item_info["hsn_sac_code"] = inventory_item.hsn_code
+
+            # Embed the feature image; manually copied uploads may sit in another item's folder
+            image = main_item_image(inventory_item)
+            if image:
+                item_info["image"] = item_image_data_uri(image, search_folders=True)
+
         items_data.append(item_info)
     return items_data
 
@@ -199,7 +163,33 @@ def get_share_data(uuid):
         traceback.print_exc()
         return jsonify({"success": False, "error": str(e)}), 500
 
+# Share token object types -> document model
+SHARED_DOCUMENT_MODELS = {
+    'invoice': Invoice,
+    'quotation': Quotation,
+    'purchase_order': PurchaseOrder,
+    'purchase_invoice': PurchaseInvoice,
+    'credit_note': CreditNote,
+    'debit_note': DebitNote,
+}
+
+
+def _adopt_document_tenant(obj_type, uuid):
+    """Act as the business owning the shared document, so the tenant-scoped loads below can see it."""
+    model = SHARED_DOCUMENT_MODELS.get(obj_type)
+    business_id = None
+    if model is not None:
+        business_id = (
+            db.session.query(model.business_id)
+            .filter(model.uuid == uuid)
+            .execution_options(all_tenants=True)
+            .scalar()
+        )
+    set_tenant(business_id)
+
+
 @share_blueprint.route('/public/pdf/<token>', methods=['GET'])
+@public_endpoint
 def get_public_pdf(token):
     """Unauthenticated access to PDF via secure token"""
     uuid, obj_type = verify_pdf_token(token)
@@ -208,34 +198,35 @@ def get_public_pdf(token):
         return "Invalid or expired download link", 401
     
     try:
+        _adopt_document_tenant(obj_type, uuid)
         entity = None
         pdf_func = None
         filename = f"{obj_type}_{uuid[:8]}.pdf"
 
         if obj_type == 'invoice':
-            entity = Invoice.query.filter_by(uuid=uuid).first()
+            entity = load_document(Invoice, uuid=uuid)
             pdf_func = generate_invoice_pdf
             filename = f"Invoice_{entity.invoice_number}.pdf" if entity else filename
         elif obj_type == 'quotation':
-            entity = Quotation.query.filter_by(uuid=uuid).first()
+            entity = load_document(Quotation, uuid=uuid)
             pdf_func = generate_quotation_pdf
             filename = f"Quotation_{entity.quotation_number}.pdf" if entity else filename
         elif obj_type == 'purchase_order':
-            entity = PurchaseOrder.query.filter_by(uuid=uuid).first()
+            entity = load_document(PurchaseOrder, uuid=uuid)
             pdf_func = generate_purchase_order_pdf
             filename = f"PO_{entity.po_number}.pdf" if entity else filename
         elif obj_type == 'purchase_invoice':
-            entity = PurchaseInvoice.query.filter_by(uuid=uuid).first()
+            entity = load_document(PurchaseInvoice, uuid=uuid)
             pdf_func = generate_purchase_invoice_pdf
             filename = f"PurchaseInv_{entity.invoice_number}.pdf" if entity else filename
         elif obj_type == 'credit_note':
             from app.services.pdf_service import generate_credit_note_pdf
-            entity = CreditNote.query.filter_by(uuid=uuid).first()
+            entity = load_document(CreditNote, uuid=uuid)
             pdf_func = generate_credit_note_pdf
             filename = f"CreditNote_{entity.credit_note_number}.pdf" if entity else filename
         elif obj_type == 'debit_note':
             from app.services.pdf_service import generate_debit_note_pdf
-            entity = DebitNote.query.filter_by(uuid=uuid).first()
+            entity = load_document(DebitNote, uuid=uuid)
             pdf_func = generate_debit_note_pdf
             filename = f"DebitNote_{entity.debit_note_number}.pdf" if entity else filename
 
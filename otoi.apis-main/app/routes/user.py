@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from app.extensions import db
+from app.utils.pagination import paginate, InvalidCursor
 from app.models.user import User, Role
 from app.utils.stamping import set_created_fields, set_updated_fields, set_business
 from sqlalchemy import or_, func, cast, String
@@ -7,6 +8,8 @@ from sqlalchemy.orm import joinedload
 from sqlalchemy.exc import IntegrityError
 from flask import current_app, g
 from app.utils.decorators import role_required
+from app.utils.user_cache import invalidate_user, user_status_cache
+from app.services.auth_service import password_hash_pool
 
 # --- Existing Blueprint for Profile (Login/Signup) ---
 user_profile_blueprint = Blueprint("user_profile", __name__, url_prefix="")  # Prefix will be set during registration
@@ -218,7 +221,7 @@ def get_all_users():
         # --- Pagination ---
         page = int(request.args.get("page", 1))
         per_page = int(request.args.get("items_per_page", 5))
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        pagination = paginate(query, page=page, per_page=per_page)
         users = pagination.items
 
         # --- Build Response ---
@@ -248,9 +251,11 @@ def get_all_users():
         return jsonify({
             "pages": pagination.pages,
             "data": result,
-            "pagination": {"total": pagination.total}
+            "pagination": {"total": pagination.total, "next_cursor": pagination.next_cursor}
         })
 
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         db.session.rollback()
         import traceback
@@ -259,6 +264,91 @@ def get_all_users():
         current_app.logger.error(error_details)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
+# --- User Status Cache Statistics (Admin only) ---
+@user_blueprint.route("/cache-stats", methods=["GET"])
+@role_required(["Admin"])
+def get_user_cache_stats():
+    """
+    Hit/miss counters of this worker's user status cache
+    ---
+    tags:
+      - User Management
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Cache statistics for the worker that served the request
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                size:
+                  type: integer
+                max_size:
+                  type: integer
+                ttl:
+                  type: number
+                hits:
+                  type: integer
+                misses:
+                  type: integer
+                evictions:
+                  type: integer
+                hit_ratio:
+                  type: number
+      403:
+        description: Forbidden - Admin role required
+    """
+    return jsonify(user_status_cache.stats()), 200
+
+# --- Password Hash Pool Statistics (Admin only) ---
+@user_blueprint.route("/hash-pool-stats", methods=["GET"])
+@role_required(["Admin"])
+def get_hash_pool_stats():
+    """
+    Queue depth and latency percentiles of this worker's password hashing pool
+    ---
+    tags:
+      - User Management
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Pool statistics for the worker that served the request
+        content:
+          application/json:
+            schema:
+              type: object
+              properties:
+                workers:
+                  type: integer
+                queue_limit:
+                  type: integer
+                in_flight:
+                  type: integer
+                queue_depth:
+                  type: integer
+                completed:
+                  type: integer
+                rejected:
+                  type: integer
+                latency_ms:
+                  type: object
+                  properties:
+                    samples:
+                      type: integer
+                    p50:
+                      type: number
+                    p95:
+                      type: number
+                    p99:
+                      type: number
+      403:
+        description: Forbidden - Admin role required
+    """
+    return jsonify(password_hash_pool.stats()), 200
+
 # --- Fetch Single User (Admin/User) ---
 @user_blueprint.route("/<string:user_uuid>", methods=["GET"])
 @role_required(["Admin", "User", "Manager"])
@@ -716,6 +806,7 @@ def update_user(user_uuid):
         user.update_ut_status()
         set_updated_fields(user)
         db.session.commit()
+        invalidate_user(user.uuid)
         
         # Return updated user data
         businesses = [{"id": business.id, "name": business.name} for business in user.businesses]
@@ -815,6 +906,7 @@ def delete_user(user_uuid):
 
         db.session.delete(user)
         db.session.commit()
+        invalidate_user(user_uuid)
         return jsonify({"message": "User deleted successfully"}), 200
 
     except IntegrityError:
@@ -2,28 +2,45 @@ from sqlite3 import IntegrityError
 from flask import Blueprint, jsonify, request
 from app.models.vendor import Vendor
 from app.extensions import db
-from sqlalchemy import func, or_
+from app.utils.pagination import paginate
+from app.utils.streaming import stream_json_list
+from sqlalchemy import func
+from app.utils.search import apply_search
 
 vendor_blueprint = Blueprint("vendor", __name__, url_prefix="/vendors")
 
+
+def vendor_names_query(query):
+    """
+    Distinct named vendors among the rows of ``query`` (which must include
+    Vendor), ordered by name case-insensitively. The name is vendor_name,
+    else company_name, as the vendor dropdowns show it.
+    """
+    name = func.coalesce(func.nullif(Vendor.vendor_name, ""), func.nullif(Vendor.company_name, ""))
+    sort_name = func.lower(name).label("sort_name")
+    return (
+        query
+        .filter(name.isnot(None))
+        .with_entities(Vendor.uuid, name.label("name"), sort_name)
+        .distinct()
+        .order_by(sort_name, Vendor.uuid)
+    )
+
 # GET all vendors (support both with and without trailing slash)
 @vendor_blueprint.route("/", methods=["GET"])
 def get_vendors():
     query = Vendor.query
 
     # Basic filtering by a generic query term
-    q = (request.args.get("query") or "").strip()
-    if q:
-        like = f"%{q}%"
-        query = query.filter(
-            or_(
-                Vendor.company_name.ilike(like),
-                Vendor.vendor_name.ilike(like),
-                Vendor.email.ilike(like),
-                Vendor.mobile.ilike(like),
-                Vendor.gst.ilike(like),
-            )
-        )
+    query = apply_search(
+        query,
+        request.args.get("query"),
+        Vendor.company_name,
+        Vendor.vendor_name,
+        Vendor.email,
+        Vendor.mobile,
+        Vendor.gst,
+    )
     sort = request.args.get("sort", "uuid")
     order = request.args.get("order", "asc").lower()
 
@@ -53,20 +70,18 @@ def get_vendors():
                 query = query.order_by(db.desc(getattr(Vendor, field[1:], "uuid")))
             else:
                 query = query.order_by(getattr(Vendor, field, "uuid"))
-    # Return all vendors for dropdown if requested
+    # Stream all vendors for dropdown if requested
     if request.args.get("dropdown") == "true":
-        return jsonify([
-            {
-                "uuid": str(v.uuid),
-                "name": f"{v.company_name}".strip() # Use company_name as the display name for dropdown because vendor_name is optional and may be None
-            }
-            for v in query.all()
-        ])
+        rows = query.with_entities(Vendor.uuid, Vendor.company_name)
+        return stream_json_list(rows, lambda v: {
+            "uuid": str(v.uuid),
+            "name": f"{v.company_name}".strip() # Use company_name as the display name for dropdown because vendor_name is optional and may be None
+        })
 
     # Pagination
     page = int(request.args.get("page", 1))
     per_page = int(request.args.get("items_per_page", 5))
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+    pagination = paginate(query, page=page, per_page=per_page)
     vendors = pagination.items
 
     return jsonify({
@@ -90,6 +105,7 @@ def get_vendors():
         ],
         "pagination": {
             "total": pagination.total,
+            "next_cursor": pagination.next_cursor,
             "items_per_page": per_page,
             "current_page": page,
             "last_page": pagination.pages,
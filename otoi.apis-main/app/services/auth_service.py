@@ -1,7 +1,247 @@
+import os
+import time
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+from flask import current_app, has_app_context
 from werkzeug.security import generate_password_hash, check_password_hash
 
-def hash_password(password):
-    return generate_password_hash(password)
+DEFAULT_PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+DEFAULT_PASSWORD_SALT_LENGTH = 16
+
+
+def _configured_method():
+    if has_app_context():
+        return current_app.config.get("PASSWORD_HASH_METHOD") or DEFAULT_PASSWORD_HASH_METHOD
+    return DEFAULT_PASSWORD_HASH_METHOD
+
+
+def _configured_salt_length():
+    if has_app_context():
+        return int(current_app.config.get("PASSWORD_SALT_LENGTH") or DEFAULT_PASSWORD_SALT_LENGTH)
+    return DEFAULT_PASSWORD_SALT_LENGTH
+
+
+@lru_cache(maxsize=16)
+def _normalized_method(method):
+    """
+    Expand a short method name ("pbkdf2", "scrypt") to the full parameter
+    string werkzeug stores in front of the hash ("pbkdf2:sha256:1000000").
+    """
+    return generate_password_hash("", method=method, salt_length=1).split("$", 1)[0]
+
+
+def hash_password(password, method=None):
+    return generate_password_hash(
+        password,
+        method=method or _configured_method(),
+        salt_length=_configured_salt_length(),
+    )
+
 
 def verify_password(password, hashed_password):
     return check_password_hash(hashed_password, password)
+
+
+def needs_rehash(hashed_password):
+    """True when the stored hash was made with a different method or cost than configured."""
+    if not hashed_password or "$" not in hashed_password:
+        return True
+    return hashed_password.split("$", 1)[0] != _normalized_method(_configured_method())
+
+
+def benchmark_password_hash(method, rounds=10):
+    """
+    Time ``rounds`` hash + verify cycles for ``method``.
+
+    Returns a dict of per-operation latencies in milliseconds.
+    """
+    hash_times = []
+    verify_times = []
+    password = "Benchmark-P@ssw0rd"
+
+    for _ in range(rounds):
+        start = time.perf_counter()
+        hashed = generate_password_hash(password, method=method, salt_length=_configured_salt_length())
+        hash_times.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        check_password_hash(hashed, password)
+        verify_times.append((time.perf_counter() - start) * 1000)
+
+    def _summary(samples):
+        ordered = sorted(samples)
+        return {
+            "avg_ms": sum(ordered) / len(ordered),
+            "p50_ms": ordered[len(ordered) // 2],
+            "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "max_ms": ordered[-1],
+        }
+
+    return {
+        "method": _normalized_method(method),
+        "rounds": rounds,
+        "hash": _summary(hash_times),
+        "verify": _summary(verify_times),
+    }
+
+
+class PasswordHashPoolSaturated(Exception):
+    """Raised when every KDF worker is busy and the wait queue is full, or the pool cannot answer in time."""
+
+
+class PasswordHashPool:
+    """
+    Bounded process pool that runs password KDF work off the request thread.
+
+    At most ``workers + queue_limit`` hash operations are admitted per web
+    worker; further calls fail fast with ``PasswordHashPoolSaturated`` so the
+    route can answer 503 instead of piling up behind the KDF. With
+    ``workers = 0`` hashing runs inline on the calling thread.
+
+    A call that times out, or whose worker process died, also raises
+    ``PasswordHashPoolSaturated``. A timed-out job keeps its slot until the
+    process actually finishes it, so abandoned work still counts against the
+    bound; a broken pool is replaced on the next call.
+    """
+
+    def __init__(self, workers=2, queue_limit=8, timeout=10.0, sample_size=1000):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.broken = 0
+        self._latencies = deque(maxlen=sample_size)
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def configure(self, workers, queue_limit, timeout):
+        with self._lock:
+            self.workers = workers
+            self.queue_limit = queue_limit
+            self.timeout = timeout
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _get_executor(self):
+        # gunicorn forks after import; each web worker needs its own pool
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _discard_executor(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+            self.broken += 1
+        executor.shutdown(wait=False)
+
+    def _release(self, start):
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self._latencies.append(elapsed_ms)
+
+    def run(self, fn, *args):
+        with self._lock:
+            if self.workers > 0 and self.in_flight >= self.workers + self.queue_limit:
+                self.rejected += 1
+                raise PasswordHashPoolSaturated()
+            self.in_flight += 1
+
+        start = time.perf_counter()
+        if self.workers <= 0:
+            try:
+                return fn(*args)
+            finally:
+                self._release(start)
+
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._release(start)
+            self._discard_executor(executor)
+            raise PasswordHashPoolSaturated() from None
+        # The slot is held until the process is done with the job, not until we stop waiting
+        future.add_done_callback(lambda _: self._release(start))
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise PasswordHashPoolSaturated() from None
+        except BrokenProcessPool:
+            self._discard_executor(executor)
+            raise PasswordHashPoolSaturated() from None
+
+    def stats(self):
+        with self._lock:
+            samples = sorted(self._latencies)
+            in_flight = self.in_flight
+            stats = {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": in_flight,
+                "queue_depth": max(0, in_flight - self.workers),
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "broken": self.broken,
+            }
+
+        def _percentile(fraction):
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(len(samples) * fraction))], 2)
+
+        stats["latency_ms"] = {
+            "samples": len(samples),
+            "p50": _percentile(0.50),
+            "p95": _percentile(0.95),
+            "p99": _percentile(0.99),
+        }
+        return stats
+
+
+password_hash_pool = PasswordHashPool()
+
+
+def pool_hash_password(password):
+    """Hash ``password`` with the configured method on the KDF pool."""
+    return password_hash_pool.run(
+        generate_password_hash, password, _configured_method(), _configured_salt_length()
+    )
+
+
+def pool_verify_password(password, hashed_password):
+    """Verify ``password`` against ``hashed_password`` on the KDF pool."""
+    return password_hash_pool.run(check_password_hash, hashed_password, password)
+
+
+def init_password_hash_pool(app):
+    """
+    Size the KDF pool from the application config.
+
+    Config:
+        PASSWORD_HASH_WORKERS      Processes per web worker (0 runs hashing inline).
+        PASSWORD_HASH_QUEUE_LIMIT  Extra requests allowed to wait for a process.
+        PASSWORD_HASH_TIMEOUT      Seconds to wait for a result before failing.
+    """
+    password_hash_pool.configure(
+        workers=int(app.config.get("PASSWORD_HASH_WORKERS", 2)),
+        queue_limit=int(app.config.get("PASSWORD_HASH_QUEUE_LIMIT", 8)),
+        timeout=float(app.config.get("PASSWORD_HASH_TIMEOUT", 10)),
+    )
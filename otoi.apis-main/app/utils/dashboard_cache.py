@@ -0,0 +1,219 @@
+"""
+Dashboard Response Cache
+========================
+Caches the JSON responses of the /api/dashboard/* endpoints per tenant,
+endpoint and query string, and drops them when that tenant's documents change.
+
+Usage:
+    from app.utils.dashboard_cache import cached_dashboard_view, init_dashboard_cache
+
+    # In app/__init__.py inside create_app():
+    init_dashboard_cache(app)
+
+    @dashboard_blueprint.route("/summary")
+    @cached_dashboard_view("summary")
+    def get_dashboard_summary(): ...
+
+Responses live in Flask-Caching (``SimpleCache`` per worker, or
+``FileSystemCache`` shared by all workers on the host). Every key embeds the
+tenant's generation token. A commit that touches a tenant's invoices,
+payments, notes, orders, quotations or parties replaces the token. From then
+on, that tenant's old responses are never read again and age out on their
+own. Bulk ``query.update()`` writes bypass the session hooks; call
+``invalidate_dashboard_cache()`` after them.
+"""
+
+import hashlib
+import threading
+import uuid
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.extensions import cache
+from app.utils.tenant import current_business_id
+
+_GLOBAL_GENERATION = "all"
+_CHANGES_KEY = "dashboard_cache_tenants"
+
+
+class DashboardCacheStats:
+    """Per-worker counters of the dashboard cache."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def incr(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def as_dict(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "stores": self.stores,
+                "invalidations": self.invalidations,
+            }
+
+
+stats = DashboardCacheStats()
+_enabled = False
+
+
+# ──────────────────────────────────────────
+# Generations
+# ──────────────────────────────────────────
+
+def _generation_key(scope):
+    return f"dashboard:generation:{scope}"
+
+
+def _generation(scope):
+    token = cache.get(_generation_key(scope))
+    if token is None:
+        token = uuid.uuid4().hex
+        # add() so concurrent first requests agree on one token
+        if not cache.add(_generation_key(scope), token, timeout=0):
+            token = cache.get(_generation_key(scope)) or token
+    return token
+
+
+def invalidate_dashboard_cache(business_id=None):
+    """Drop cached dashboard responses of one tenant, or of every tenant when None."""
+    if not _enabled:
+        return
+    cache.set(_generation_key(_GLOBAL_GENERATION if business_id is None else business_id), uuid.uuid4().hex, timeout=0)
+    stats.incr("invalidations")
+
+
+def _response_key(business_id, endpoint):
+    args = urlencode(sorted(request.args.items(multi=True)))
+    digest = hashlib.sha1(args.encode()).hexdigest()[:16]
+    return (
+        f"dashboard:{business_id}:{_generation(_GLOBAL_GENERATION)}:{_generation(business_id)}"
+        f":{endpoint}:{digest}"
+    )
+
+
+# ──────────────────────────────────────────
+# View decorator
+# ──────────────────────────────────────────
+
+def cached_dashboard_view(endpoint):
+    """Serve a dashboard view from the cache; only 200 responses are stored."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            business_id = current_business_id()
+            if not _enabled or business_id is None:
+                return view(*args, **kwargs)
+
+            # The key (and so the generation) is taken before the view reads the
+            # database: a write committed meanwhile stores under the stale key.
+            key = _response_key(business_id, endpoint)
+            entry = cache.get(key)
+            if entry is not None:
+                stats.incr("hits")
+                body, mimetype = entry
+                response = current_app.response_class(body, status=200, mimetype=mimetype)
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            stats.incr("misses")
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                cache.set(key, (response.get_data(), response.mimetype))
+                stats.incr("stores")
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+# ──────────────────────────────────────────
+# Write-driven invalidation
+# ──────────────────────────────────────────
+
+_tracked_models = None
+
+
+def _tracked():
+    """Models whose changes show up on the dashboard."""
+    global _tracked_models
+    if _tracked_models is None:
+        from app.models.invoice import Invoice
+        from app.models.purchase_invoice import PurchaseInvoice
+        from app.models.purchase_order import PurchaseOrder
+        from app.models.quotation import Quotation
+        from app.models.creditIn import CreditNote, CreditNotePayment
+        from app.models.debit_note import DebitNote, DebitNotePayment
+        from app.models.paymentIn import PaymentIn
+        from app.models.paymentOut import PaymentOut
+        from app.models.customer import Customer
+        from app.models.vendor import Vendor
+
+        _tracked_models = (
+            Invoice, PurchaseInvoice, PurchaseOrder, Quotation, CreditNote, CreditNotePayment,
+            DebitNote, DebitNotePayment, PaymentIn, PaymentOut, Customer, Vendor,
+        )
+    return _tracked_models
+
+
+def _collect_tenants(session, flush_context):
+    models = _tracked()
+    tenants = session.info.setdefault(_CHANGES_KEY, set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, models):
+            # Payments and parties carry no business_id; they belong to the request's tenant
+            business_id = getattr(obj, "business_id", None) or current_business_id()
+            if business_id is not None:
+                tenants.add(business_id)
+
+
+def _invalidate_committed(session):
+    for business_id in session.info.pop(_CHANGES_KEY, ()):
+        invalidate_dashboard_cache(business_id)
+
+
+def _discard_tenants(session):
+    session.info.pop(_CHANGES_KEY, None)
+
+
+def init_dashboard_cache(app):
+    """
+    Initialise Flask-Caching for the dashboard and hook invalidation to commits.
+
+    Config:
+        DASHBOARD_CACHE_TYPE       SimpleCache (per worker), FileSystemCache (shared) or NullCache (off).
+        DASHBOARD_CACHE_DIR        Directory for FileSystemCache.
+        DASHBOARD_CACHE_TIMEOUT    Seconds a response is kept even without writes.
+        DASHBOARD_CACHE_THRESHOLD  Entries kept before the backend starts evicting.
+    """
+    global _enabled
+    cache_type = app.config.get("DASHBOARD_CACHE_TYPE", "SimpleCache")
+    timeout = int(app.config.get("DASHBOARD_CACHE_TIMEOUT", 60))
+    cache.init_app(app, config={
+        "CACHE_TYPE": cache_type,
+        "CACHE_DIR": app.config.get("DASHBOARD_CACHE_DIR"),
+        "CACHE_DEFAULT_TIMEOUT": timeout,
+        "CACHE_THRESHOLD": int(app.config.get("DASHBOARD_CACHE_THRESHOLD", 2000)),
+    })
+    _enabled = cache_type != "NullCache" and timeout > 0
+
+    if not event.contains(Session, "after_flush", _collect_tenants):
+        event.listen(Session, "after_flush", _collect_tenants)
+        event.listen(Session, "after_commit", _invalidate_committed)
+        event.listen(Session, "after_rollback", _discard_tenants)
@@ -1,8 +1,18 @@
-from uuid import UUID
-from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity, get_jwt
 from functools import wraps
 from flask import jsonify, request, Response, g
-from app.models.user import User
+from app.utils.user_cache import get_user_status
+
+def public_endpoint(fn):
+    """
+    Mark a view as reachable without a JWT.
+
+    Public views are collected from the URL map by ``init_public_routes`` at
+    app start-up; a blueprint can be made public as a whole by setting
+    ``blueprint.public = True`` before it is registered.
+    """
+    fn.is_public = True
+    return fn
 
 def login_required(fn):
     @wraps(fn)
@@ -39,6 +49,15 @@ def business_required(fn):
     return wrapper
 
 def role_required(required_roles):
+    """
+    Allow the view only for users whose role is in ``required_roles``.
+
+    The role comes from the signed ``role`` claim issued at login, so no
+    ``users``/``roles`` query is made. The claim is checked against the role
+    held in the user status cache (see ``app.utils.user_cache``); a token
+    minted before the user's role changed is rejected, so revoked roles stop
+    working once that cache entry is invalidated or expires.
+    """
     def decorator(fn):
         @wraps(fn)
         def wrapper(*args, **kwargs):
@@ -49,17 +68,23 @@ def role_required(required_roles):
             
             # Check if middleware already authenticated the user
             if hasattr(g, 'user_id') and g.user_id:
-                identity = g.user_id
+                role = g.get("role")
+                status = g.get("user_status") or get_user_status(g.user_id)
             else:
                 # If not authenticated by middleware, verify JWT now
                 verify_jwt_in_request()
-                identity = get_jwt_identity()
+                role = get_jwt().get("role")
+                status = get_user_status(get_jwt_identity())
             
-            user = User.query.filter_by(uuid=UUID(identity)).first()
-            
-            if not user or user.role.name not in required_roles:
+            if not status or not status.is_active:
+                return jsonify({"error": "Account deactivated or user not found. Please log in again."}), 403
+
+            if status.role != role:
+                return jsonify({"error": "Your role has changed. Please log in again."}), 403
+
+            if role not in required_roles:
                 return jsonify({"error": "Access forbidden: unauthrised role"}), 403
             
             return fn(*args, **kwargs)
         return wrapper
-    return decorator
\ No newline at end of file
+    return decorator
@@ -0,0 +1,100 @@
+"""
+Document Loader
+===============
+Loads a document (invoice, quotation, purchase order, purchase invoice,
+credit note, debit note) together with its line items, the inventory
+``Item`` behind each line and that item's images in a fixed number of
+queries, however many lines the document has.
+
+Usage:
+    from app.utils.document_loader import load_document, main_item_image, item_image_url
+
+    invoice = load_document(Invoice, uuid=invoice_id)
+    for line in invoice.items:
+        image = main_item_image(line.item)          # no query
+        url = item_image_url(image)                 # "/static/itemImages/<item>/<file>"
+
+Each relationship is loaded with ``selectinload``: one SELECT for the
+document, then one each for its lines, their items, the items' images and
+measuring units and the customer or vendor, so a 200-line invoice costs six
+queries instead of one to three per line.
+"""
+
+import base64
+import os
+
+from flask import current_app
+from sqlalchemy.orm import selectinload
+
+from app.models.inventory import Item
+
+
+def document_load_options(model):
+    """Loader options that bring in ``model``'s lines, their items (images, unit), and its party."""
+    line_model = model.items.property.mapper.class_
+    options = [
+        selectinload(model.items).selectinload(line_model.item).options(
+            selectinload(Item.images),
+            selectinload(Item.measuring_unit),
+        )
+    ]
+    for party in ("customer", "vendor"):
+        if hasattr(model, party):
+            options.append(selectinload(getattr(model, party)))
+    return options
+
+
+def load_document(model, **filters):
+    """First ``model`` row matching ``filters`` (``filter_by`` style) with everything eagerly loaded, or None."""
+    return model.query.options(*document_load_options(model)).filter_by(**filters).first()
+
+
+def main_item_image(item):
+    """The image flagged as main for an inventory item, else its first image, else None."""
+    if item is None or not item.images:
+        return None
+    return next((image for image in item.images if image.is_main), item.images[0])
+
+
+def item_image_url(image):
+    """Path the frontend resolves for an item image, or None."""
+    if image is None or not image.image:
+        return None
+    return f"/static/itemImages/{image.item_id}/{image.image}"
+
+
+def item_image_data_uri(image, search_folders=False):
+    """
+    The image as a ``data:`` URI for PDF rendering, or None when it cannot
+    be read. With ``search_folders`` a file missing from the item's own
+    folder is looked up in every item folder (for manually copied uploads).
+    """
+    if image is None or not image.image:
+        return None
+    raw = image.image
+    if isinstance(raw, bytes):
+        return f"data:image/jpeg;base64,{base64.b64encode(raw).decode('utf-8')}"
+    if raw.startswith("data:"):
+        return raw
+
+    images_dir = current_app.config.get("ITEM_IMAGES_FOLDER")
+    if not images_dir:
+        return None
+    path = os.path.join(images_dir, str(image.item_id), raw)
+    if not os.path.exists(path) and search_folders and os.path.isdir(images_dir):
+        for folder in os.listdir(images_dir):
+            candidate = os.path.join(images_dir, folder, raw)
+            if os.path.exists(candidate):
+                path = candidate
+                break
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, "rb") as image_file:
+            encoded = base64.b64encode(image_file.read()).decode("utf-8")
+    except OSError as e:
+        current_app.logger.error(f"Error encoding image for PDF: {e}")
+        return None
+    mime_type = "image/png" if os.path.splitext(path)[1].lower() == ".png" else "image/jpeg"
+    return f"data:{mime_type};base64,{encoded}"
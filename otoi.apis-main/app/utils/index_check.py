@@ -0,0 +1,141 @@
+"""
+Index Check
+===========
+EXPLAINs the hot dashboard / document-list queries and reports which index
+serves each one, or which tables it reads with a sequential scan.
+
+Usage (also available as `flask verify-indexes`):
+    from app.utils.index_check import check_indexes
+
+    for label, indexes, seq_scans, plan in check_indexes(business_id=3):
+        ...
+
+The planner runs with its default settings, so the report shows the plans
+production would get on this database. On a small development database a
+sequential scan is often the cheapest plan even when a matching index
+exists; run the check against a production-sized copy before treating a
+seq scan as a missing index.
+"""
+
+import json
+from datetime import date, timedelta
+
+from sqlalchemy import desc, func, text
+
+from app.extensions import db
+
+# Tables whose sequential scans are worth reporting
+CHECKED_TABLES = {
+    "invoices", "credit_notes", "debit_notes", "payment_ins", "payment_outs",
+    "purchase_invoices", "purchase_orders", "quotations",
+    "daily_business_rollups", "party_balances",
+}
+
+
+def hot_queries(business_id):
+    """(label, query) pairs mirroring the filters used in dashboard.py and the list routes."""
+    from app.models import (
+        CreditNote,
+        DailyBusinessRollup,
+        DebitNote,
+        Invoice,
+        PartyBalance,
+        PaymentIn,
+        PaymentOut,
+        PurchaseInvoice,
+        PurchaseOrder,
+        Quotation,
+    )
+
+    today = date.today()
+    session = db.session
+    return [
+        ("invoices: latest", Invoice.query.filter(
+            Invoice.business_id == business_id, Invoice.is_deleted == False,
+        ).order_by(desc(Invoice.created_at)).limit(5)),
+        ("invoices: latest payments", Invoice.query.filter(
+            Invoice.business_id == business_id, Invoice.is_deleted == False, Invoice.amount_paid > 0,
+        ).order_by(desc(Invoice.updated_at)).limit(5)),
+        ("invoices: overdue", Invoice.query.filter(
+            Invoice.business_id == business_id, Invoice.is_deleted == False,
+            Invoice.payment_status != "paid", Invoice.due_date < today,
+        )),
+        ("invoices: to collect", session.query(func.coalesce(func.sum(Invoice.balance_due), 0)).filter(
+            Invoice.business_id == business_id, Invoice.is_deleted == False, Invoice.payment_status != "paid",
+        )),
+        ("credit notes: latest", CreditNote.query.filter(
+            CreditNote.business_id == business_id, CreditNote.is_deleted == False,
+        ).order_by(desc(CreditNote.created_at)).limit(5)),
+        ("credit notes: outstanding", CreditNote.query.filter(
+            CreditNote.business_id == business_id, CreditNote.is_deleted == False, CreditNote.status != "paid",
+        )),
+        ("debit notes: latest", DebitNote.query.filter(
+            DebitNote.business_id == business_id, DebitNote.is_deleted == False,
+        ).order_by(desc(DebitNote.created_at)).limit(5)),
+        ("debit notes: list page", DebitNote.query.filter(
+            DebitNote.business_id == business_id, DebitNote.is_deleted == False,
+        ).order_by(desc(DebitNote.debit_note_date), desc(DebitNote.created_at)).limit(10)),
+        ("payment in: latest", PaymentIn.query.filter(
+            PaymentIn.business_id == business_id, PaymentIn.is_deleted == False,
+        ).order_by(desc(PaymentIn.created_at)).limit(5)),
+        ("payment in: list page", PaymentIn.query.filter(
+            PaymentIn.business_id == business_id, PaymentIn.is_deleted == False,
+        ).order_by(desc(PaymentIn.payment_date), desc(PaymentIn.created_at)).limit(10)),
+        ("payment out: latest", PaymentOut.query.filter(
+            PaymentOut.business_id == business_id,
+        ).order_by(desc(PaymentOut.created_at)).limit(5)),
+        ("payment out: list page", PaymentOut.query.filter(
+            PaymentOut.business_id == business_id, PaymentOut.is_deleted == False,
+        ).order_by(desc(PaymentOut.payment_date), desc(PaymentOut.created_at)).limit(10)),
+        ("purchase invoices: latest", PurchaseInvoice.query.filter(
+            PurchaseInvoice.business_id == business_id, PurchaseInvoice.is_deleted == False,
+        ).order_by(desc(PurchaseInvoice.created_at)).limit(5)),
+        ("quotations: latest", Quotation.query.filter(
+            Quotation.business_id == business_id,
+        ).order_by(desc(Quotation.created_at)).limit(5)),
+        ("purchase orders: latest open", PurchaseOrder.query.filter(
+            PurchaseOrder.business_id == business_id, PurchaseOrder.status == "open",
+        ).order_by(desc(PurchaseOrder.created_at)).limit(5)),
+        ("rollups: sales report window", DailyBusinessRollup.query.filter(
+            DailyBusinessRollup.business_id == business_id,
+            DailyBusinessRollup.day >= today - timedelta(days=364), DailyBusinessRollup.day <= today,
+        )),
+        ("party balances: top receivables", PartyBalance.query.filter(
+            PartyBalance.business_id == business_id, PartyBalance.party_type == "customer",
+            PartyBalance.outstanding > 0,
+        ).order_by(desc(PartyBalance.outstanding)).limit(5)),
+    ]
+
+
+def explain(query):
+    """The JSON plan of ``query`` with the planner's default settings."""
+    sql = str(query.statement.compile(dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}))
+    with db.engine.connect() as conn:
+        raw = conn.execute(text("EXPLAIN (FORMAT JSON) " + sql)).scalar()
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    return plan[0]["Plan"]
+
+
+def _walk(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+def plan_scans(plan):
+    """(index names used, checked tables read by a Seq Scan) in ``plan``."""
+    indexes, seq_scans = set(), set()
+    for node in _walk(plan):
+        if node.get("Index Name"):
+            indexes.add(node["Index Name"])
+        if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in CHECKED_TABLES:
+            seq_scans.add(node["Relation Name"])
+    return sorted(indexes), sorted(seq_scans)
+
+
+def check_indexes(business_id):
+    """Yield (label, indexes, seq_scans, plan) for every hot query."""
+    for label, query in hot_queries(business_id):
+        plan = explain(query)
+        indexes, seq_scans = plan_scans(plan)
+        yield label, indexes, seq_scans, plan
@@ -0,0 +1,217 @@
+"""
+Invoice Effective Balances
+==========================
+Keeps ``credit_notes_total``, ``effective_balance_due`` and
+``effective_status`` on every invoice in step with its payments and credit
+notes, so invoice lists can filter and sort on what the customer still owes
+instead of loading credit notes and recomputing per row.
+
+Usage:
+    from app.utils.invoice_balances import init_invoice_balances, reconcile_invoice_balances
+
+    # In app/__init__.py inside create_app():
+    init_invoice_balances(app)
+
+    # Repair (also available as `flask reconcile-invoice-balances`):
+    corrected = reconcile_invoice_balances(business_id=5)
+
+Every flush that creates, re-links, re-prices or deletes a credit note adds
+the difference to the invoice's ``credit_notes_total``, and every flush that
+changes an invoice's total, amount paid or payment discount recomputes its
+effective columns. Both run as one ``UPDATE ... FROM (VALUES ...)`` on the
+flushing connection, so they commit or roll back with the write and
+concurrent credit notes on one invoice add up instead of overwriting each
+other. Bulk ``query.update()`` writes bypass the flush and need a reconcile.
+"""
+
+import uuid
+from decimal import Decimal
+
+from sqlalchemy import Numeric, and_, case, cast, column, event, func, inspect, or_, select, text, values
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.utils.rollups import old_value, track_old_values
+
+_CHANGES_KEY = "invoice_balance_invoices"
+_CREDIT_NOTE_ATTRS = ("invoice_id", "total_amount", "is_deleted")
+_INVOICE_ATTRS = ("total_amount", "amount_paid", "payment_discount")
+_EFFECTIVE_ATTRS = ("credit_notes_total", "effective_balance_due", "effective_status")
+
+
+# ──────────────────────────────────────────
+# Effective balance / status
+# ──────────────────────────────────────────
+
+def effective_balance_expr(invoice, credit_notes_total):
+    """SQL expression of what is left to collect on ``invoice`` after payments, discount and credit notes."""
+    return func.greatest(
+        func.round(
+            invoice.c.total_amount
+            - func.coalesce(invoice.c.amount_paid, 0)
+            - func.coalesce(invoice.c.payment_discount, 0)
+            - credit_notes_total,
+            2,
+        ),
+        0,
+    )
+
+
+def effective_status_expr(invoice, credit_notes_total):
+    """SQL expression of the invoice status the customer sees, given its credit notes."""
+    balance = effective_balance_expr(invoice, credit_notes_total)
+    return case(
+        (and_(balance <= 0, credit_notes_total >= invoice.c.total_amount), "refunded"),
+        (balance <= 0, "paid"),
+        (or_(func.coalesce(invoice.c.amount_paid, 0) > 0, credit_notes_total > 0), "partial"),
+        else_="unpaid",
+    )
+
+
+# ──────────────────────────────────────────
+# Flush-time maintenance
+# ──────────────────────────────────────────
+
+def _as_uuid(value):
+    # Routes assign invoice ids as strings; the loaded value is a UUID
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    return uuid.UUID(str(value))
+
+
+def _add_credit(deltas, values, sign):
+    invoice_id = _as_uuid(values.get("invoice_id"))
+    if invoice_id is None or values.get("is_deleted"):
+        return
+    deltas[invoice_id] = deltas.get(invoice_id, Decimal(0)) + sign * Decimal(str(values.get("total_amount") or 0))
+
+
+def _collect_changes(session):
+    """{invoice uuid: credit_notes_total delta} of every invoice whose effective columns this flush changes."""
+    from app.models.invoice import Invoice
+    from app.models.creditIn import CreditNote
+
+    deltas = {}
+    recompute = set()
+    for obj in session.new:
+        if isinstance(obj, CreditNote):
+            _add_credit(deltas, {a: getattr(obj, a, None) for a in _CREDIT_NOTE_ATTRS}, 1)
+        elif isinstance(obj, Invoice):
+            recompute.add(obj.uuid)
+
+    for obj in session.dirty:
+        if not isinstance(obj, (CreditNote, Invoice)) or not session.is_modified(obj, include_collections=False):
+            continue
+        state = inspect(obj)
+        if isinstance(obj, CreditNote):
+            _add_credit(deltas, {a: old_value(state, a) for a in _CREDIT_NOTE_ATTRS}, -1)
+            _add_credit(deltas, {a: getattr(obj, a, None) for a in _CREDIT_NOTE_ATTRS}, 1)
+        elif any(state.attrs[a].history.has_changes() for a in _INVOICE_ATTRS):
+            recompute.add(obj.uuid)
+
+    for obj in session.deleted:
+        if isinstance(obj, CreditNote):
+            _add_credit(deltas, {a: old_value(inspect(obj), a) for a in _CREDIT_NOTE_ATTRS}, -1)
+
+    changes = {invoice_id: delta for invoice_id, delta in deltas.items() if delta}
+    for invoice_id in recompute:
+        changes.setdefault(invoice_id, Decimal(0))
+    return changes
+
+
+def _update_invoices(connection, changes):
+    from app.models.invoice import Invoice
+
+    table = Invoice.__table__
+    changed = values(
+        column("invoice_id", UUID(as_uuid=True)),
+        column("delta", Numeric(12, 2)),
+        name="changed",
+    ).data(sorted(changes.items(), key=lambda item: str(item[0])))  # consistent row lock order
+
+    # VALUES literals are untyped on the wire; cast them back
+    credits = table.c.credit_notes_total + cast(changed.c.delta, Numeric(12, 2))
+    connection.execute(
+        table.update()
+        .where(table.c.uuid == cast(changed.c.invoice_id, UUID(as_uuid=True)))
+        .values(
+            credit_notes_total=credits,
+            effective_balance_due=effective_balance_expr(table, credits),
+            effective_status=effective_status_expr(table, credits),
+        )
+    )
+
+
+def _apply_invoice_balances(session, flush_context):
+    changes = _collect_changes(session)
+    if changes:
+        _update_invoices(session.connection(), changes)
+        session.info.setdefault(_CHANGES_KEY, set()).update(changes)
+
+
+def _expire_updated(session, flush_context):
+    """Make loaded invoices re-read the columns the UPDATE just wrote."""
+    from app.models.invoice import Invoice
+
+    for invoice_id in session.info.pop(_CHANGES_KEY, ()):
+        invoice = session.identity_map.get(session.identity_key(Invoice, invoice_id))
+        if invoice is not None:
+            session.expire(invoice, _EFFECTIVE_ATTRS)
+
+
+# ──────────────────────────────────────────
+# Reconcile
+# ──────────────────────────────────────────
+
+def reconcile_invoice_balances(business_id=None):
+    """
+    Recompute the effective columns of every invoice from its credit notes
+    and commit. Credit note writes are blocked for the duration so none are
+    missed. Returns the number of invoices that had drifted.
+    """
+    from app.models.invoice import Invoice
+    from app.models.creditIn import CreditNote
+
+    table = Invoice.__table__
+    connection = db.session.connection()
+    connection.execute(text("LOCK TABLE credit_notes IN SHARE MODE"))
+
+    expected = (
+        select(func.coalesce(func.sum(CreditNote.total_amount), 0))
+        .where(CreditNote.invoice_id == table.c.uuid, CreditNote.is_deleted == False)
+        .scalar_subquery()
+    )
+    stmt = (
+        table.update()
+        .where(or_(
+            table.c.credit_notes_total.is_distinct_from(expected),
+            table.c.effective_balance_due.is_distinct_from(effective_balance_expr(table, expected)),
+            table.c.effective_status.is_distinct_from(effective_status_expr(table, expected)),
+        ))
+        .values(
+            credit_notes_total=expected,
+            effective_balance_due=effective_balance_expr(table, expected),
+            effective_status=effective_status_expr(table, expected),
+        )
+    )
+    if business_id is not None:
+        stmt = stmt.where(table.c.business_id == business_id)
+    corrected = connection.execute(stmt).rowcount
+
+    db.session.commit()
+
+    from app.utils.dashboard_cache import invalidate_dashboard_cache
+    invalidate_dashboard_cache(business_id)
+    return corrected
+
+
+def init_invoice_balances(app):
+    """Hook invoice effective balance maintenance into every session flush."""
+    if event.contains(Session, "after_flush", _apply_invoice_balances):
+        return
+    event.listen(Session, "after_flush", _apply_invoice_balances)
+    event.listen(Session, "after_flush_postexec", _expire_updated)
+
+    from app.models.creditIn import CreditNote
+    track_old_values(CreditNote, _CREDIT_NOTE_ATTRS)
@@ -0,0 +1,202 @@
+"""
+Scheduled Jobs
+==============
+Housekeeping sweeps (closing overdue purchase orders, closing expired
+quotations) run on a cadence by a single elected leader, instead of inside
+GET handlers.
+
+Usage:
+    # Dedicated worker process (recommended):
+    flask run-jobs              # run forever as a leader candidate
+    flask run-jobs --once       # run every job once and exit (cron)
+
+    # Or inside the web workers, in app/__init__.py inside create_app():
+    init_jobs(app)              # starts a scheduler thread when JOBS_SCHEDULER_ENABLED
+
+Leader election uses a PostgreSQL session-level advisory lock held on a
+dedicated connection. Every candidate (gunicorn worker thread or
+`flask run-jobs` process) polls ``pg_try_advisory_lock``; the holder runs the
+jobs that are due. If the leader dies its connection closes, the lock is
+released, and another candidate takes over on its next poll.
+"""
+
+import logging
+import threading
+import time
+
+from sqlalchemy import func, select, text
+
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+# Application-wide advisory lock key of the job leader
+LEADER_LOCK_KEY = 720411500
+
+
+class Job:
+    """A named callable run by the leader every ``interval`` seconds."""
+
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.last_run = None
+
+    def is_due(self, now):
+        return self.last_run is None or now - self.last_run >= self.interval
+
+
+def _close_overdue_purchase_orders():
+    from app.routes.purchase_order import auto_close_overdue_pos
+    from app.utils.dashboard_cache import invalidate_dashboard_cache
+
+    closed = auto_close_overdue_pos()
+    if closed:
+        # Bulk UPDATE bypasses the session hooks; open POs show on the dashboard
+        invalidate_dashboard_cache()
+    return closed
+
+
+def _close_expired_quotations():
+    from app.routes.quotation import check_and_update_quotation_status
+    from app.utils.dashboard_cache import invalidate_dashboard_cache
+
+    closed = check_and_update_quotation_status()
+    if closed:
+        # Bulk UPDATE bypasses the session hooks; quotations show on the dashboard timeline
+        invalidate_dashboard_cache()
+    return closed
+
+
+def get_jobs(app):
+    interval = float(app.config.get("JOBS_SWEEP_INTERVAL", 300))
+    return [
+        Job("close-overdue-purchase-orders", _close_overdue_purchase_orders, interval),
+        Job("close-expired-quotations", _close_expired_quotations, interval),
+    ]
+
+
+def run_job(app, job):
+    """Run one job in its own app context. Failures are rolled back and logged."""
+    with app.app_context():
+        started = time.perf_counter()
+        try:
+            result = job.func()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Job %s failed", job.name)
+            return None
+        logger.info("Job %s finished in %.0f ms (result=%s)", job.name, (time.perf_counter() - started) * 1000, result)
+        return result
+
+
+class JobScheduler:
+    """Leader-elected loop that runs due jobs until ``stop()`` is called."""
+
+    def __init__(self, app, jobs=None):
+        self.app = app
+        self.jobs = jobs if jobs is not None else get_jobs(app)
+        self.poll_interval = float(app.config.get("JOBS_POLL_INTERVAL", 30))
+        self.is_leader = False
+        self._connection = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ── Leadership ──────────────────────────
+
+    def _close_connection(self):
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+        self._connection = None
+        self.is_leader = False
+
+    def acquire_leadership(self):
+        """Try to become (or confirm still being) the leader. Returns True when leading."""
+        with self.app.app_context():
+            try:
+                if self._connection is None:
+                    self._connection = db.engine.connect()
+                if self.is_leader:
+                    # The lock lives as long as this connection; make sure it still does
+                    self._connection.execute(text("SELECT 1"))
+                else:
+                    self.is_leader = bool(
+                        self._connection.execute(select(func.pg_try_advisory_lock(LEADER_LOCK_KEY))).scalar()
+                    )
+                # Session-level advisory locks survive commit; don't sit idle in a transaction
+                self._connection.commit()
+            except Exception:
+                logger.exception("Job leader election failed")
+                self._close_connection()
+        return self.is_leader
+
+    def release_leadership(self):
+        if self.is_leader and self._connection is not None:
+            try:
+                self._connection.execute(select(func.pg_advisory_unlock(LEADER_LOCK_KEY)))
+                self._connection.commit()
+            except Exception:
+                logger.exception("Releasing the job leader lock failed")
+        self._close_connection()
+
+    # ── Running ─────────────────────────────
+
+    def run_pending(self):
+        now = time.monotonic()
+        for job in self.jobs:
+            if job.is_due(now):
+                job.last_run = now
+                run_job(self.app, job)
+
+    def run_forever(self):
+        try:
+            while not self._stop.is_set():
+                if self.acquire_leadership():
+                    self.run_pending()
+                self._stop.wait(self.poll_interval)
+        finally:
+            self.release_leadership()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run_forever, name="job-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval)
+
+
+def run_jobs_once(app):
+    """
+    Run every job once if no other leader is active.
+
+    Returns {job name: result}, or None when another process holds the lock.
+    """
+    scheduler = JobScheduler(app)
+    if not scheduler.acquire_leadership():
+        return None
+    try:
+        return {job.name: run_job(app, job) for job in scheduler.jobs}
+    finally:
+        scheduler.release_leadership()
+
+
+def init_jobs(app):
+    """
+    Start an in-process, leader-elected scheduler thread when enabled.
+
+    Config:
+        JOBS_SCHEDULER_ENABLED  Run the scheduler inside this process (default off; prefer `flask run-jobs`).
+        JOBS_SWEEP_INTERVAL     Seconds between runs of each housekeeping sweep.
+        JOBS_POLL_INTERVAL      Seconds between leader-election polls.
+    """
+    if not app.config.get("JOBS_SCHEDULER_ENABLED") or "job_scheduler" in app.extensions:
+        return
+    scheduler = JobScheduler(app)
+    scheduler.start()
+    app.extensions["job_scheduler"] = scheduler
@@ -0,0 +1,262 @@
+"""
+List Pagination
+===============
+One pagination entry point for the list endpoints, with an opt-in keyset
+(cursor) mode and a cached total count.
+
+Usage:
+    from app.utils.pagination import paginate, InvalidCursor
+
+    pagination = paginate(query, page=page, per_page=per_page)
+    pagination.items, pagination.total, pagination.pages, pagination.next_cursor
+
+Without a ``cursor`` request argument this is ``query.paginate()`` (OFFSET
+paging with an exact COUNT). Passing ``cursor=`` (empty for the first page,
+then the returned ``next_cursor``) switches to keyset paging: the query's own
+ORDER BY plus the primary key as a tie-breaker becomes a
+``WHERE (sort, id) > (last sort, last id)`` predicate, so page 500 costs the
+same as page 1 and rows inserted meanwhile do not shift pages.
+
+``count=cached`` (the default in cursor mode) reuses the total for
+``PAGINATION_COUNT_CACHE_TTL`` seconds per tenant and filter set, so walking
+pages does not repeat the COUNT(*); ``count=exact`` always recounts.
+"""
+
+import base64
+import hashlib
+import json
+import math
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import has_request_context, jsonify, request
+from sqlalchemy import and_, false, or_, tuple_
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import UnaryExpression
+
+from app.extensions import db
+from app.utils.tenant import current_business_id
+from app.utils.user_cache import TTLCache
+
+COUNT_EXACT = "exact"
+COUNT_CACHED = "cached"
+
+count_cache = TTLCache(ttl=30, max_size=2048)
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed or was issued for a different sort order."""
+
+
+class CursorPage:
+    """Page of a keyset query, exposing the attributes routes read from ``Pagination``."""
+
+    def __init__(self, items, total, per_page, next_cursor):
+        self.items = items
+        self.total = total
+        self.per_page = per_page
+        self.page = 1
+        self.next_cursor = next_cursor
+
+    @property
+    def pages(self):
+        return math.ceil(self.total / self.per_page) if self.total and self.per_page else 0
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+# ──────────────────────────────────────────
+# Cursor encoding
+# ──────────────────────────────────────────
+
+def _dump_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"n": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {"u": str(value)}
+    return value
+
+
+def _load_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        if "n" in value:
+            return Decimal(value["n"])
+        if "u" in value:
+            return uuid.UUID(value["u"])
+        raise InvalidCursor("Unknown cursor value")
+    return value
+
+
+def encode_cursor(signature, values):
+    """Opaque, URL-safe cursor carrying ``values`` for the sort order named by ``signature``."""
+    payload = json.dumps({"s": signature, "v": [_dump_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, signature):
+    """Values of an ``encode_cursor`` cursor; raises ``InvalidCursor`` if it is unusable."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [_load_value(v) for v in payload["v"]]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if payload.get("s") != signature:
+        raise InvalidCursor("Cursor does not match the requested sort order")
+    return values
+
+
+# ──────────────────────────────────────────
+# Keyset predicate
+# ──────────────────────────────────────────
+
+def _sort_keys(query):
+    """(expression, descending) for the query's ORDER BY plus the primary key tie-breaker."""
+    keys = []
+    for clause in query._order_by_clauses:
+        descending = False
+        element = clause
+        if isinstance(clause, UnaryExpression) and clause.modifier in (operators.desc_op, operators.asc_op):
+            descending = clause.modifier is operators.desc_op
+            element = clause.element
+        keys.append((element, descending))
+
+    mapper = query.column_descriptions[0]["entity"].__mapper__
+    primary_key = mapper.primary_key[0]
+    if not any(element.compare(primary_key) for element, _ in keys):
+        # Tie-break in the direction of the last sort key so a single index scan serves both
+        keys.append((primary_key, keys[-1][1] if keys else False))
+    return keys
+
+
+def _signature(keys):
+    text = "|".join(f"{element}:{'desc' if descending else 'asc'}" for element, descending in keys)
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def _nullable(element):
+    return getattr(element, "nullable", True)
+
+
+def _after(element, descending, value):
+    """Rows strictly after ``value`` on one key (PostgreSQL: NULLs last ASC, first DESC)."""
+    if value is None:
+        return element.isnot(None) if descending else false()
+    if descending:
+        return element < value
+    return or_(element > value, element.is_(None)) if _nullable(element) else element > value
+
+
+def _equal(element, value):
+    return element.is_(None) if value is None else element == value
+
+
+def _keyset_predicate(keys, values):
+    directions = {descending for _, descending in keys}
+    if len(directions) == 1 and None not in values and not any(_nullable(e) for e, _ in keys):
+        # Row-value comparison: matches a composite index directly
+        columns = tuple_(*(e for e, _ in keys))
+        bound = tuple_(*values)
+        return columns < bound if directions.pop() else columns > bound
+
+    branches = []
+    for i, (element, descending) in enumerate(keys):
+        prior = [_equal(keys[j][0], values[j]) for j in range(i)]
+        branches.append(and_(*prior, _after(element, descending, values[i])))
+    return or_(*branches)
+
+
+# ──────────────────────────────────────────
+# Counting
+# ──────────────────────────────────────────
+
+def _count(query, mode):
+    if mode != COUNT_CACHED or count_cache.ttl <= 0:
+        return query.order_by(None).count()
+
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = sorted((k, str(v)) for k, v in compiled.params.items())
+    # The tenant filter is added at execution time, so it is not in the SQL text
+    key = hashlib.sha1(f"{current_business_id()}|{compiled}|{params}".encode()).hexdigest()
+    return count_cache.get(key, lambda _key: query.order_by(None).count())
+
+
+# ──────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────
+
+def paginate(query, page=1, per_page=10, cursor=None, count=None):
+    """
+    Paginate an ordered ORM query.
+
+    ``cursor`` and ``count`` default to the request arguments of the same
+    name. Raises ``InvalidCursor`` for a cursor that cannot be used.
+    """
+    if has_request_context():
+        if cursor is None:
+            cursor = request.args.get("cursor")
+        if count is None:
+            count = request.args.get("count")
+
+    per_page = max(1, int(per_page))
+
+    if cursor is None:
+        if count == COUNT_CACHED:
+            pagination = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+            pagination.total = _count(query, COUNT_CACHED)
+        else:
+            pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        pagination.next_cursor = None
+        return pagination
+
+    keys = _sort_keys(query)
+    signature = _signature(keys)
+    total = _count(query, count or COUNT_CACHED)
+
+    page_query = query
+    if cursor:
+        values = decode_cursor(cursor, signature)
+        if len(values) != len(keys):
+            raise InvalidCursor("Malformed cursor")
+        page_query = page_query.filter(_keyset_predicate(keys, values))
+
+    # Order by the full key (sort + tie-breaker) and select the key values alongside each row
+    page_query = page_query.order_by(None).order_by(
+        *(element.desc() if descending else element.asc() for element, descending in keys)
+    ).add_columns(*(element for element, _ in keys))
+    rows = page_query.limit(per_page + 1).all()
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = encode_cursor(signature, list(rows[-1][1:])) if has_more and rows else None
+
+    return CursorPage([row[0] for row in rows], total, per_page, next_cursor)
+
+
+def init_pagination(app):
+    """
+    Configure the total-count cache and answer unusable cursors with 400.
+
+    Config:
+        PAGINATION_COUNT_CACHE_TTL       Seconds a cached total stays valid (0 always recounts).
+        PAGINATION_COUNT_CACHE_MAX_SIZE  Distinct filter sets kept per worker.
+    """
+    count_cache.configure(
+        ttl=float(app.config.get("PAGINATION_COUNT_CACHE_TTL", 30)),
+        max_size=int(app.config.get("PAGINATION_COUNT_CACHE_MAX_SIZE", 2048)),
+    )
+
+    @app.errorhandler(InvalidCursor)
+    def _invalid_cursor(e):
+        return jsonify({"error": str(e)}), 400
@@ -0,0 +1,276 @@
+"""
+Party Balances
+==============
+Keeps ``party_balances`` (one row per business, party type and party) in
+step with the invoice tables, so top-party rankings and party statements read
+an index instead of aggregating the tenant's whole history.
+
+Usage:
+    from app.utils.party_balances import init_party_balances, reconcile_party_balances
+
+    # In app/__init__.py inside create_app():
+    init_party_balances(app)
+
+    # Repair (also available as `flask reconcile-party-balances`):
+    drifted, written = reconcile_party_balances(business_id=5)
+
+Like app.utils.rollups, every flush that inserts, changes or deletes an
+invoice, purchase invoice, credit note or debit note is turned into
+per-party deltas and applied with an additive ``INSERT ... ON CONFLICT``
+on the flushing connection. Payments reach the table through the invoice
+balance they update. ``last_activity`` only moves forward incrementally;
+the reconcile pulls it back when a document is deleted or re-dated.
+"""
+
+from decimal import Decimal
+
+from sqlalchemy import and_, case, event, func, inspect, literal, or_, select, text, union_all, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.utils.rollups import as_date, old_value, track_old_values
+
+CUSTOMER = "customer"
+VENDOR = "vendor"
+
+
+class BalanceSource:
+    """A document model, the party it belongs to and whether its balance is tracked."""
+
+    def __init__(self, model, party_type, party_attr, date_attr, tracks_balance):
+        self.model = model
+        self.party_type = party_type
+        self.party_attr = party_attr
+        self.date_attr = date_attr
+        self.tracks_balance = tracks_balance
+
+    @property
+    def attrs(self):
+        attrs = {"business_id", "is_deleted", self.party_attr, self.date_attr}
+        if self.tracks_balance:
+            attrs.update(("balance_due", "payment_status"))
+        return attrs
+
+    def is_open(self, values):
+        return self.tracks_balance and values.get("payment_status") != "paid"
+
+    def open_clause(self):
+        if not self.tracks_balance:
+            return literal(False)
+        return self.model.payment_status != "paid"
+
+
+_sources = None
+
+
+def get_sources():
+    global _sources
+    if _sources is None:
+        from app.models.invoice import Invoice
+        from app.models.purchase_invoice import PurchaseInvoice
+        from app.models.creditIn import CreditNote
+        from app.models.debit_note import DebitNote
+
+        _sources = (
+            BalanceSource(Invoice, CUSTOMER, "customer_id", "invoice_date", tracks_balance=True),
+            BalanceSource(PurchaseInvoice, VENDOR, "vendor_id", "invoice_date", tracks_balance=True),
+            BalanceSource(CreditNote, CUSTOMER, "customer_id", "credit_note_date", tracks_balance=False),
+            BalanceSource(DebitNote, VENDOR, "vendor_id", "debit_note_date", tracks_balance=False),
+        )
+    return _sources
+
+
+def _source_for(obj):
+    for source in get_sources():
+        if isinstance(obj, source.model):
+            return source
+    return None
+
+
+# ──────────────────────────────────────────
+# Flush-time deltas
+# ──────────────────────────────────────────
+
+def _contribution(source, values):
+    """((business_id, party_type, party_id), outstanding, doc_count, activity date) of a row, or None."""
+    party_id = values.get(source.party_attr)
+    if values.get("is_deleted") or values.get("business_id") is None or party_id is None:
+        return None
+    is_open = source.is_open(values)
+    return (
+        (int(values["business_id"]), source.party_type, party_id),
+        Decimal(str(values.get("balance_due") or 0)) if is_open else Decimal(0),
+        1 if is_open else 0,
+        as_date(values.get(source.date_attr)),
+    )
+
+
+def _add(deltas, contribution, sign):
+    if contribution is None:
+        return
+    key, outstanding, doc_count, activity = contribution
+    row = deltas.setdefault(key, {"outstanding": Decimal(0), "doc_count": 0, "last_activity": None})
+    row["outstanding"] += sign * outstanding
+    row["doc_count"] += sign * doc_count
+    if sign > 0 and activity is not None and (row["last_activity"] is None or activity > row["last_activity"]):
+        row["last_activity"] = activity
+
+
+def _collect_deltas(session):
+    deltas = {}
+    for obj in session.new:
+        source = _source_for(obj)
+        if source is not None:
+            _add(deltas, _contribution(source, {a: getattr(obj, a, None) for a in source.attrs}), 1)
+
+    for obj in session.dirty:
+        source = _source_for(obj)
+        if source is None or not session.is_modified(obj, include_collections=False):
+            continue
+        state = inspect(obj)
+        old = {a: old_value(state, a) for a in source.attrs}
+        new = {a: getattr(obj, a, None) for a in source.attrs}
+        if old != new:
+            _add(deltas, _contribution(source, old), -1)
+            _add(deltas, _contribution(source, new), 1)
+
+    for obj in session.deleted:
+        source = _source_for(obj)
+        if source is not None:
+            state = inspect(obj)
+            _add(deltas, _contribution(source, {a: old_value(state, a) for a in source.attrs}), -1)
+    return deltas
+
+
+def _upsert_deltas(connection, deltas):
+    from app.models.party_balance import PartyBalance
+
+    table = PartyBalance.__table__
+    rows = [
+        {"business_id": key[0], "party_type": key[1], "party_id": key[2], **values}
+        # Sorted so concurrent flushes lock balance rows in the same order
+        for key, values in sorted(deltas.items(), key=lambda item: (item[0][0], item[0][1], str(item[0][2])))
+        if values["outstanding"] or values["doc_count"] or values["last_activity"] is not None
+    ]
+    if not rows:
+        return
+
+    stmt = pg_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.business_id, table.c.party_type, table.c.party_id],
+        set_={
+            "outstanding": table.c.outstanding + stmt.excluded.outstanding,
+            "doc_count": table.c.doc_count + stmt.excluded.doc_count,
+            # GREATEST ignores NULLs, so a delta without a date keeps the stored one
+            "last_activity": func.greatest(table.c.last_activity, stmt.excluded.last_activity),
+            "updated_at": func.now(),
+        },
+    )
+    connection.execute(stmt)
+
+
+def _apply_balance_deltas(session, flush_context):
+    deltas = _collect_deltas(session)
+    if deltas:
+        _upsert_deltas(session.connection(), deltas)
+
+
+# ──────────────────────────────────────────
+# Reconcile
+# ──────────────────────────────────────────
+
+def _expected_balances(business_id=None):
+    """SELECT of the balance rows the document tables imply."""
+    parts = []
+    for source in get_sources():
+        model = source.model
+        is_open = source.open_clause()
+        part = select(
+            model.business_id.label("business_id"),
+            literal(source.party_type, String).label("party_type"),
+            getattr(model, source.party_attr).label("party_id"),
+            case((is_open, func.coalesce(model.balance_due, 0)), else_=0).label("outstanding")
+            if source.tracks_balance else literal(0).label("outstanding"),
+            case((is_open, 1), else_=0).label("doc_count"),
+            getattr(model, source.date_attr).label("activity_date"),
+        ).where(model.is_deleted == False, getattr(model, source.party_attr).isnot(None))
+        if business_id is not None:
+            part = part.where(model.business_id == business_id)
+        parts.append(part)
+
+    documents = union_all(*parts).subquery("documents")
+    return (
+        select(
+            documents.c.business_id,
+            documents.c.party_type,
+            documents.c.party_id,
+            func.coalesce(func.sum(documents.c.outstanding), 0).label("outstanding"),
+            func.coalesce(func.sum(documents.c.doc_count), 0).label("doc_count"),
+            func.max(documents.c.activity_date).label("last_activity"),
+        )
+        .group_by(documents.c.business_id, documents.c.party_type, documents.c.party_id)
+    )
+
+
+def reconcile_party_balances(business_id=None):
+    """
+    Recompute party balances from the document tables and commit.
+
+    The table is locked against concurrent flushes for the duration, so
+    deltas from in-flight writes are neither lost nor counted twice.
+    Returns (rows that had drifted, rows written).
+    """
+    from app.models.party_balance import PartyBalance
+
+    table = PartyBalance.__table__
+    connection = db.session.connection()
+    connection.execute(text("LOCK TABLE party_balances IN SHARE ROW EXCLUSIVE MODE"))
+
+    expected = _expected_balances(business_id).subquery("expected")
+    current = select(table)
+    if business_id is not None:
+        current = current.where(table.c.business_id == business_id)
+    current = current.subquery("current")
+
+    keys_match = and_(
+        current.c.business_id == expected.c.business_id,
+        current.c.party_type == expected.c.party_type,
+        current.c.party_id == expected.c.party_id,
+    )
+    drifted = connection.execute(
+        select(func.count())
+        .select_from(current.outerjoin(expected, keys_match, full=True))
+        .where(or_(
+            current.c.business_id.is_(None),
+            expected.c.business_id.is_(None),
+            current.c.outstanding.is_distinct_from(expected.c.outstanding),
+            current.c.doc_count.is_distinct_from(expected.c.doc_count),
+            current.c.last_activity.is_distinct_from(expected.c.last_activity),
+        ))
+    ).scalar()
+
+    delete = table.delete()
+    if business_id is not None:
+        delete = delete.where(table.c.business_id == business_id)
+    connection.execute(delete)
+
+    columns = ["business_id", "party_type", "party_id", "outstanding", "doc_count", "last_activity"]
+    written = connection.execute(
+        pg_insert(table).from_select(columns, _expected_balances(business_id))
+    ).rowcount
+
+    db.session.commit()
+
+    from app.utils.dashboard_cache import invalidate_dashboard_cache
+    invalidate_dashboard_cache(business_id)
+    return drifted, written
+
+
+def init_party_balances(app):
+    """Hook party balance maintenance into every session flush."""
+    if event.contains(Session, "after_flush", _apply_balance_deltas):
+        return
+    event.listen(Session, "after_flush", _apply_balance_deltas)
+    for source in get_sources():
+        track_old_values(source.model, source.attrs)
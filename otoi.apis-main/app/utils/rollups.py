@@ -0,0 +1,348 @@
+"""
+Daily Business Rollups
+======================
+Keeps ``daily_business_rollups`` (one row per business and day) in step with
+the document tables, so dashboard widgets read O(days) rollup rows instead of
+aggregating every invoice, payment and note.
+
+Usage:
+    from app.utils.rollups import init_rollups, rebuild_rollups
+
+    # In app/__init__.py inside create_app():
+    init_rollups(app)
+
+    # Backfill / repair (also available as `flask rebuild-rollups`):
+    rebuild_rollups(business_id=5)
+
+Every flush that inserts, changes or deletes a tracked document turns the
+before/after values into per-(business, day) deltas and applies them with
+``INSERT ... ON CONFLICT DO UPDATE SET col = col + delta`` on the flushing
+connection. The rollup change therefore commits or rolls back with the
+document write, and concurrent writers never overwrite each other's totals.
+
+Bulk ``query.update()`` / raw SQL writes to the document tables bypass the
+flush and must be followed by a rebuild.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from sqlalchemy import case, event, func, inspect, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import NO_VALUE
+
+from app.extensions import db
+
+
+class Measure:
+    """
+    One rollup column: the sum of ``attr`` (or a row count when ``attr`` is
+    None), optionally only for rows whose ``when`` attribute equals a value
+    case-insensitively.
+    """
+
+    def __init__(self, column, attr=None, when=None):
+        self.column = column
+        self.attr = attr
+        self.when = when
+
+    def value(self, values):
+        if self.when is not None:
+            when_attr, expected = self.when
+            if str(values.get(when_attr) or "").lower() != expected:
+                return 0
+        if self.attr is None:
+            return 1
+        return Decimal(str(values.get(self.attr) or 0))
+
+    def aggregate(self, model):
+        if self.attr is None:
+            return func.count()
+        amount = func.coalesce(getattr(model, self.attr), 0)
+        if self.when is not None:
+            when_attr, expected = self.when
+            amount = case((func.lower(getattr(model, when_attr)) == expected, amount), else_=0)
+        return func.coalesce(func.sum(amount), 0)
+
+
+class RollupSource:
+    """
+    A document model, the date it is rolled up by and the measures it feeds.
+    Rows where any of ``required`` is NULL are left out, like undated rows.
+    """
+
+    def __init__(self, model, date_attr, measures, required=()):
+        self.model = model
+        self.date_attr = date_attr
+        self.measures = measures
+        self.required = tuple(required)
+
+    @property
+    def attrs(self):
+        attrs = {"business_id", "is_deleted", self.date_attr, *self.required}
+        for measure in self.measures:
+            if measure.attr:
+                attrs.add(measure.attr)
+            if measure.when:
+                attrs.add(measure.when[0])
+        return attrs
+
+
+_sources = None
+
+
+def get_sources():
+    global _sources
+    if _sources is None:
+        from app.models.invoice import Invoice
+        from app.models.purchase_invoice import PurchaseInvoice
+        from app.models.paymentIn import PaymentIn
+        from app.models.paymentOut import PaymentOut
+        from app.models.creditIn import CreditNote
+        from app.models.debit_note import DebitNote
+
+        _sources = (
+            RollupSource(Invoice, "invoice_date", [
+                Measure("sales_total", "total_amount"),
+                Measure("sales_count"),
+                Measure("sales_received", "amount_paid"),
+            ]),
+            RollupSource(PurchaseInvoice, "invoice_date", [
+                Measure("purchases_total", "total_amount"),
+                Measure("purchases_count"),
+            ]),
+            RollupSource(PaymentIn, "payment_date", [
+                Measure("receipts_total", "amount_received"),
+                Measure("receipts_count"),
+            ]),
+            # The summary always split payments into cash (payment_mode 'cash') and
+            # bank (any other mode); a payment with no mode was in neither
+            RollupSource(PaymentOut, "payment_date", [
+                Measure("payments_total", "amount_paid"),
+                Measure("payments_count"),
+            ], required=["payment_mode"]),
+            RollupSource(CreditNote, "credit_note_date", [
+                Measure("credit_notes_total", "total_amount"),
+                Measure("credit_notes_count"),
+                Measure("credit_notes_refunded", "amount_received"),
+            ]),
+            RollupSource(DebitNote, "debit_note_date", [
+                Measure("debit_notes_total", "total_amount"),
+                Measure("debit_notes_count"),
+                Measure("debit_notes_credited", "amount_received", when=("status", "credited")),
+            ]),
+        )
+    return _sources
+
+
+def _source_for(obj):
+    for source in get_sources():
+        if isinstance(obj, source.model):
+            return source
+    return None
+
+
+# ──────────────────────────────────────────
+# Flush-time deltas
+# ──────────────────────────────────────────
+
+def old_value(state, attr):
+    """Value of ``attr`` as it was in the database before this flush."""
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    if history.added:
+        # Set on a new object, or on an attribute that was previously NULL
+        return None
+    value = state.attrs[attr].loaded_value
+    return getattr(state.obj(), attr) if value is NO_VALUE else value
+
+
+def _load_replaced_value(target, value, oldvalue, initiator):
+    # The listener does nothing; registering it with active_history=True is what matters
+    pass
+
+
+def track_old_values(model, attrs):
+    """
+    Make setting any of ``attrs`` on ``model`` load the value it replaces,
+    so ``old_value`` can still return it at flush time when the attribute
+    was expired (e.g. after a commit).
+    """
+    for attr in attrs:
+        attribute = getattr(model, attr)
+        if not event.contains(attribute, "set", _load_replaced_value):
+            event.listen(attribute, "set", _load_replaced_value, active_history=True)
+
+
+def as_date(value):
+    # Routes sometimes assign ISO strings or datetimes before the flush converts them
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def _contribution(source, values):
+    """(business_id, day, {column: amount}) a row with ``values`` adds to the rollups, or None."""
+    if values.get("is_deleted") or values.get("business_id") is None or values.get(source.date_attr) is None:
+        return None
+    if any(values.get(attr) is None for attr in source.required):
+        return None
+    return (
+        int(values["business_id"]),
+        as_date(values[source.date_attr]),
+        {measure.column: measure.value(values) for measure in source.measures},
+    )
+
+
+def _add(deltas, contribution, sign):
+    if contribution is None:
+        return
+    business_id, day, amounts = contribution
+    row = deltas.setdefault((business_id, day), {})
+    for column, amount in amounts.items():
+        row[column] = row.get(column, 0) + sign * amount
+
+
+def _collect_deltas(session):
+    deltas = {}
+    for obj in session.new:
+        source = _source_for(obj)
+        if source is not None:
+            _add(deltas, _contribution(source, {a: getattr(obj, a, None) for a in source.attrs}), 1)
+
+    for obj in session.dirty:
+        source = _source_for(obj)
+        if source is None or not session.is_modified(obj, include_collections=False):
+            continue
+        state = inspect(obj)
+        old = {a: old_value(state, a) for a in source.attrs}
+        new = {a: getattr(obj, a, None) for a in source.attrs}
+        if old != new:
+            _add(deltas, _contribution(source, old), -1)
+            _add(deltas, _contribution(source, new), 1)
+
+    for obj in session.deleted:
+        source = _source_for(obj)
+        if source is not None:
+            state = inspect(obj)
+            _add(deltas, _contribution(source, {a: old_value(state, a) for a in source.attrs}), -1)
+    return deltas
+
+
+def _upsert_deltas(connection, deltas):
+    from app.models.rollup import DailyBusinessRollup
+
+    table = DailyBusinessRollup.__table__
+    rows = []
+    # Sorted so concurrent flushes lock rollup rows in the same order
+    for (business_id, day), amounts in sorted(deltas.items()):
+        if any(amounts.values()):
+            rows.append({"business_id": business_id, "day": day, **amounts})
+    if not rows:
+        return
+
+    # Every row carries the same columns so they can go in one multi-VALUES insert
+    columns = sorted({column for row in rows for column in row} - {"business_id", "day"})
+    for row in rows:
+        for column in columns:
+            row.setdefault(column, 0)
+
+    stmt = pg_insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.business_id, table.c.day],
+        set_={
+            **{column: table.c[column] + stmt.excluded[column] for column in columns},
+            "updated_at": func.now(),
+        },
+    )
+    connection.execute(stmt)
+
+
+def _apply_rollup_deltas(session, flush_context):
+    deltas = _collect_deltas(session)
+    if deltas:
+        _upsert_deltas(session.connection(), deltas)
+
+
+# ──────────────────────────────────────────
+# Rebuild
+# ──────────────────────────────────────────
+
+def rebuild_rollups(business_id=None, start_date=None, end_date=None):
+    """
+    Recompute rollup rows from the document tables and commit.
+
+    Limits to one business and/or an inclusive date range when given. The
+    rollup table is locked against concurrent flushes for the duration, so
+    deltas from in-flight writes are neither lost nor counted twice.
+    Returns the number of rollup rows written.
+    """
+    from app.models.rollup import DailyBusinessRollup
+
+    table = DailyBusinessRollup.__table__
+    connection = db.session.connection()
+    connection.execute(text("LOCK TABLE daily_business_rollups IN SHARE ROW EXCLUSIVE MODE"))
+
+    delete = table.delete()
+    if business_id is not None:
+        delete = delete.where(table.c.business_id == business_id)
+    if start_date is not None:
+        delete = delete.where(table.c.day >= start_date)
+    if end_date is not None:
+        delete = delete.where(table.c.day <= end_date)
+    connection.execute(delete)
+
+    for source in get_sources():
+        model = source.model
+        day = getattr(model, source.date_attr)
+        columns = [measure.column for measure in source.measures]
+
+        query = (
+            select(model.business_id, day, *(measure.aggregate(model) for measure in source.measures))
+            .where(model.is_deleted == False, day.isnot(None))
+            .where(*(getattr(model, attr).isnot(None) for attr in source.required))
+            .group_by(model.business_id, day)
+        )
+        if business_id is not None:
+            query = query.where(model.business_id == business_id)
+        if start_date is not None:
+            query = query.where(day >= start_date)
+        if end_date is not None:
+            query = query.where(day <= end_date)
+
+        stmt = pg_insert(table).from_select(["business_id", "day", *columns], query)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.business_id, table.c.day],
+            set_={column: table.c[column] + stmt.excluded[column] for column in columns},
+        )
+        connection.execute(stmt)
+
+    count = select(func.count()).select_from(table)
+    if business_id is not None:
+        count = count.where(table.c.business_id == business_id)
+    if start_date is not None:
+        count = count.where(table.c.day >= start_date)
+    if end_date is not None:
+        count = count.where(table.c.day <= end_date)
+    written = connection.execute(count).scalar()
+
+    db.session.commit()
+
+    from app.utils.dashboard_cache import invalidate_dashboard_cache
+    invalidate_dashboard_cache(business_id)
+    return written
+
+
+def init_rollups(app):
+    """Hook rollup maintenance into every session flush."""
+    if event.contains(Session, "after_flush", _apply_rollup_deltas):
+        return
+    event.listen(Session, "after_flush", _apply_rollup_deltas)
+    for source in get_sources():
+        track_old_values(source.model, source.attrs)
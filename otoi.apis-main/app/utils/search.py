@@ -0,0 +1,77 @@
+"""
+Text Search
+===========
+Shared builder for the substring ("contains") searches behind list pages and
+dropdowns.
+
+Usage:
+    from app.utils.search import contains_any, full_name_expr
+
+    query = query.filter(contains_any(term, full_name_expr(Customer), Customer.email))
+
+Every column passed here must have a GIN ``gin_trgm_ops`` index (see the
+``trigram_search_indexes`` migration) so ``ILIKE '%term%'`` is answered with a
+bitmap index scan instead of a full table scan. When adding a searched column,
+add its index there too.
+
+``full_name_expr(model)`` renders ``first_name || ' ' || last_name``, exactly the
+expression the full-name indexes are built on. A substring of either name is
+also a substring of the full name, so searching the full name alone covers
+first- and last-name matches with a single index.
+"""
+
+from sqlalchemy import func, or_
+
+LIKE_ESCAPE = "\\"
+
+
+def normalize_term(term):
+    """Trim and collapse runs of whitespace ("  john   doe " -> "john doe")."""
+    return " ".join((term or "").split())
+
+
+def _escape_like(term):
+    return (
+        term.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
+
+
+def full_name_expr(model):
+    """``first_name || ' ' || last_name`` for Customer / Lead style models."""
+    return model.first_name + " " + model.last_name
+
+
+def display_name_expr(model):
+    """Trimmed first and last name, skipping a missing part; for output and ordering, not searching (no index)."""
+    return func.trim(func.concat_ws(" ", model.first_name, model.last_name))
+
+
+def contains_any(term, *columns):
+    """
+    OR of case-insensitive substring matches of ``term`` over ``columns``.
+
+    The term is whitespace-normalized and LIKE wildcards in it are matched
+    literally. Returns None for an empty term so callers can skip the filter.
+    """
+    term = normalize_term(term)
+    if not term:
+        return None
+    pattern = f"%{_escape_like(term)}%"
+    return or_(*(column.ilike(pattern, escape=LIKE_ESCAPE) for column in columns))
+
+
+def starts_with_any(term, *columns):
+    """Like ``contains_any`` but only matches values starting with ``term``."""
+    term = normalize_term(term)
+    if not term:
+        return None
+    pattern = f"{_escape_like(term)}%"
+    return or_(*(column.ilike(pattern, escape=LIKE_ESCAPE) for column in columns))
+
+
+def apply_search(query, term, *columns):
+    """Filter ``query`` with ``contains_any`` when ``term`` is not empty."""
+    criterion = contains_any(term, *columns)
+    return query if criterion is None else query.filter(criterion)
@@ -0,0 +1,98 @@
+"""
+Document Number Sequences
+=========================
+Hands out gap-free, per-business document numbers (INV-1001, QT-1001,
+PO-1001, ...) from the ``document_sequences`` table.
+
+Usage:
+    from app.utils.sequences import next_document_number, next_document_numbers, peek_document_number
+
+    # Inside the transaction that creates the document:
+    invoice.invoice_number = next_document_number("invoice", business_id=invoice.business_id)
+
+    # A whole batch in one round trip:
+    numbers = next_document_numbers("invoice", len(rows), business_id=5)
+
+    # Preview for a "next number" endpoint (allocates nothing):
+    peek_document_number("invoice")
+
+``next_document_number`` increments the (business, kind) row with
+``INSERT ... ON CONFLICT DO UPDATE ... RETURNING`` on the session's
+connection. The row stays locked until the creating transaction ends, so
+concurrent creates for the same business queue behind each other instead of
+reading the same "latest" number and retrying on the unique constraint. A
+rollback undoes the increment along with the document, so numbers are not
+skipped; deleting a committed document does leave a hole, as it should.
+
+Keep the transaction short after allocating: every create of that kind for
+the business waits for it.
+"""
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.extensions import db
+from app.utils.tenant import current_business_id
+
+# kind -> (number prefix, first value)
+DOCUMENT_SEQUENCES = {
+    "invoice": ("INV-", 1001),
+    "quotation": ("QT-", 1001),
+    "purchase_order": ("PO-", 1001),
+    "purchase_invoice": ("PINV-", 1001),
+    "payment_in": ("PIN-", 1000),
+    "payment_out": ("POUT-", 1001),
+    "credit_note": ("CN-", 1000),
+    "debit_note": ("DN-", 1000),
+}
+
+
+def _resolve(kind, business_id):
+    if kind not in DOCUMENT_SEQUENCES:
+        raise ValueError(f"Unknown document sequence: {kind}")
+    if business_id is None:
+        business_id = current_business_id()
+    if business_id is None:
+        raise ValueError(f"A business is required to number a {kind.replace('_', ' ')}")
+    return DOCUMENT_SEQUENCES[kind], int(business_id)
+
+
+def next_document_number(kind, business_id=None):
+    """
+    Allocate the next number of ``kind`` for a business (default: the
+    request's tenant) in the current transaction and return it formatted.
+    """
+    return next_document_numbers(kind, 1, business_id)[0]
+
+
+def next_document_numbers(kind, count, business_id=None):
+    """Allocate ``count`` consecutive numbers of ``kind`` with one statement; returns them in order."""
+    from app.models.document_sequence import DocumentSequence
+
+    (prefix, start), business_id = _resolve(kind, business_id)
+    if count <= 0:
+        return []
+    table = DocumentSequence.__table__
+
+    stmt = pg_insert(table).values(business_id=business_id, kind=kind, next_value=start + count)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.business_id, table.c.kind],
+        set_={"next_value": table.c.next_value + count, "updated_at": func.now()},
+    ).returning(table.c.next_value)
+
+    end = db.session.execute(stmt).scalar_one()
+    return [f"{prefix}{value}" for value in range(end - count, end)]
+
+
+def peek_document_number(kind, business_id=None):
+    """Number the next document of ``kind`` would get, without allocating it."""
+    from app.models.document_sequence import DocumentSequence
+
+    (prefix, start), business_id = _resolve(kind, business_id)
+    value = db.session.execute(
+        select(DocumentSequence.next_value).where(
+            DocumentSequence.business_id == business_id,
+            DocumentSequence.kind == kind,
+        )
+    ).scalar()
+    return f"{prefix}{value if value is not None else start}"
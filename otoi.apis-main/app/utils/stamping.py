@@ -1,11 +1,12 @@
 from flask import g
 from datetime import datetime
+from app.utils.tenant import current_business_id
 
 
 def set_business(instance):
-    """Set business_id on the instance using safe default."""
+    """Set business_id on the instance from the request's tenant context."""
     if hasattr(instance, 'business_id'):
-        instance.business_id = getattr(g, 'business_id', 1)
+        instance.business_id = current_business_id()
 
 
 def set_created_fields(instance):
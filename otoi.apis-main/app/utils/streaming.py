@@ -0,0 +1,57 @@
+"""
+Streaming JSON Lists
+====================
+Sends an unbounded list (the ``dropdown=true`` / ``*_dropdown_all`` modes)
+as a JSON array written row by row, instead of materialising every row and
+``jsonify``-ing the whole list.
+
+Usage:
+    from app.utils.streaming import stream_json_list
+
+    query = Customer.query.with_entities(Customer.uuid, Customer.first_name).order_by(Customer.first_name)
+    return stream_json_list(query, lambda c: {"uuid": str(c.uuid), "name": c.first_name})
+
+The query runs with ``yield_per``, which on PostgreSQL opens a server-side
+cursor and fetches ``STREAM_YIELD_PER`` rows at a time. Each batch is
+encoded and sent before the next is fetched, so memory stays flat however
+large the tenant is and the client gets the first rows before the last are
+read. The serializer may return None to leave a row out.
+
+The body is produced after the view returns (inside the request context, so
+the tenant scope and session still apply). An error mid-stream therefore
+cannot become an error response: the array is cut short and the error is
+logged. Order must come from the query's ORDER BY; there is no list to sort.
+"""
+
+from flask import Response, current_app, stream_with_context
+
+DEFAULT_YIELD_PER = 1000
+
+
+def stream_json_list(query, serialize):
+    """200 response streaming ``[serialize(row), ...]`` over ``query`` (rows serialized to None are skipped)."""
+    batch_size = current_app.config.get("STREAM_YIELD_PER", DEFAULT_YIELD_PER)
+
+    def generate():
+        dumps = current_app.json.dumps
+        separator = ""
+        batch = []
+        yield "["
+        try:
+            for row in query.yield_per(batch_size):
+                item = serialize(row)
+                if item is None:
+                    continue
+                batch.append(dumps(item))
+                if len(batch) >= batch_size:
+                    yield separator + ",".join(batch)
+                    separator = ","
+                    batch = []
+            if batch:
+                yield separator + ",".join(batch)
+        except Exception:
+            current_app.logger.exception("Streaming JSON list failed; response truncated")
+            raise
+        yield "]"
+
+    return Response(stream_with_context(generate()), status=200, mimetype="application/json")
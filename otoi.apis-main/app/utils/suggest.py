@@ -0,0 +1,468 @@
+"""
+Typeahead Suggestions
+=====================
+Bounded, ranked suggestions for party / item / document-number dropdowns,
+served from a per-process prefix index that is kept up to date on commit.
+
+Usage:
+    from app.utils.suggest import init_suggest_index, suggest
+
+    # In app/__init__.py inside create_app():
+    init_suggest_index(app)
+
+    # In a route:
+    results = suggest("acme", kinds=["customer", "vendor"], business_id=5, limit=10)
+
+Each (kind, business) pair gets a bucket holding a sorted list of search
+tokens: the whole label plus every word in it ("john smith" is found by "jo"
+and by "sm", "INV-0042" by "inv" and by "0042"). A prefix lookup is a bisect
+into that list. Buckets are built on first use with one narrow query and are
+patched from the ``after_commit`` session hook, so new or renamed parties show
+up immediately in the worker that handled the write; other workers rebuild
+once ``SUGGEST_INDEX_TTL`` expires. Bulk ``query.update()`` writes bypass the
+hook and are likewise picked up on expiry.
+
+Tenants with more than ``SUGGEST_INDEX_MAX_ENTRIES`` rows of a kind are not
+held in memory; their prefix matches come from SQL instead. Substring matches
+always come from SQL (trigram indexes, see app.utils.search), with the
+remaining ``limit`` applied in the query.
+"""
+
+import bisect
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, false
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.utils.search import contains_any, full_name_expr, normalize_term, starts_with_any
+
+# Match tiers, best first
+MATCH_LABEL_PREFIX = "prefix"
+MATCH_WORD_PREFIX = "word_prefix"
+MATCH_SUBSTRING = "substring"
+_TIER = {MATCH_LABEL_PREFIX: 0, MATCH_WORD_PREFIX: 1, MATCH_SUBSTRING: 2}
+
+_WORD_BOUNDARY = re.compile(r"[\s\-/_.]+")
+
+# Stop scanning a long run of equal prefixes after this many candidates per requested result
+_SCAN_FACTOR = 10
+
+
+# ──────────────────────────────────────────
+# Sources
+# ──────────────────────────────────────────
+
+class SuggestSource:
+    """How one kind of record is labelled, indexed and searched."""
+
+    def __init__(self, kind, model, id_attr, label_attrs, detail_attr=None, extra_attrs=()):
+        self.kind = kind
+        self.model = model
+        self.id_attr = id_attr
+        self.label_attrs = label_attrs
+        self.detail_attr = detail_attr
+        self.extra_attrs = extra_attrs
+        self.tenant_scoped = "business_id" in model.__table__.columns
+        self.soft_delete = "is_deleted" in model.__table__.columns
+
+    @property
+    def fields(self):
+        fields = list(self.label_attrs)
+        if self.detail_attr:
+            fields.append(self.detail_attr)
+        fields.extend(self.extra_attrs)
+        return fields
+
+    @property
+    def id_column(self):
+        return getattr(self.model, self.id_attr)
+
+    @property
+    def label_column(self):
+        if len(self.label_attrs) == 2:
+            return full_name_expr(self.model)
+        return getattr(self.model, self.label_attrs[0])
+
+    @property
+    def search_columns(self):
+        columns = [self.label_column]
+        columns.extend(getattr(self.model, attr) for attr in self.fields[len(self.label_attrs):])
+        return columns
+
+    def base_query(self, business_id):
+        query = db.session.query(
+            self.id_column,
+            *(getattr(self.model, attr) for attr in self.fields),
+        )
+        if self.soft_delete:
+            query = query.filter(getattr(self.model, "is_deleted") == False)
+        if self.tenant_scoped:
+            # Without a tenant a scoped kind has nothing to offer, never every tenant's rows
+            query = query.filter(
+                self.model.business_id == business_id if business_id is not None else false()
+            )
+        return query
+
+    def tenant_of(self, obj):
+        return getattr(obj, "business_id", None) if self.tenant_scoped else None
+
+    def record(self, values):
+        """(label, detail, index keys) for a row given as ``{field: value}``."""
+        label = " ".join(str(values[attr]) for attr in self.label_attrs if values.get(attr)).strip()
+        detail = values.get(self.detail_attr) if self.detail_attr else None
+        keys = [label]
+        keys.extend(str(values[attr]) for attr in self.fields[len(self.label_attrs):] if values.get(attr))
+        return label, detail, keys
+
+
+_sources = None
+
+
+def get_sources():
+    """Kind name -> ``SuggestSource`` for everything the suggest endpoint covers."""
+    global _sources
+    if _sources is None:
+        from app.models.customer import Customer
+        from app.models.vendor import Vendor
+        from app.models.inventory import Item
+        from app.models.invoice import Invoice
+        from app.models.quotation import Quotation
+        from app.models.purchase_invoice import PurchaseInvoice
+        from app.models.debit_note import DebitNote
+
+        _sources = OrderedDict((source.kind, source) for source in (
+            SuggestSource("customer", Customer, "uuid", ("first_name", "last_name"), detail_attr="mobile"),
+            SuggestSource("vendor", Vendor, "uuid", ("company_name",), detail_attr="vendor_name", extra_attrs=("mobile",)),
+            SuggestSource("item", Item, "id", ("item_name",), detail_attr="item_code"),
+            SuggestSource("invoice", Invoice, "uuid", ("invoice_number",)),
+            SuggestSource("quotation", Quotation, "uuid", ("quotation_number",)),
+            SuggestSource("purchase_invoice", PurchaseInvoice, "uuid", ("invoice_number",)),
+            SuggestSource("debit_note", DebitNote, "uuid", ("debit_note_number",)),
+        ))
+    return _sources
+
+
+def _source_for(obj):
+    for source in get_sources().values():
+        if isinstance(obj, source.model):
+            return source
+    return None
+
+
+# ──────────────────────────────────────────
+# Prefix index
+# ──────────────────────────────────────────
+
+def _tokens(keys):
+    """Every suffix of each key that starts at a word boundary, lower-cased."""
+    tokens = set()
+    for key in keys:
+        key = normalize_term(key).lower()
+        if not key:
+            continue
+        tokens.add(key)
+        for boundary in _WORD_BOUNDARY.finditer(key):
+            rest = key[boundary.end():]
+            if rest:
+                tokens.add(rest)
+    return tokens
+
+
+class _Bucket:
+    """Sorted (token, id) list plus the records it points at, for one kind and tenant."""
+
+    __slots__ = ("expires_at", "oversized", "records", "tokens")
+
+    def __init__(self, expires_at, oversized=False):
+        self.expires_at = expires_at
+        self.oversized = oversized
+        self.records = {}
+        self.tokens = []
+
+    def add(self, record_id, label, detail, keys):
+        self.remove(record_id)
+        tokens = _tokens(keys)
+        self.records[record_id] = (label, detail, tokens)
+        for token in tokens:
+            bisect.insort(self.tokens, (token, record_id))
+
+    def load(self, records):
+        """Bulk-add ``(id, label, detail, keys)`` records with a single sort."""
+        for record_id, label, detail, keys in records:
+            tokens = _tokens(keys)
+            self.records[record_id] = (label, detail, tokens)
+            self.tokens.extend((token, record_id) for token in tokens)
+        self.tokens.sort()
+
+    def remove(self, record_id):
+        record = self.records.pop(record_id, None)
+        if record is None:
+            return
+        for token in record[2]:
+            i = bisect.bisect_left(self.tokens, (token, record_id))
+            if i < len(self.tokens) and self.tokens[i] == (token, record_id):
+                del self.tokens[i]
+
+    def search(self, prefix, limit):
+        """Up to ``limit`` (tier, label, id, detail) tuples whose tokens start with ``prefix``."""
+        matches = {}
+        i = bisect.bisect_left(self.tokens, (prefix, ""))
+        scanned = 0
+        while i < len(self.tokens) and scanned < limit * _SCAN_FACTOR:
+            token, record_id = self.tokens[i]
+            if not token.startswith(prefix):
+                break
+            label, detail, _ = self.records[record_id]
+            tier = _TIER[MATCH_LABEL_PREFIX] if label.lower().startswith(prefix) else _TIER[MATCH_WORD_PREFIX]
+            if record_id not in matches or tier < matches[record_id][0]:
+                matches[record_id] = (tier, label, record_id, detail)
+            scanned += 1
+            i += 1
+        return sorted(matches.values(), key=lambda m: (m[0], m[1].lower()))[:limit]
+
+
+class SuggestIndex:
+    """
+    Thread-safe LRU of prefix buckets keyed by (kind, business_id).
+
+    Example:
+        index = SuggestIndex(ttl=300, max_entries=20000, max_buckets=256)
+        matches = index.prefix_matches(source, business_id, "acm", 10)
+        print(index.stats())
+    """
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 20000, max_buckets: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_buckets = max_buckets
+        self.hits = 0
+        self.builds = 0
+        self.evictions = 0
+        self.updates = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, ttl: float, max_entries: int, max_buckets: int):
+        with self._lock:
+            self.ttl = ttl
+            self.max_entries = max_entries
+            self.max_buckets = max_buckets
+            self._buckets.clear()
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_entries > 0 and self.max_buckets > 0
+
+    def _build(self, source, business_id):
+        rows = source.base_query(business_id).limit(self.max_entries + 1).all()
+        bucket = _Bucket(time.monotonic() + self.ttl, oversized=len(rows) > self.max_entries)
+        if not bucket.oversized:
+            bucket.load(
+                (str(row[0]), *source.record(dict(zip(source.fields, row[1:]))))
+                for row in rows
+            )
+        return bucket
+
+    def _bucket(self, source, business_id):
+        key = (source.kind, business_id)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None and bucket.expires_at > now:
+                self._buckets.move_to_end(key)
+                self.hits += 1
+                return bucket
+
+        # Build outside the lock so a large tenant does not serialise the worker
+        bucket = self._build(source, business_id)
+        with self._lock:
+            self.builds += 1
+            self._buckets[key] = bucket
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        return bucket
+
+    def prefix_matches(self, source, business_id, prefix, limit):
+        """
+        In-memory prefix matches, or None when this tenant's bucket is too
+        large to hold (or the index is disabled) and SQL has to answer.
+        """
+        if not self.enabled:
+            return None
+        bucket = self._bucket(source, business_id)
+        if bucket.oversized:
+            return None
+        with self._lock:
+            return bucket.search(prefix.lower(), limit)
+
+    def apply(self, changes):
+        """Patch loaded buckets with committed ``(kind, business_id, id, values or None)`` changes."""
+        sources = get_sources()
+        with self._lock:
+            for kind, business_id, record_id, values in changes:
+                bucket = self._buckets.get((kind, business_id))
+                if bucket is None or bucket.oversized:
+                    continue
+                if values is None:
+                    bucket.remove(record_id)
+                else:
+                    bucket.add(record_id, *sources[kind].record(values))
+                self.updates += 1
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.builds
+            return {
+                "buckets": len(self._buckets),
+                "max_buckets": self.max_buckets,
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "entries": sum(len(b.records) for b in self._buckets.values()),
+                "oversized_buckets": sum(1 for b in self._buckets.values() if b.oversized),
+                "hits": self.hits,
+                "builds": self.builds,
+                "updates": self.updates,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+suggest_index = SuggestIndex()
+
+
+# ──────────────────────────────────────────
+# Write-through from the session
+# ──────────────────────────────────────────
+
+_CHANGES_KEY = "suggest_index_changes"
+
+
+def _collect_changes(session, flush_context):
+    changes = session.info.setdefault(_CHANGES_KEY, [])
+    for obj in list(session.new) + list(session.dirty):
+        source = _source_for(obj)
+        if source is None:
+            continue
+        record_id = str(getattr(obj, source.id_attr))
+        if source.soft_delete and getattr(obj, "is_deleted", False):
+            values = None
+        else:
+            values = {attr: getattr(obj, attr, None) for attr in source.fields}
+        changes.append((source.kind, source.tenant_of(obj), record_id, values))
+    for obj in session.deleted:
+        source = _source_for(obj)
+        if source is not None:
+            changes.append((source.kind, source.tenant_of(obj), str(getattr(obj, source.id_attr)), None))
+
+
+def _apply_changes(session):
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if changes:
+        suggest_index.apply(changes)
+
+
+def _discard_changes(session):
+    session.info.pop(_CHANGES_KEY, None)
+
+
+# ──────────────────────────────────────────
+# Public API
+# ──────────────────────────────────────────
+
+def _sql_matches(source, business_id, criterion, limit, exclude_ids, match):
+    # Over-fetch by the ids already matched instead of sending them back as NOT IN
+    rows = (
+        source.base_query(business_id)
+        .filter(criterion)
+        .order_by(source.label_column)
+        .limit(limit + len(exclude_ids))
+        .all()
+    )
+
+    matches = []
+    for row in rows:
+        record_id = str(row[0])
+        if record_id in exclude_ids:
+            continue
+        label, detail, _keys = source.record(dict(zip(source.fields, row[1:])))
+        matches.append((_TIER[match], label, record_id, detail))
+    return matches[:limit]
+
+
+def suggest(term, kinds=None, business_id=None, limit=10):
+    """
+    Ranked suggestions for ``term``: whole-label prefix matches first, then
+    word prefix matches, then substring matches, alphabetical within a tier.
+
+    Returns at most ``limit`` dicts with ``type``, ``id``, ``label``,
+    ``detail`` and ``match``. Tenant-scoped kinds are skipped when
+    ``business_id`` is None.
+    """
+    term = normalize_term(term)
+    if not term or limit <= 0:
+        return []
+
+    sources = get_sources()
+    kinds = [kind for kind in (kinds or sources.keys()) if kind in sources]
+
+    results = []
+    for kind in kinds:
+        source = sources[kind]
+        if source.tenant_scoped and business_id is None:
+            continue
+        matches = suggest_index.prefix_matches(source, business_id, term, limit)
+        if matches is None:
+            matches = _sql_matches(
+                source, business_id, starts_with_any(term, *source.search_columns), limit, (), MATCH_LABEL_PREFIX
+            )
+        if len(matches) < limit:
+            matches += _sql_matches(
+                source, business_id, contains_any(term, *source.search_columns),
+                limit - len(matches), {m[2] for m in matches}, MATCH_SUBSTRING,
+            )
+        results.extend((kind, m) for m in matches)
+
+    order = {kind: i for i, kind in enumerate(kinds)}
+    results.sort(key=lambda r: (r[1][0], order[r[0]], r[1][1].lower()))
+
+    tier_names = {tier: name for name, tier in _TIER.items()}
+    return [
+        {
+            "type": kind,
+            "id": record_id,
+            "label": label,
+            "detail": detail,
+            "match": tier_names[tier],
+        }
+        for kind, (tier, label, record_id, detail) in results[:limit]
+    ]
+
+
+def init_suggest_index(app):
+    """
+    Size the suggest index from the application config and hook it to commits.
+
+    Config:
+        SUGGEST_INDEX_TTL          Seconds before a bucket is rebuilt (0 disables the index).
+        SUGGEST_INDEX_MAX_ENTRIES  Rows of one kind per tenant kept in memory.
+        SUGGEST_INDEX_MAX_BUCKETS  (kind, tenant) buckets kept per worker.
+    """
+    suggest_index.configure(
+        ttl=float(app.config.get("SUGGEST_INDEX_TTL", 300)),
+        max_entries=int(app.config.get("SUGGEST_INDEX_MAX_ENTRIES", 20000)),
+        max_buckets=int(app.config.get("SUGGEST_INDEX_MAX_BUCKETS", 256)),
+    )
+    if not event.contains(Session, "after_flush", _collect_changes):
+        event.listen(Session, "after_flush", _collect_changes)
+        event.listen(Session, "after_commit", _apply_changes)
+        event.listen(Session, "after_rollback", _discard_changes)
@@ -0,0 +1,163 @@
+"""
+Tenant Context
+==============
+Resolves the caller's business (tenant) once per request and scopes every ORM
+SELECT on a ``business_id``-bearing model to it.
+
+Usage:
+    from app.utils.tenant import init_tenant_scope, current_business_id
+
+    # In app/__init__.py inside create_app():
+    init_tenant_scope(app)
+
+    # In a route:
+    business_id = current_business_id()
+
+With a tenant resolved, ``Invoice.query.all()`` is emitted as
+``... WHERE invoices.business_id = :business_id`` (also for joined and
+aliased entities), so queries stay on the ``business_id`` indexes and one
+tenant's data volume does not slow down another's. Models whose
+``business_id`` is nullable (lookup tables, addresses) also keep rows with a
+NULL ``business_id``, which are shared by all tenants.
+
+Relationship loads (lazy, ``selectinload`` and the like) are skipped by the
+hook itself. They are scoped only because ``with_loader_criteria`` carries
+its criteria from the parent query onto the objects it loaded. Objects that
+came from an unscoped query (``all_tenants``, or loaded outside a request)
+load their relationships unfiltered.
+
+Queries that must see every tenant (housekeeping jobs, repair commands)
+opt out with::
+
+    Invoice.query.execution_options(all_tenants=True)
+
+Outside a request nothing is filtered. Inside one without a tenant (a
+token with no business, a public route) the filter matches no rows, so a
+missing tenant never widens what a query can see. A ``business_id`` claim
+for a business the user does not belong to raises ``TenantAccessDenied``,
+which the JWT middleware answers with 403.
+"""
+
+from flask import g, has_request_context
+from sqlalchemy import event, or_
+from sqlalchemy.orm import Session, with_loader_criteria
+
+from app.extensions import db
+
+
+class TenantContext:
+    """Identity of the tenant and user a request acts for."""
+
+    __slots__ = ("business_id", "user_id", "role")
+
+    def __init__(self, business_id=None, user_id=None, role=None):
+        self.business_id = business_id
+        self.user_id = user_id
+        self.role = role
+
+    def __repr__(self):
+        return f"<TenantContext(business_id={self.business_id}, user_id={self.user_id}, role={self.role})>"
+
+
+_EMPTY_TENANT = TenantContext()
+
+# Compared against business_id when no tenant is resolved; no business has it
+NO_TENANT = -1
+
+
+class TenantAccessDenied(Exception):
+    """The token names a business the user does not belong to."""
+
+
+def resolve_tenant(user_id, claims, status=None):
+    """
+    Build the request's tenant context from the verified JWT claims.
+
+    ``status`` is the cached ``UserStatus``; a ``business_id`` claim for a
+    business the user does not (or no longer) belong to raises
+    ``TenantAccessDenied``.
+    """
+    business_id = claims.get("business_id")
+    if business_id is not None and status is not None and business_id not in status.business_ids:
+        raise TenantAccessDenied(f"User is not a member of business {business_id}")
+    return set_tenant(business_id, user_id=user_id, role=claims.get("role"))
+
+
+def set_tenant(business_id, user_id=None, role=None):
+    """Make ``business_id`` the request's tenant (e.g. the owner of a document a share token grants)."""
+    tenant = TenantContext(business_id=business_id, user_id=user_id, role=role)
+    g.tenant = tenant
+    # Kept for code that still reads the flat attributes
+    g.business_id = tenant.business_id
+    g.role = tenant.role
+    return tenant
+
+
+def current_tenant():
+    """Return the request's ``TenantContext`` (an empty one outside authenticated requests)."""
+    if has_request_context():
+        return g.get("tenant") or _EMPTY_TENANT
+    return _EMPTY_TENANT
+
+
+def current_business_id():
+    """Return the request's business id, or None when no tenant is resolved."""
+    return current_tenant().business_id
+
+
+# ──────────────────────────────────────────
+# Session-level tenant filter
+# ──────────────────────────────────────────
+
+_tenant_models = None
+
+
+def _scoped_models():
+    """(model, business_id nullable) for every mapped class carrying a business_id column."""
+    global _tenant_models
+    if _tenant_models is None:
+        models = []
+        for mapper in db.Model.registry.mappers:
+            column = mapper.columns.get("business_id")
+            if column is not None and mapper.class_.__name__ != "Business":
+                models.append((mapper.class_, bool(column.nullable)))
+        _tenant_models = tuple(models)
+    return _tenant_models
+
+
+def _apply_tenant_scope(execute_state):
+    if (
+        not execute_state.is_select
+        or execute_state.is_column_load
+        or execute_state.is_relationship_load
+        or execute_state.execution_options.get("all_tenants", False)
+    ):
+        return
+
+    if not has_request_context():
+        return
+    business_id = current_business_id()
+    if business_id is None:
+        business_id = NO_TENANT
+
+    options = []
+    for model, nullable in _scoped_models():
+        if nullable:
+            options.append(with_loader_criteria(
+                model,
+                lambda cls: or_(cls.business_id == business_id, cls.business_id.is_(None)),
+                include_aliases=True,
+            ))
+        else:
+            options.append(with_loader_criteria(
+                model,
+                lambda cls: cls.business_id == business_id,
+                include_aliases=True,
+            ))
+    execute_state.statement = execute_state.statement.options(*options)
+
+
+def init_tenant_scope(app):
+    """Install the ``do_orm_execute`` hook that applies the tenant filter."""
+    if not event.contains(Session, "do_orm_execute", _apply_tenant_scope):
+        event.listen(Session, "do_orm_execute", _apply_tenant_scope)
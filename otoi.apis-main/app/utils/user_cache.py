@@ -0,0 +1,160 @@
+"""
+User Status Cache
+=================
+Per-process TTL/LRU cache of the user attributes the JWT middleware needs on
+every authenticated request (active flag, role name and business ids), so the
+middleware does not pay a ``users`` round-trip per API call.
+
+Usage:
+    from app.utils.user_cache import init_user_cache, get_user_status, invalidate_user
+
+    # In app/__init__.py inside create_app():
+    init_user_cache(app)
+
+    # In a route that changes a user's status, role, businesses or password:
+    invalidate_user(user.uuid)
+
+Every gunicorn worker holds its own cache, and explicit invalidation only
+reaches the worker that handled the write. Other workers pick the change up
+once the entry expires, so ``USER_STATUS_CACHE_TTL`` is the upper bound on how
+long a deactivated user can keep using an issued token.
+"""
+
+import time
+import threading
+from collections import OrderedDict, namedtuple
+
+from sqlalchemy import func
+
+from app.extensions import db
+
+
+UserStatus = namedtuple("UserStatus", ["is_active", "role", "business_ids"])
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries expire ``ttl`` seconds after load.
+
+    Example:
+        cache = TTLCache(ttl=30, max_size=1024)
+        status = cache.get(user_id, loader)
+        print(cache.stats())
+    """
+
+    def __init__(self, ttl: float = 30.0, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def configure(self, ttl: float, max_size: int):
+        with self._lock:
+            self.ttl = ttl
+            self.max_size = max_size
+            self._entries.clear()
+
+    def get(self, key, loader):
+        """Return the cached value for ``key``, calling ``loader(key)`` on a miss."""
+        key = str(key)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Load outside the lock so a slow query does not serialise the worker
+        value = loader(key)
+
+        if self.ttl > 0 and self.max_size > 0:
+            with self._lock:
+                self._entries[key] = (now + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(str(key), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+user_status_cache = TTLCache()
+
+
+def _load_user_status(user_id):
+    """Fetch active flag, role name and business ids for a user in one query."""
+    from app.models.user import User, Role
+    from app.models.associations import user_business
+
+    row = (
+        db.session.query(
+            User.isActive,
+            Role.name,
+            func.array_remove(func.array_agg(user_business.c.business_id), None),
+        )
+        .outerjoin(Role, User.role_id == Role.id)
+        .outerjoin(user_business, user_business.c.user_id == User.uuid)
+        .filter(User.uuid == user_id)
+        .group_by(User.uuid, User.isActive, Role.name)
+        .first()
+    )
+    if row is None:
+        return None
+
+    return UserStatus(
+        is_active=bool(row[0]),
+        role=row[1],
+        business_ids=tuple(sorted(row[2] or ())),
+    )
+
+
+def get_user_status(user_id):
+    """Return the cached ``UserStatus`` for ``user_id`` or None if the user does not exist."""
+    return user_status_cache.get(user_id, _load_user_status)
+
+
+def invalidate_user(user_id):
+    """Drop a user's cached status; call after changing their status, role, businesses or password."""
+    if user_id is not None:
+        user_status_cache.invalidate(user_id)
+
+
+def init_user_cache(app):
+    """
+    Size the user status cache from the application config.
+
+    Config:
+        USER_STATUS_CACHE_TTL       Seconds an entry stays valid (0 disables caching).
+        USER_STATUS_CACHE_MAX_SIZE  Maximum number of users kept per worker.
+    """
+    user_status_cache.configure(
+        ttl=float(app.config.get("USER_STATUS_CACHE_TTL", 30)),
+        max_size=int(app.config.get("USER_STATUS_CACHE_MAX_SIZE", 1024)),
+    )
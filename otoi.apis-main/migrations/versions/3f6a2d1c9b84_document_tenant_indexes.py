@@ -0,0 +1,83 @@
+"""tenant-scoped composite and partial indexes on document tables
+
+Revision ID: 3f6a2d1c9b84
+Revises: c0cb4aed380f
+Create Date: 2026-10-17 10:00:00.000000
+
+Every document list and dashboard query filters on business_id and
+is_deleted = false and orders or ranges on a date column. These indexes
+lead with business_id and are partial on live rows, so soft-deleted
+documents do not bloat them.
+
+Indexes are built CONCURRENTLY so writes are not blocked on large tables,
+and with IF NOT EXISTS because 0001_consolidated creates any index already
+declared on the models for fresh databases. Check the plans afterwards with
+`flask verify-indexes`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6a2d1c9b84'
+down_revision = 'c0cb4aed380f'
+branch_labels = None
+depends_on = None
+
+
+ACTIVE = "is_deleted = false"
+ACTIVE_UNPAID = "is_deleted = false AND payment_status <> 'paid'"
+
+INDEXES = [
+    # (index name, table, columns, partial predicate)
+    ("idx_invoices_business_created_active", "invoices", ["business_id", "created_at"], ACTIVE),
+    ("idx_invoices_business_invoice_date_active", "invoices", ["business_id", "invoice_date"], ACTIVE),
+    ("idx_invoices_business_due_date_unpaid", "invoices", ["business_id", "due_date"], ACTIVE_UNPAID),
+    ("idx_invoices_business_customer_unpaid", "invoices", ["business_id", "customer_id"], ACTIVE_UNPAID),
+    ("idx_invoices_business_updated_paid", "invoices", ["business_id", "updated_at"], "is_deleted = false AND amount_paid > 0"),
+
+    ("idx_credit_notes_business_created_active", "credit_notes", ["business_id", "created_at"], ACTIVE),
+    ("idx_credit_notes_business_date_active", "credit_notes", ["business_id", "credit_note_date"], ACTIVE),
+
+    ("idx_debit_notes_business_created_active", "debit_notes", ["business_id", "created_at"], ACTIVE),
+    ("idx_debit_notes_business_date_active", "debit_notes", ["business_id", "debit_note_date", "created_at"], ACTIVE),
+
+    ("idx_payment_ins_business_created_active", "payment_ins", ["business_id", "created_at"], ACTIVE),
+    ("idx_payment_ins_business_date_active", "payment_ins", ["business_id", "payment_date", "created_at"], ACTIVE),
+
+    ("idx_payment_outs_business_created", "payment_outs", ["business_id", "created_at"], None),
+    ("idx_payment_outs_business_date_active", "payment_outs", ["business_id", "payment_date", "created_at"], ACTIVE),
+
+    ("idx_purchase_invoices_business_created_active", "purchase_invoices", ["business_id", "created_at"], ACTIVE),
+    ("idx_purchase_invoices_business_invoice_date_active", "purchase_invoices", ["business_id", "invoice_date"], ACTIVE),
+    ("idx_purchase_invoices_business_vendor_unpaid", "purchase_invoices", ["business_id", "vendor_id"], ACTIVE_UNPAID),
+
+    ("idx_quotations_business_created", "quotations", ["business_id", "created_at"], None),
+    ("idx_purchase_orders_business_open_created", "purchase_orders", ["business_id", "created_at"], "status = 'open'"),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _columns, _where in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
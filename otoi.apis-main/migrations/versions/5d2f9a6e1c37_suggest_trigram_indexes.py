@@ -0,0 +1,41 @@
+"""trigram indexes for the remaining suggest endpoint columns
+
+Revision ID: 5d2f9a6e1c37
+Revises: 8b1e4c7d2a90
+Create Date: 2026-10-17 14:00:00.000000
+
+/api/search/suggest also matches purchase invoice and debit note numbers by
+substring; give them the same gin_trgm_ops indexes as the other searched
+columns (see 8b1e4c7d2a90).
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2f9a6e1c37'
+down_revision = '8b1e4c7d2a90'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    # (index name, table, indexed column)
+    ("idx_purchase_invoices_invoice_number_trgm", "purchase_invoices", "invoice_number"),
+    ("idx_debit_notes_debit_note_number_trgm", "debit_notes", "debit_note_number"),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, column in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _table, _column in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,110 @@
+"""daily business rollups table
+
+Revision ID: 7c4e1b9a3d52
+Revises: 5d2f9a6e1c37
+Create Date: 2026-10-17 16:00:00.000000
+
+One row per business and document date holding sales, purchase, receipt,
+payment, credit note and debit note totals and counts, so dashboard widgets
+read O(days) rows. Kept current by the flush hook in app/utils/rollups.py;
+this migration backfills it from the live (is_deleted = false) documents.
+Repair later with `flask rebuild-rollups`.
+
+On a fresh database 0001_consolidated has already created the table from
+the model, so it is only created when missing; the backfill starts from an
+empty table either way, so running it again gives the same totals.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4e1b9a3d52'
+down_revision = '5d2f9a6e1c37'
+branch_labels = None
+depends_on = None
+
+
+AMOUNT_COLUMNS = [
+    "sales_total", "sales_received", "purchases_total", "receipts_total", "payments_total",
+    "credit_notes_total", "credit_notes_refunded", "debit_notes_total", "debit_notes_credited",
+]
+COUNT_COLUMNS = [
+    "sales_count", "purchases_count", "receipts_count", "payments_count",
+    "credit_notes_count", "debit_notes_count",
+]
+
+BACKFILL = [
+    # (source table, date column, {rollup column: aggregate})
+    ("invoices", "invoice_date", {
+        "sales_total": "SUM(COALESCE(total_amount, 0))",
+        "sales_count": "COUNT(*)",
+        "sales_received": "SUM(COALESCE(amount_paid, 0))",
+    }),
+    ("purchase_invoices", "invoice_date", {
+        "purchases_total": "SUM(COALESCE(total_amount, 0))",
+        "purchases_count": "COUNT(*)",
+    }),
+    ("payment_ins", "payment_date", {
+        "receipts_total": "SUM(COALESCE(amount_received, 0))",
+        "receipts_count": "COUNT(*)",
+    }),
+    ("payment_outs", "payment_date", {
+        "payments_total": "SUM(COALESCE(amount_paid, 0))",
+        "payments_count": "COUNT(*)",
+    }),
+    ("credit_notes", "credit_note_date", {
+        "credit_notes_total": "SUM(COALESCE(total_amount, 0))",
+        "credit_notes_count": "COUNT(*)",
+        "credit_notes_refunded": "SUM(COALESCE(amount_received, 0))",
+    }),
+    ("debit_notes", "debit_note_date", {
+        "debit_notes_total": "SUM(COALESCE(total_amount, 0))",
+        "debit_notes_count": "COUNT(*)",
+        "debit_notes_credited": (
+            "SUM(CASE WHEN lower(status) = 'credited' THEN COALESCE(amount_received, 0) ELSE 0 END)"
+        ),
+    }),
+]
+
+# Extra row filters; a payment with no payment_mode was never in the summary's cash or bank totals
+BACKFILL_FILTERS = {
+    "payment_outs": "payment_mode IS NOT NULL",
+}
+
+
+def _create_table():
+    op.create_table(
+        'daily_business_rollups',
+        sa.Column('business_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        *[sa.Column(name, sa.Numeric(14, 2), nullable=False, server_default='0') for name in AMOUNT_COLUMNS],
+        *[sa.Column(name, sa.Integer(), nullable=False, server_default='0') for name in COUNT_COLUMNS],
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['business_id'], ['businesses.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('business_id', 'day'),
+    )
+
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table('daily_business_rollups'):
+        _create_table()
+
+    # The backfill adds per source table, so start from nothing
+    op.execute("DELETE FROM daily_business_rollups")
+    for table, date_column, aggregates in BACKFILL:
+        columns = ", ".join(aggregates)
+        expressions = ", ".join(aggregates.values())
+        updates = ", ".join(f"{c} = daily_business_rollups.{c} + EXCLUDED.{c}" for c in aggregates)
+        extra = f"AND {BACKFILL_FILTERS[table]} " if table in BACKFILL_FILTERS else ""
+        op.execute(
+            f"INSERT INTO daily_business_rollups (business_id, day, {columns}) "
+            f"SELECT business_id, {date_column}, {expressions} FROM {table} "
+            f"WHERE is_deleted = false AND business_id IS NOT NULL AND {date_column} IS NOT NULL {extra}"
+            f"GROUP BY business_id, {date_column} "
+            f"ON CONFLICT (business_id, day) DO UPDATE SET {updates}"
+        )
+
+
+def downgrade():
+    op.drop_table('daily_business_rollups')
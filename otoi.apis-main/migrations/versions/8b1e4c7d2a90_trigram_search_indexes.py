@@ -0,0 +1,73 @@
+"""trigram search indexes for contains-search columns
+
+Revision ID: 8b1e4c7d2a90
+Revises: 3f6a2d1c9b84
+Create Date: 2026-10-17 12:00:00.000000
+
+The list and dropdown searches filter with ILIKE '%term%', which a btree
+index cannot serve. GIN indexes with gin_trgm_ops (pg_trgm) can, for plain
+columns and for the first_name || ' ' || last_name expression used by
+app.utils.search.full_name_expr. The expression here must stay identical to
+that helper or the planner will not match it.
+
+These indexes live only in migrations: pg_trgm has to exist before they are
+created, which the create_all in 0001_consolidated cannot guarantee.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1e4c7d2a90'
+down_revision = '3f6a2d1c9b84'
+branch_labels = None
+depends_on = None
+
+
+FULL_NAME = "(first_name || ' ' || last_name)"
+
+INDEXES = [
+    # (index name, table, indexed column or expression)
+    ("idx_customers_full_name_trgm", "customers", FULL_NAME),
+    ("idx_customers_email_trgm", "customers", "email"),
+    ("idx_customers_mobile_trgm", "customers", "mobile"),
+    ("idx_customers_gst_trgm", "customers", "gst"),
+
+    ("idx_leads_full_name_trgm", "leads", FULL_NAME),
+    ("idx_leads_email_trgm", "leads", "email"),
+    ("idx_leads_mobile_trgm", "leads", "mobile"),
+    ("idx_leads_gst_trgm", "leads", "gst"),
+
+    ("idx_vendors_company_name_trgm", "vendors", "company_name"),
+    ("idx_vendors_vendor_name_trgm", "vendors", "vendor_name"),
+    ("idx_vendors_email_trgm", "vendors", "email"),
+    ("idx_vendors_mobile_trgm", "vendors", "mobile"),
+    ("idx_vendors_gst_trgm", "vendors", "gst"),
+
+    ("idx_items_item_name_trgm", "items", "item_name"),
+    ("idx_items_item_code_trgm", "items", "item_code"),
+    ("idx_items_description_trgm", "items", "description"),
+    ("idx_items_hsn_code_trgm", "items", "hsn_code"),
+    ("idx_item_categories_name_trgm", "item_categories", "name"),
+
+    ("idx_invoices_invoice_number_trgm", "invoices", "invoice_number"),
+    ("idx_quotations_quotation_number_trgm", "quotations", "quotation_number"),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, expression in INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} USING gin ({expression} gin_trgm_ops)"
+            )
+
+
+def downgrade():
+    # pg_trgm is left installed; other objects may depend on it
+    with op.get_context().autocommit_block():
+        for name, _table, _expression in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
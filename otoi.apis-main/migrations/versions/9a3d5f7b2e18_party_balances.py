@@ -0,0 +1,90 @@
+"""party balances table
+
+Revision ID: 9a3d5f7b2e18
+Revises: 7c4e1b9a3d52
+Create Date: 2026-10-17 18:00:00.000000
+
+One row per business and party holding the open invoice balance, open
+invoice count and latest document date, so /dashboard/top-parties reads
+an index. Kept current by the flush hook in app/utils/party_balances.py;
+this migration backfills it. Repair later with
+`flask reconcile-party-balances`.
+
+On a fresh database 0001_consolidated has already created the table and
+its index from the model, so each is only created when missing; the
+backfill replaces whatever rows the table holds.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3d5f7b2e18'
+down_revision = '7c4e1b9a3d52'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL = """
+INSERT INTO party_balances (business_id, party_type, party_id, outstanding, doc_count, last_activity)
+SELECT business_id, party_type, party_id, SUM(outstanding), SUM(doc_count), MAX(activity_date)
+FROM (
+    SELECT business_id, 'customer' AS party_type, customer_id AS party_id,
+           CASE WHEN payment_status <> 'paid' THEN COALESCE(balance_due, 0) ELSE 0 END AS outstanding,
+           CASE WHEN payment_status <> 'paid' THEN 1 ELSE 0 END AS doc_count,
+           invoice_date AS activity_date
+    FROM invoices WHERE is_deleted = false AND customer_id IS NOT NULL
+    UNION ALL
+    SELECT business_id, 'vendor', vendor_id,
+           CASE WHEN payment_status <> 'paid' THEN COALESCE(balance_due, 0) ELSE 0 END,
+           CASE WHEN payment_status <> 'paid' THEN 1 ELSE 0 END,
+           invoice_date
+    FROM purchase_invoices WHERE is_deleted = false AND vendor_id IS NOT NULL
+    UNION ALL
+    SELECT business_id, 'customer', customer_id, 0, 0, credit_note_date
+    FROM credit_notes WHERE is_deleted = false AND customer_id IS NOT NULL
+    UNION ALL
+    SELECT business_id, 'vendor', vendor_id, 0, 0, debit_note_date
+    FROM debit_notes WHERE is_deleted = false AND vendor_id IS NOT NULL
+) documents
+GROUP BY business_id, party_type, party_id
+"""
+
+
+def _create_table():
+    op.create_table(
+        'party_balances',
+        sa.Column('business_id', sa.Integer(), nullable=False),
+        sa.Column('party_type', sa.String(length=10), nullable=False),
+        sa.Column('party_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('outstanding', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('doc_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_activity', sa.Date(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['business_id'], ['businesses.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('business_id', 'party_type', 'party_id'),
+    )
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('party_balances'):
+        _create_table()
+        indexes = set()
+    else:
+        indexes = {index['name'] for index in inspector.get_indexes('party_balances')}
+    if 'idx_party_balances_business_type_outstanding' not in indexes:
+        op.create_index(
+            'idx_party_balances_business_type_outstanding',
+            'party_balances',
+            ['business_id', 'party_type', 'outstanding'],
+        )
+
+    op.execute("DELETE FROM party_balances")
+    op.execute(BACKFILL)
+
+
+def downgrade():
+    op.drop_index('idx_party_balances_business_type_outstanding', table_name='party_balances')
+    op.drop_table('party_balances')
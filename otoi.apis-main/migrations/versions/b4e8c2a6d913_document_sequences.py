@@ -0,0 +1,86 @@
+"""document number sequences per business
+
+Revision ID: b4e8c2a6d913
+Revises: 9a3d5f7b2e18
+Create Date: 2026-10-17 19:00:00.000000
+
+Document numbers (INV-, QT-, PO-, PINV-, PIN-, POUT-, CN-, DN-) were found by
+reading the latest row and adding one, globally, with retries and random
+fallbacks on collision. They are now allocated per business from
+``document_sequences`` (see app/utils/sequences.py), so uniqueness of each
+number column moves from global to per business.
+
+The sequences are seeded with one past the highest numeric suffix each
+business already uses, counting soft-deleted rows; a sequence that
+already exists is only ever moved forward.
+
+On a fresh database 0001_consolidated has already created the table and
+the per-business constraints from the models, so each is only created
+when missing.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e8c2a6d913'
+down_revision = '9a3d5f7b2e18'
+branch_labels = None
+depends_on = None
+
+
+# (sequence kind, table, number column, prefix, first value)
+DOCUMENTS = [
+    ("invoice", "invoices", "invoice_number", "INV-", 1001),
+    ("quotation", "quotations", "quotation_number", "QT-", 1001),
+    ("purchase_order", "purchase_orders", "po_number", "PO-", 1001),
+    ("purchase_invoice", "purchase_invoices", "invoice_number", "PINV-", 1001),
+    ("payment_in", "payment_ins", "payment_number", "PIN-", 1000),
+    ("payment_out", "payment_outs", "payment_number", "POUT-", 1001),
+    ("credit_note", "credit_notes", "credit_note_number", "CN-", 1000),
+    ("debit_note", "debit_notes", "debit_note_number", "DN-", 1000),
+]
+
+
+def _create_table():
+    op.create_table(
+        'document_sequences',
+        sa.Column('business_id', sa.Integer(), nullable=False),
+        sa.Column('kind', sa.String(length=30), nullable=False),
+        sa.Column('next_value', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.ForeignKeyConstraint(['business_id'], ['businesses.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('business_id', 'kind'),
+    )
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('document_sequences'):
+        _create_table()
+
+    for kind, table, column, prefix, start in DOCUMENTS:
+        op.execute(
+            f"INSERT INTO document_sequences (business_id, kind, next_value) "
+            f"SELECT business_id, '{kind}', "
+            f"GREATEST(COALESCE(MAX(CAST(SUBSTRING({column} FROM {len(prefix) + 1}) AS BIGINT)), 0) + 1, {start}) "
+            f"FROM {table} "
+            f"WHERE business_id IS NOT NULL AND {column} ~ '^{prefix}[0-9]+$' "
+            f"GROUP BY business_id "
+            f"ON CONFLICT (business_id, kind) DO UPDATE "
+            f"SET next_value = GREATEST(document_sequences.next_value, EXCLUDED.next_value)"
+        )
+
+        # Postgres' default name for the old column-level UNIQUE
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_{column}_key")
+        constraint = f"uq_{table}_business_{column}"
+        if constraint not in {c['name'] for c in inspector.get_unique_constraints(table)}:
+            op.create_unique_constraint(constraint, table, ["business_id", column])
+
+
+def downgrade():
+    for kind, table, column, prefix, start in reversed(DOCUMENTS):
+        op.drop_constraint(f"uq_{table}_business_{column}", table, type_="unique")
+        op.create_unique_constraint(f"{table}_{column}_key", table, [column])
+
+    op.drop_table('document_sequences')
@@ -0,0 +1,92 @@
+"""invoice credit note totals and effective balance
+
+Revision ID: d7a1f3c5e820
+Revises: b4e8c2a6d913
+Create Date: 2026-10-17 20:00:00.000000
+
+Stores on each invoice the sum of its live credit notes, the balance left
+after payments, discount and credit notes, and the resulting status
+(unpaid / partial / paid / refunded). Kept current by the flush hook in
+app/utils/invoice_balances.py; this migration backfills them. Repair later
+with `flask reconcile-invoice-balances`.
+
+0001_consolidated may already have added the columns (from the model on a
+fresh database, as nullable ones on an existing database) and the index,
+so each is only added when missing and pre-existing columns are brought to
+NOT NULL with their defaults after the backfill. The backfill recomputes
+every invoice, so running it again gives the same values.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a1f3c5e820'
+down_revision = 'b4e8c2a6d913'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL = """
+UPDATE invoices SET credit_notes_total = COALESCE((
+    SELECT SUM(credit_notes.total_amount)
+    FROM credit_notes
+    WHERE credit_notes.is_deleted = false AND credit_notes.invoice_id = invoices.uuid
+), 0)
+"""
+
+EFFECTIVE = """
+UPDATE invoices SET
+    effective_balance_due = balance,
+    effective_status = CASE
+        WHEN balance <= 0 AND credit_notes_total >= total_amount THEN 'refunded'
+        WHEN balance <= 0 THEN 'paid'
+        WHEN COALESCE(amount_paid, 0) > 0 OR credit_notes_total > 0 THEN 'partial'
+        ELSE 'unpaid'
+    END
+FROM (
+    SELECT uuid AS invoice_id,
+           GREATEST(ROUND(total_amount - COALESCE(amount_paid, 0) - COALESCE(payment_discount, 0)
+                          - credit_notes_total, 2), 0) AS balance
+    FROM invoices
+) computed
+WHERE invoices.uuid = computed.invoice_id
+"""
+
+
+COLUMNS = [
+    # (name, type, server default)
+    ('credit_notes_total', sa.Numeric(12, 2), '0'),
+    ('effective_balance_due', sa.Numeric(12, 2), '0'),
+    ('effective_status', sa.String(length=20), 'unpaid'),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = {column['name'] for column in inspector.get_columns('invoices')}
+    for name, type_, default in COLUMNS:
+        if name not in existing:
+            op.add_column('invoices', sa.Column(name, type_, nullable=False, server_default=default))
+
+    op.execute(BACKFILL)
+    op.execute(EFFECTIVE)
+
+    for name, type_, default in COLUMNS:
+        if name in existing:
+            op.alter_column('invoices', name, existing_type=type_, nullable=False, server_default=default)
+
+    if 'idx_invoices_business_effective_status' not in {index['name'] for index in inspector.get_indexes('invoices')}:
+        op.create_index(
+            'idx_invoices_business_effective_status',
+            'invoices',
+            ['business_id', 'effective_status', 'created_at'],
+            postgresql_where=sa.text('is_deleted = false'),
+        )
+
+
+def downgrade():
+    op.drop_index('idx_invoices_business_effective_status', table_name='invoices')
+    op.drop_column('invoices', 'effective_status')
+    op.drop_column('invoices', 'effective_balance_due')
+    op.drop_column('invoices', 'credit_notes_total')
@@ -0,0 +1,137 @@
+"""
+Shared fixtures.
+
+Tests that touch the database need a disposable PostgreSQL database named by
+TEST_DATABASE_URI (e.g. postgresql://postgres:@localhost/otoi_test); its schema
+is dropped and recreated from the models. Without it those tests are skipped.
+"""
+
+import os
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+TEST_DATABASE_URI = os.environ.get("TEST_DATABASE_URI")
+
+# Config reads the environment at import time, so this must run before `app` is imported.
+if TEST_DATABASE_URI:
+    os.environ["DATABASE_URI"] = TEST_DATABASE_URI
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("JWT_SECRET_KEY", "test-jwt-secret-key")
+os.environ["DASHBOARD_CACHE_TYPE"] = "NullCache"
+os.environ["JOBS_SCHEDULER_ENABLED"] = "false"
+
+
+@pytest.fixture(scope="session")
+def app():
+    if not TEST_DATABASE_URI:
+        pytest.skip("TEST_DATABASE_URI is not set")
+
+    from app import create_app
+    from app.extensions import db
+
+    flask_app = create_app()
+    flask_app.config["TESTING"] = True
+    with flask_app.app_context():
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql("DROP SCHEMA public CASCADE")
+            connection.exec_driver_sql("CREATE SCHEMA public")
+        db.create_all()
+    return flask_app
+
+
+@pytest.fixture
+def db_session(app):
+    """The app's session inside an app context; every table is emptied afterwards."""
+    from app.extensions import db
+
+    with app.app_context():
+        yield db.session
+        db.session.remove()
+        tables = ", ".join(table.name for table in db.metadata.sorted_tables)
+        with db.engine.begin() as connection:
+            connection.exec_driver_sql(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+
+
+def _create_tenant(db_session):
+    from flask_jwt_extended import create_access_token
+    from app.models.business import Business
+    from app.models.user import Role, User
+
+    suffix = uuid.uuid4().hex[:8]
+    role = Role(name=f"admin-{suffix}")
+    business = Business(
+        name=f"Test Business {suffix}",
+        phone_number=suffix,
+        email=f"business-{suffix}@example.com",
+        subscription_plan="free",
+    )
+    user = User(
+        firstName="Test",
+        username=f"user-{suffix}",
+        email=f"user-{suffix}@example.com",
+        mobileNo=str(uuid.uuid4().int)[:10],
+        password_hash="!",
+        role=role,
+        isActive=True,
+    )
+    user.businesses.append(business)
+    db_session.add_all([role, business, user])
+    db_session.commit()
+
+    def headers_for(**claims):
+        """Authorization header for this user with the given JWT claims."""
+        token = create_access_token(identity=str(user.uuid), additional_claims=claims)
+        return {"Authorization": f"Bearer {token}"}
+
+    return SimpleNamespace(
+        business_id=business.id,
+        user_id=user.uuid,
+        headers=headers_for(username=user.username, role=role.name, business_id=business.id),
+        headers_for=headers_for,
+    )
+
+
+@pytest.fixture
+def tenant(db_session):
+    """A business with one active user, plus the Authorization header for that user."""
+    return _create_tenant(db_session)
+
+
+@pytest.fixture
+def other_tenant(db_session):
+    """A second, unrelated business and user."""
+    return _create_tenant(db_session)
+
+
+ADDRESS = dict(address1="1 Main St", city="Pune", state="MH", country="India", pin="411001")
+
+
+@pytest.fixture
+def customer(db_session):
+    from app.models.customer import Customer
+    from app.models.person import Lead
+
+    lead = Lead(first_name="Asha", last_name="Rao", status=1)
+    db_session.add(lead)
+    db_session.flush()
+    row = Customer(lead_id=lead.uuid, first_name="Asha", last_name="Rao", status="active", **ADDRESS)
+    db_session.add(row)
+    db_session.commit()
+    return row
+
+
+@pytest.fixture
+def vendor(db_session):
+    from app.models.vendor import Vendor
+
+    row = Vendor(company_name="Acme Supplies", **ADDRESS)
+    db_session.add(row)
+    db_session.commit()
+    return row
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
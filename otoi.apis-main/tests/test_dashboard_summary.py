@@ -0,0 +1,178 @@
+"""
+/api/dashboard/summary is one CTE query; these tests pin its numbers to the
+per-credit-note loop it replaced (``_legacy_summary`` below) on a dataset that
+walks every branch of the credit note split.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models.creditIn import CreditNote
+from app.models.debit_note import DebitNote
+from app.models.invoice import Invoice
+from app.models.purchase_invoice import PurchaseInvoice
+
+TODAY = date(2026, 1, 15)
+
+
+def _legacy_summary(business_id):
+    """The receivable/payable figures exactly as the pre-CTE summary computed them."""
+    invoices_to_collect = float(
+        db.session.query(func.coalesce(func.sum(Invoice.balance_due), 0))
+        .filter(Invoice.business_id == business_id, Invoice.is_deleted == False, Invoice.payment_status != "paid")
+        .scalar()
+    )
+
+    credit_notes_offset = 0.0
+    credit_notes_refund = 0.0
+    outstanding_cns = CreditNote.query.filter(
+        CreditNote.business_id == business_id,
+        CreditNote.is_deleted == False,
+        CreditNote.status != "paid",
+    ).all()
+    for cn in outstanding_cns:
+        cn_balance = float(cn.balance_amount or 0)
+        if cn_balance <= 0:
+            continue
+        if cn.invoice_id:
+            linked_invoice = Invoice.query.filter_by(
+                uuid=cn.invoice_id, business_id=business_id, is_deleted=False
+            ).first()
+            if linked_invoice:
+                invoice_remaining = float(linked_invoice.balance_due or 0)
+                if linked_invoice.payment_status == "paid":
+                    credit_notes_refund += max(0.0, cn_balance - invoice_remaining)
+                else:
+                    credit_notes_offset += min(cn_balance, invoice_remaining)
+                    credit_notes_refund += max(0.0, cn_balance - invoice_remaining)
+            else:
+                credit_notes_offset += cn_balance
+        elif cn.status == "refunded":
+            credit_notes_refund += cn_balance
+        else:
+            credit_notes_offset += cn_balance
+
+    debit_notes_to_receive = float(
+        db.session.query(func.coalesce(func.sum(DebitNote.balance_amount), 0))
+        .filter(DebitNote.business_id == business_id, DebitNote.is_deleted == False,
+                func.lower(DebitNote.status) != "credited")
+        .scalar()
+    )
+    invoices_to_pay = float(
+        db.session.query(func.coalesce(func.sum(PurchaseInvoice.balance_due), 0))
+        .filter(PurchaseInvoice.business_id == business_id, PurchaseInvoice.is_deleted == False,
+                PurchaseInvoice.payment_status != "paid")
+        .scalar()
+    )
+
+    return {
+        "to_collect": round(invoices_to_collect - credit_notes_offset + debit_notes_to_receive, 2),
+        "to_pay": round(invoices_to_pay + credit_notes_refund, 2),
+        "total_receivables_gross": round(invoices_to_collect, 2),
+        "total_credit_notes": round(credit_notes_offset, 2),
+        "total_payables_gross": round(invoices_to_pay, 2),
+        "total_debit_notes": round(debit_notes_to_receive, 2),
+        "credit_notes_refund": round(credit_notes_refund, 2),
+    }
+
+
+@pytest.fixture
+def summary_dataset(db_session, tenant, customer, vendor):
+    business_id = tenant.business_id
+
+    def invoice(number, balance_due, payment_status="unpaid", is_deleted=False):
+        row = Invoice(
+            invoice_number=number, business_id=business_id, customer_id=customer.uuid,
+            invoice_date=TODAY, due_date=TODAY, total_amount=Decimal("100"),
+            balance_due=Decimal(balance_due), payment_status=payment_status, is_deleted=is_deleted,
+        )
+        db_session.add(row)
+        return row
+
+    unpaid = invoice("INV-1", "100")
+    partial = invoice("INV-2", "40", "partial")
+    paid = invoice("INV-3", "0", "paid")
+    legacy_null = invoice("INV-4", "50")
+    deleted = invoice("INV-5", "70", is_deleted=True)
+    small = invoice("INV-6", "10")
+    db_session.flush()
+
+    def credit_note(number, balance, invoice_id=None, status="unpaid", is_deleted=False):
+        db_session.add(CreditNote(
+            credit_note_number=number, business_id=business_id, customer_id=customer.uuid,
+            invoice_id=invoice_id, credit_note_date=TODAY, total_amount=Decimal(balance),
+            balance_amount=Decimal(balance), status=status, is_deleted=is_deleted,
+        ))
+
+    credit_note("CN-1", "30", unpaid.uuid)          # offset against an unpaid invoice
+    credit_note("CN-2", "25", paid.uuid)            # refund: its invoice is already paid
+    credit_note("CN-3", "20", legacy_null.uuid)     # invoice with a legacy NULL payment_status
+    credit_note("CN-4", "15", deleted.uuid)         # invoice deleted: whole CN is an offset
+    credit_note("CN-5", "12")                       # standalone offset
+    credit_note("CN-6", "8", status="refunded")     # standalone refund
+    credit_note("CN-7", "25", small.uuid)           # 10 offset + 15 refund
+    credit_note("CN-8", "5", partial.uuid)          # offset against a partial invoice
+    credit_note("CN-9", "99", unpaid.uuid, status="paid")
+    credit_note("CN-10", "0", unpaid.uuid)
+    credit_note("CN-11", "45", unpaid.uuid, is_deleted=True)
+
+    def debit_note(number, balance, status="Unpaid", is_deleted=False):
+        db_session.add(DebitNote(
+            debit_note_number=number, vendor_id=vendor.uuid, business_id=business_id,
+            debit_note_date=TODAY, status=status, total_amount=Decimal(balance),
+            balance_amount=Decimal(balance), is_deleted=is_deleted,
+        ))
+
+    debit_note("DN-1", "40")
+    debit_note("DN-2", "60", status="Credited")
+    debit_note("DN-3", "35", is_deleted=True)
+
+    def purchase_invoice(number, balance_due, payment_status="unpaid", is_deleted=False):
+        db_session.add(PurchaseInvoice(
+            invoice_number=number, vendor_id=vendor.uuid, business_id=business_id,
+            invoice_date=TODAY, total_amount=Decimal("200"), balance_due=Decimal(balance_due),
+            payment_status=payment_status, is_deleted=is_deleted,
+        ))
+
+    purchase_invoice("PI-1", "200")
+    purchase_invoice("PI-2", "0", "paid")
+    purchase_invoice("PI-3", "90", is_deleted=True)
+    db_session.commit()
+
+    # 0001_consolidated adds missing columns as nullable, so older databases can
+    # hold invoices whose payment_status was never set.
+    db_session.execute(db.text("ALTER TABLE invoices ALTER COLUMN payment_status DROP NOT NULL"))
+    db_session.execute(db.text("UPDATE invoices SET payment_status = NULL WHERE uuid = :uuid"),
+                       {"uuid": legacy_null.uuid})
+    db_session.commit()
+    yield business_id
+    db_session.execute(db.text("UPDATE invoices SET payment_status = 'unpaid' WHERE payment_status IS NULL"))
+    db_session.execute(db.text("ALTER TABLE invoices ALTER COLUMN payment_status SET NOT NULL"))
+    db_session.commit()
+
+
+def test_summary_matches_legacy_computation(client, tenant, summary_dataset, db_session):
+    response = client.get("/api/dashboard/summary", headers=tenant.headers)
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+
+    expected = _legacy_summary(summary_dataset)
+    assert {key: body[key] for key in expected} == expected
+
+
+def test_summary_figures(client, tenant, summary_dataset):
+    body = client.get("/api/dashboard/summary", headers=tenant.headers).get_json()
+
+    # INV-4 (NULL status) is not counted as receivable, as before
+    assert body["total_receivables_gross"] == 150.0
+    # CN-1 30 + CN-3 20 (NULL status counts as unpaid) + CN-4 15 + CN-5 12 + CN-7 10 + CN-8 5
+    assert body["total_credit_notes"] == 92.0
+    # CN-2 25 + CN-6 8 + CN-7 15
+    assert body["credit_notes_refund"] == 48.0
+    assert body["total_debit_notes"] == 40.0
+    assert body["to_collect"] == 98.0
+    assert body["to_pay"] == 248.0
@@ -0,0 +1,93 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.creditIn import CreditNote
+from app.models.debit_note import DebitNote
+from app.models.invoice import Invoice
+from app.models.purchase_invoice import PurchaseInvoice
+from app.models.purchase_order import PurchaseOrder
+from app.models.quotation import Quotation
+from app.routes.dashboard import _timeline_branches
+
+TODAY = date(2026, 1, 15)
+
+
+@pytest.mark.parametrize("after", [None, (datetime(2026, 1, 15, 12, 0), "payment_in", "0")])
+def test_timeline_branches_compile(after):
+    for branch in _timeline_branches(1, after, 6):
+        branch.compile(dialect=postgresql.dialect())
+
+
+@pytest.fixture
+def timeline_dataset(db_session, tenant, customer, vendor):
+    business_id = tenant.business_id
+    db_session.add_all([
+        Invoice(
+            invoice_number="INV-1", business_id=business_id, customer_id=customer.uuid,
+            invoice_date=TODAY, due_date=TODAY, total_amount=Decimal("100"),
+            amount_paid=Decimal("40"), balance_due=Decimal("60"), payment_status="partial",
+        ),
+        Quotation(
+            quotation_number="QT-1", business_id=business_id, customer_id=customer.uuid,
+            quotation_date=TODAY, total_amount=Decimal("80"),
+        ),
+        PurchaseOrder(
+            po_number="PO-1", business_id=business_id, vendor_id=vendor.uuid,
+            po_date=TODAY, total_amount=Decimal("300"),
+        ),
+        PurchaseInvoice(
+            invoice_number="PI-1", business_id=business_id, vendor_id=vendor.uuid,
+            invoice_date=TODAY, total_amount=Decimal("200"), balance_due=Decimal("200"),
+        ),
+        CreditNote(
+            credit_note_number="CN-1", business_id=business_id, customer_id=customer.uuid,
+            credit_note_date=TODAY, total_amount=Decimal("10"), balance_amount=Decimal("10"),
+        ),
+        DebitNote(
+            debit_note_number="DN-1", business_id=business_id, vendor_id=vendor.uuid,
+            debit_note_date=TODAY, total_amount=Decimal("15"), balance_amount=Decimal("15"),
+        ),
+    ])
+    db_session.commit()
+    return business_id
+
+
+def test_latest_transactions_lists_every_document_type(client, tenant, timeline_dataset):
+    response = client.get("/api/dashboard/latest-transactions?limit=20", headers=tenant.headers)
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+
+    assert sorted(txn["txn_no"] for txn in body["transactions"]) == [
+        "CN-1", "DN-1", "INV-1", "PAY-INV-1", "PI-1", "PO-1", "QT-1",
+    ]
+    assert body["next_cursor"] is None
+
+
+def test_latest_transactions_cursor_pages_through_everything(client, tenant, timeline_dataset):
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/dashboard/latest-transactions?limit=3" + (f"&cursor={cursor}" if cursor else "")
+        response = client.get(url, headers=tenant.headers)
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        seen.extend(txn["txn_no"] for txn in body["transactions"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+
+
+def test_batch_latest_transactions(client, tenant, timeline_dataset):
+    response = client.get("/api/dashboard/batch?widgets=latest-transactions,summary", headers=tenant.headers)
+    assert response.status_code == 200
+    widgets = response.get_json()["widgets"]
+
+    assert widgets["latest-transactions"]["status"] == 200, widgets["latest-transactions"]
+    assert len(widgets["latest-transactions"]["data"]["transactions"]) == 5
+    assert widgets["summary"]["status"] == 200, widgets["summary"]
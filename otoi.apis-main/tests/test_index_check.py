@@ -0,0 +1,10 @@
+from app.utils.index_check import hot_queries
+
+
+def test_verify_indexes_plans_every_hot_query(app, db_session, tenant):
+    result = app.test_cli_runner().invoke(args=["verify-indexes", "--business-id", str(tenant.business_id)])
+    assert result.exit_code == 0, result.output
+
+    lines = result.output.splitlines()
+    for label, _ in hot_queries(tenant.business_id):
+        assert any(line.startswith(label) for line in lines), label
@@ -0,0 +1,35 @@
+from app.models.invoice import Invoice
+
+
+def _payload(customer, **extra):
+    return {"customer_id": str(customer.uuid), "invoice_date": "2026-01-15", "due_date": "2026-01-30",
+            "total_amount": 100, **extra}
+
+
+def test_bulk_create_uses_the_callers_business(client, db_session, tenant, customer):
+    response = client.post("/api/invoices/bulk", headers=tenant.headers, json={"invoices": [
+        _payload(customer),
+        _payload(customer, business_id=tenant.business_id),
+    ]})
+    assert response.status_code == 201, response.get_json()
+    assert [row["invoice_number"] for row in response.get_json()["created"]] == ["INV-1001", "INV-1002"]
+    assert {invoice.business_id for invoice in Invoice.query.all()} == {tenant.business_id}
+
+
+def test_bulk_create_rejects_another_business(client, db_session, tenant, other_tenant, customer):
+    response = client.post("/api/invoices/bulk", headers=tenant.headers, json={"invoices": [
+        _payload(customer, business_id=other_tenant.business_id),
+    ]})
+    assert response.status_code == 400
+    assert response.get_json()["errors"] == [
+        {"index": 0, "error": "business_id does not match the current business"},
+    ]
+    assert Invoice.query.count() == 0
+
+
+def test_bulk_create_requires_a_tenant(client, db_session, tenant, other_tenant, customer):
+    response = client.post("/api/invoices/bulk", headers=tenant.headers_for(role="admin"), json={"invoices": [
+        _payload(customer, business_id=other_tenant.business_id),
+    ]})
+    assert response.status_code == 403
+    assert Invoice.query.count() == 0
@@ -0,0 +1,18 @@
+import pytest
+
+from app.routes import purchase_order, quotation
+from app.utils import dashboard_cache, jobs
+
+
+@pytest.mark.parametrize("job, module, sweep", [
+    (jobs._close_overdue_purchase_orders, purchase_order, "auto_close_overdue_pos"),
+    (jobs._close_expired_quotations, quotation, "check_and_update_quotation_status"),
+])
+@pytest.mark.parametrize("closed, invalidations", [(0, 0), (3, 1)])
+def test_sweep_invalidates_dashboard_cache_when_it_closes_rows(monkeypatch, job, module, sweep, closed, invalidations):
+    calls = []
+    monkeypatch.setattr(module, sweep, lambda: closed)
+    monkeypatch.setattr(dashboard_cache, "invalidate_dashboard_cache", lambda business_id=None: calls.append(business_id))
+
+    assert job() == closed
+    assert len(calls) == invalidations
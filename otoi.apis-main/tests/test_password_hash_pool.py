@@ -0,0 +1,64 @@
+import os
+import time
+
+import pytest
+
+from app.services.auth_service import PasswordHashPool, PasswordHashPoolSaturated
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.02)
+
+
+@pytest.fixture
+def pool():
+    pool = PasswordHashPool(workers=1, queue_limit=0, timeout=0.2)
+    yield pool
+    pool.configure(workers=0, queue_limit=0, timeout=0.2)
+
+
+def test_runs_job_and_releases_slot(pool):
+    assert pool.run(abs, -3) == 3
+    _wait_for(lambda: pool.in_flight == 0)
+    assert pool.stats()["completed"] == 1
+
+
+def test_full_pool_is_saturated(pool):
+    pool.in_flight = pool.workers + pool.queue_limit
+    with pytest.raises(PasswordHashPoolSaturated):
+        pool.run(abs, -1)
+    assert pool.rejected == 1
+
+
+def test_timeout_is_saturation_and_keeps_the_slot(pool):
+    with pytest.raises(PasswordHashPoolSaturated):
+        pool.run(time.sleep, 1.0)
+    assert pool.timeouts == 1
+
+    # The sleeping job still occupies the only process; nothing else is admitted
+    assert pool.in_flight == 1
+    with pytest.raises(PasswordHashPoolSaturated):
+        pool.run(abs, -1)
+    assert pool.rejected == 1
+
+    _wait_for(lambda: pool.in_flight == 0)
+    assert pool.run(abs, -2) == 2
+
+
+def test_dead_worker_is_saturation_and_pool_recovers(pool):
+    pool.timeout = 10
+    with pytest.raises(PasswordHashPoolSaturated):
+        pool.run(os._exit, 1)
+    assert pool.broken == 1
+    _wait_for(lambda: pool.in_flight == 0)
+
+    assert pool.run(abs, -4) == 4
+
+
+def test_inline_mode_without_workers():
+    pool = PasswordHashPool(workers=0)
+    assert pool.run(abs, -5) == 5
+    assert pool.in_flight == 0
@@ -0,0 +1,61 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.extensions import db
+from app.models.invoice import Invoice
+from app.utils.sequences import next_document_number, next_document_numbers, peek_document_number
+
+WORKERS = 8
+
+
+def test_parallel_allocations_are_unique_and_contiguous(app, db_session, tenant):
+    # Every thread starts at once, before the sequence row exists, so the first
+    # INSERT races too; each holds its row lock a moment to force queueing.
+    barrier = threading.Barrier(WORKERS)
+
+    def allocate():
+        with app.app_context():
+            barrier.wait()
+            number = next_document_number("invoice", business_id=tenant.business_id)
+            time.sleep(0.05)
+            db.session.commit()
+            return number
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        numbers = [future.result() for future in [executor.submit(allocate) for _ in range(WORKERS)]]
+
+    assert sorted(numbers) == [f"INV-{value}" for value in range(1001, 1001 + WORKERS)]
+    assert peek_document_number("invoice", business_id=tenant.business_id) == f"INV-{1001 + WORKERS}"
+
+
+def test_concurrent_creates_get_distinct_numbers(app, db_session, tenant, customer):
+    # Each request allocates through the create route and inserts under
+    # uq_invoices_business_invoice_number; a duplicate would come back as 400.
+    barrier = threading.Barrier(WORKERS)
+    customer_id = str(customer.uuid)
+
+    def create():
+        client = app.test_client()
+        barrier.wait()
+        return client.post("/api/invoices/", headers=tenant.headers, json={
+            "business_id": tenant.business_id, "customer_id": customer_id,
+            "invoice_date": "2026-01-15", "due_date": "2026-01-30", "total_amount": 100,
+        })
+
+    with ThreadPoolExecutor(max_workers=WORKERS) as executor:
+        responses = [future.result() for future in [executor.submit(create) for _ in range(WORKERS)]]
+
+    assert [response.status_code for response in responses] == [201] * WORKERS, [r.get_json() for r in responses]
+    numbers = [response.get_json()["invoice_number"] for response in responses]
+    assert sorted(numbers) == [f"INV-{value}" for value in range(1001, 1001 + WORKERS)]
+    assert sorted(invoice.invoice_number for invoice in Invoice.query.all()) == sorted(numbers)
+
+
+def test_rolled_back_allocation_is_reused(db_session, tenant):
+    assert next_document_numbers("quotation", 3, business_id=tenant.business_id) == ["QT-1001", "QT-1002", "QT-1003"]
+    db_session.rollback()
+
+    assert next_document_number("quotation", business_id=tenant.business_id) == "QT-1001"
+    db_session.commit()
+    assert peek_document_number("quotation", business_id=tenant.business_id) == "QT-1002"
@@ -0,0 +1,40 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models.invoice import Invoice
+from app.utils.suggest import get_sources, suggest, suggest_index
+
+TODAY = date(2026, 1, 15)
+
+
+@pytest.fixture
+def invoices(db_session, tenant, other_tenant, customer):
+    suggest_index.clear()
+    for business_id, number in [(tenant.business_id, "INV-1001"), (other_tenant.business_id, "INV-2001")]:
+        db_session.add(Invoice(
+            invoice_number=number, business_id=business_id, customer_id=customer.uuid,
+            invoice_date=TODAY, due_date=TODAY, total_amount=Decimal("100"), balance_due=Decimal("100"),
+        ))
+    db_session.commit()
+    yield
+    suggest_index.clear()
+
+
+def test_suggest_returns_only_the_tenants_rows(client, tenant, invoices):
+    response = client.get("/api/search/suggest?q=inv&types=invoice", headers=tenant.headers)
+    assert response.status_code == 200
+    assert [row["label"] for row in response.get_json()["data"]] == ["INV-1001"]
+
+
+def test_suggest_without_a_tenant_is_forbidden(client, tenant, invoices):
+    response = client.get("/api/search/suggest?q=inv&types=invoice", headers=tenant.headers_for(role="admin"))
+    assert response.status_code == 403
+
+
+def test_scoped_kinds_without_a_business_match_nothing(db_session, invoices):
+    # Outside a request the ORM tenant hook does not filter, so this is base_query's own guard
+    assert get_sources()["invoice"].base_query(None).all() == []
+    assert suggest("inv", kinds=["invoice"], business_id=None) == []
+    assert suggest_index.stats()["buckets"] == 0
@@ -0,0 +1,67 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models.invoice import Invoice
+from app.utils.tenant import set_tenant
+
+TODAY = date(2026, 1, 15)
+
+
+@pytest.fixture
+def invoices(db_session, tenant, other_tenant, customer):
+    for business_id, number in [(tenant.business_id, "INV-1"), (other_tenant.business_id, "INV-2")]:
+        db_session.add(Invoice(
+            invoice_number=number, business_id=business_id, customer_id=customer.uuid,
+            invoice_date=TODAY, due_date=TODAY, total_amount=Decimal("100"), balance_due=Decimal("100"),
+        ))
+    db_session.commit()
+
+
+def _invoice_numbers(client, headers):
+    response = client.get("/api/invoices/?items_per_page=50", headers=headers)
+    return response, [row["invoice_number"] for row in (response.get_json() or {}).get("data", [])]
+
+
+def test_tenant_sees_only_its_own_rows(client, tenant, invoices):
+    response, numbers = _invoice_numbers(client, tenant.headers)
+    assert response.status_code == 200
+    assert numbers == ["INV-1"]
+
+
+def test_foreign_business_claim_is_rejected(client, tenant, other_tenant, invoices):
+    headers = tenant.headers_for(role="admin", business_id=other_tenant.business_id)
+    response, numbers = _invoice_numbers(client, headers)
+    assert response.status_code == 403
+    assert numbers == []
+
+
+def test_missing_business_claim_sees_no_rows(client, tenant, invoices):
+    response, numbers = _invoice_numbers(client, tenant.headers_for(role="admin"))
+    assert response.status_code == 200
+    assert numbers == []
+
+
+def test_no_tenant_in_a_request_matches_nothing(app, db_session, invoices):
+    with app.test_request_context():
+        assert Invoice.query.count() == 0
+        assert Invoice.query.execution_options(all_tenants=True).count() == 2
+        set_tenant(None)
+        assert Invoice.query.count() == 0
+
+
+def test_outside_a_request_nothing_is_filtered(db_session, invoices):
+    assert Invoice.query.count() == 2
+
+
+def test_share_token_reads_the_documents_business(app, client, tenant, invoices):
+    from app.routes.share import generate_pdf_token
+
+    with app.app_context():
+        uuid = str(Invoice.query.filter_by(invoice_number="INV-1").one().uuid)
+        token = generate_pdf_token(uuid, "invoice")
+
+    response = client.get(f"/api/share-data/public/pdf/{token}")
+    assert response.status_code == 200, response.get_data(as_text=True)[:500]
+    assert response.mimetype == "application/pdf"
@@ -0,0 +1,40 @@
+import { createContext, type PropsWithChildren, useCallback, useContext, useEffect, useState } from 'react';
+import { getDashboardData, type DashboardData } from '@/services/dashboard.service';
+
+export interface IDashboardDataProps {
+  data: DashboardData; // Widget results from the page's batch request
+  loading: boolean; // Whether the batch request is in flight
+}
+
+// Outside the provider nothing is preloaded, so each block fetches its own data
+const initialProps: IDashboardDataProps = {
+  data: {},
+  loading: false
+};
+
+const DashboardDataContext = createContext<IDashboardDataProps>(initialProps);
+
+const useDashboardData = () => useContext(DashboardDataContext);
+
+// Loads every dashboard widget with one request and reloads on 'dashboard-refresh'
+const DashboardDataProvider = ({ children }: PropsWithChildren) => {
+  const [state, setState] = useState<IDashboardDataProps>({ data: {}, loading: true });
+
+  const fetchData = useCallback(async () => {
+    setState((current) => ({ ...current, loading: true }));
+    const res = await getDashboardData();
+    setState({ data: res.success && res.data ? res.data : {}, loading: false });
+  }, []);
+
+  useEffect(() => {
+    fetchData();
+
+    const handler = () => fetchData();
+    window.addEventListener('dashboard-refresh', handler);
+    return () => window.removeEventListener('dashboard-refresh', handler);
+  }, [fetchData]);
+
+  return <DashboardDataContext.Provider value={state}>{children}</DashboardDataContext.Provider>;
+};
+
+export { DashboardDataProvider, useDashboardData };
@@ -1,6 +1,7 @@
 import { Fragment, useState, useEffect, useCallback } from 'react';
 import { useNavigate, Link } from 'react-router-dom';
 import { getLatestTransactions, type Transaction } from '@/services/dashboard.service';
+import { useDashboardData } from '../DashboardDataProvider';
 
 const TYPE_BADGE_MAP: Record<string, string> = {
   'Sales Invoices': 'badge-success',
@@ -50,6 +51,7 @@ const SkeletonRow = () => (
 
 const LatestTransactions = () => {
   const navigate = useNavigate();
+  const dashboard = useDashboardData();
   const [transactions, setTransactions] = useState<Transaction[]>([]);
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState<FilterTab>('All');
@@ -63,13 +65,16 @@ const LatestTransactions = () => {
     setLoading(false);
   }, []);
 
+  // Use the page's batch result; fetch separately only if it is missing
   useEffect(() => {
-    fetchData();
-
-    const handler = () => fetchData();
-    window.addEventListener('dashboard-refresh', handler);
-    return () => window.removeEventListener('dashboard-refresh', handler);
-  }, [fetchData]);
+    if (dashboard.loading) return;
+    if (dashboard.data.transactions) {
+      setTransactions(dashboard.data.transactions);
+      setLoading(false);
+    } else {
+      fetchData();
+    }
+  }, [dashboard, fetchData]);
 
   const filteredTxns =
     activeTab === 'All'
@@ -1,12 +1,14 @@
 import { useState, useEffect, useCallback } from 'react';
 import { Link } from 'react-router-dom';
 import { getOverdueInvoices, type OverdueSummary } from '@/services/dashboard.service';
+import { useDashboardData } from '../DashboardDataProvider';
 
 const formatINR = (value: number): string => {
   return `₹ ${Number(value).toLocaleString('en-IN', { minimumFractionDigits: 2, maximumFractionDigits: 2 })}`;
 };
 
 const OverdueAlert = () => {
+  const dashboard = useDashboardData();
   const [overdue, setOverdue] = useState<OverdueSummary | null>(null);
   const [dismissed, setDismissed] = useState(false);
 
@@ -17,13 +19,15 @@ const OverdueAlert = () => {
     }
   }, []);
 
+  // Use the page's batch result; fetch separately only if it is missing
   useEffect(() => {
-    fetchData();
-
-    const handler = () => fetchData();
-    window.addEventListener('dashboard-refresh', handler);
-    return () => window.removeEventListener('dashboard-refresh', handler);
-  }, [fetchData]);
+    if (dashboard.loading) return;
+    if (dashboard.data.overdue) {
+      setOverdue(dashboard.data.overdue);
+    } else {
+      fetchData();
+    }
+  }, [dashboard, fetchData]);
 
   if (!overdue || overdue.total_count === 0 || dismissed) return null;
 
@@ -2,6 +2,7 @@ import { useState, useEffect, useCallback } from 'react';
 import ApexChart from 'react-apexcharts';
 import { ApexOptions } from 'apexcharts';
 import { getSalesReport, type SalesReport as SalesReportData } from '@/services/dashboard.service';
+import { useDashboardData } from '../DashboardDataProvider';
 
 import {
   Select,
@@ -21,6 +22,7 @@ const formatDate = (iso: string): string => {
 };
 
 const SalesReport = () => {
+  const dashboard = useDashboardData();
   const [period, setPeriod] = useState<'daily' | 'weekly' | 'monthly'>('daily');
   const [report, setReport] = useState<SalesReportData | null>(null);
   const [loading, setLoading] = useState(true);
@@ -35,13 +37,16 @@ const SalesReport = () => {
     setLoading(false);
   }, [period]);
 
+  // The page's batch request loads the daily report; other periods are fetched on demand
   useEffect(() => {
-    fetchData();
-
-    const handler = () => fetchData();
-    window.addEventListener('dashboard-refresh', handler);
-    return () => window.removeEventListener('dashboard-refresh', handler);
-  }, [fetchData]);
+    if (dashboard.loading) return;
+    if (period === 'daily' && dashboard.data.salesReport) {
+      setReport(dashboard.data.salesReport);
+      setLoading(false);
+    } else {
+      fetchData();
+    }
+  }, [dashboard, period, fetchData]);
 
   // Build chart data from API response
   const categories = report?.data_points.map((dp) => dp.label) ?? [];
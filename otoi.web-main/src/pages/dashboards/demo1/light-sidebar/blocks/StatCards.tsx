@@ -1,6 +1,7 @@
 import { Fragment, useState, useEffect, useCallback } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { getDashboardSummary, type DashboardSummary } from '@/services/dashboard.service';
+import { useDashboardData } from '../DashboardDataProvider';
 
 interface IStatCard {
   label: string;
@@ -37,6 +38,7 @@ const StatCardSkeleton = () => (
 
 const StatCards = () => {
   const navigate = useNavigate();
+  const dashboard = useDashboardData();
   const [summary, setSummary] = useState<DashboardSummary | null>(null);
   const [loading, setLoading] = useState(true);
 
@@ -49,13 +51,16 @@ const StatCards = () => {
     setLoading(false);
   }, []);
 
+  // Use the page's batch result; fetch separately only if it is missing
   useEffect(() => {
-    fetchData();
-
-    const handler = () => fetchData();
-    window.addEventListener('dashboard-refresh', handler);
-    return () => window.removeEventListener('dashboard-refresh', handler);
-  }, [fetchData]);
+    if (dashboard.loading) return;
+    if (dashboard.data.summary) {
+      setSummary(dashboard.data.summary);
+      setLoading(false);
+    } else {
+      fetchData();
+    }
+  }, [dashboard, fetchData]);
 
   if (loading) {
     return (
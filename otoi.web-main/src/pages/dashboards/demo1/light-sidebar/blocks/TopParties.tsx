@@ -1,11 +1,13 @@
 import { useState, useEffect, useCallback } from 'react';
 import { getTopParties, type TopParty } from '@/services/dashboard.service';
+import { useDashboardData } from '../DashboardDataProvider';
 
 const formatINR = (value: number): string => {
   return `₹ ${Number(value).toLocaleString('en-IN', { minimumFractionDigits: 2, maximumFractionDigits: 2 })}`;
 };
 
 const TopParties = () => {
+  const dashboard = useDashboardData();
   const [activeTab, setActiveTab] = useState<'receivable' | 'payable'>('receivable');
   const [parties, setParties] = useState<TopParty[]>([]);
   const [loading, setLoading] = useState(true);
@@ -19,13 +21,16 @@ const TopParties = () => {
     setLoading(false);
   }, [activeTab]);
 
+  // The page's batch request loads the receivable tab; the payable tab is fetched on demand
   useEffect(() => {
-    fetchData();
-
-    const handler = () => fetchData();
-    window.addEventListener('dashboard-refresh', handler);
-    return () => window.removeEventListener('dashboard-refresh', handler);
-  }, [fetchData]);
+    if (dashboard.loading) return;
+    if (activeTab === 'receivable' && dashboard.data.topParties) {
+      setParties(dashboard.data.topParties);
+      setLoading(false);
+    } else {
+      fetchData();
+    }
+  }, [dashboard, activeTab, fetchData]);
 
   const maxAmount = parties.length > 0 ? Math.max(...parties.map((p) => p.amount)) : 1;
 
@@ -1,3 +1,4 @@
 export * from './blocks';
+export * from './DashboardDataProvider';
 export * from './Demo1LightSidebarContent';
 export * from './Demo1LightSidebarPage';
@@ -153,3 +153,77 @@ export const getTopParties = async (
     return { success: false, error: error.response?.data?.error || 'Failed to fetch top parties' };
   }
 };
+
+export interface DashboardWidgetResult<T = any> {
+  status: number;
+  data: T;
+}
+
+export type DashboardWidget =
+  | 'summary'
+  | 'latest-transactions'
+  | 'sales-report'
+  | 'overdue-summary'
+  | 'top-parties'
+  | 'aging';
+
+/**
+ * Load several widgets in one request. Widget arguments are passed as
+ * `<widget>.<arg>`, e.g. { 'sales-report.period': 'weekly' }.
+ */
+export const getDashboardBatch = async (
+  widgets: DashboardWidget[],
+  args: Record<string, string | number> = {}
+): Promise<ApiResponse<Partial<Record<DashboardWidget, DashboardWidgetResult>>>> => {
+  try {
+    const params = new URLSearchParams({ widgets: widgets.join(',') });
+    Object.entries(args).forEach(([key, value]) => params.append(key, String(value)));
+    const response = await axios.get(`${API_URL}/dashboard/batch?${params.toString()}`, authHeaders());
+    return { success: true, data: response.data.widgets };
+  } catch (error: any) {
+    console.error('Failed to fetch dashboard widgets:', error);
+    return { success: false, error: error.response?.data?.error || 'Failed to fetch dashboard' };
+  }
+};
+
+export interface DashboardData {
+  summary?: DashboardSummary;
+  transactions?: Transaction[];
+  salesReport?: SalesReport;
+  overdue?: OverdueSummary;
+  topParties?: TopParty[];
+}
+
+/**
+ * Load the dashboard page's widgets in one batch request, with the same
+ * arguments the blocks use by default. A widget that failed is left undefined.
+ */
+export const getDashboardData = async (): Promise<ApiResponse<DashboardData>> => {
+  const res = await getDashboardBatch(
+    ['summary', 'latest-transactions', 'sales-report', 'overdue-summary', 'top-parties'],
+    {
+      'latest-transactions.limit': 10,
+      'sales-report.period': 'daily',
+      'sales-report.days': 7,
+      'top-parties.type': 'receivable',
+      'top-parties.limit': 5,
+    }
+  );
+  if (!res.success || !res.data) {
+    return { success: false, error: res.error };
+  }
+
+  const widgets = res.data;
+  const ok = (name: DashboardWidget) =>
+    widgets[name]?.status === 200 ? widgets[name]?.data : undefined;
+  return {
+    success: true,
+    data: {
+      summary: ok('summary'),
+      transactions: ok('latest-transactions')?.transactions,
+      salesReport: ok('sales-report'),
+      overdue: ok('overdue-summary'),
+      topParties: ok('top-parties')?.parties,
+    },
+  };
+};